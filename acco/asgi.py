@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'acco.settings')
+# Serve the async dashboard views (base.async_views) under ASGI.
+os.environ.setdefault('ASYNC_DASHBOARDS', 'true')
+# No persistent per-thread connections (see DATABASES in settings).
+os.environ.setdefault('DJANGO_ASGI', 'true')
 
 application = get_asgi_application()
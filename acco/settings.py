@@ -63,6 +63,10 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'base.middleware.IPBlocklistMiddleware',
+    'base.middleware.StaticAssetMiddleware',
+    'base.middleware.ResponseOptimizationMiddleware',
+    'base.db_routers.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -95,6 +99,12 @@ WSGI_APPLICATION = 'acco.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Set by acco/asgi.py. Sync code under ASGI runs on a thread pool, where a
+# connection kept open per thread would pile up until MySQL's
+# max_connections; there connections close after every request unless
+# DB_POOL is on.
+RUNNING_ASGI = env.bool('DJANGO_ASGI', default=False)
+
 # Database
 DATABASES = {
     'default': {
@@ -103,10 +113,47 @@ DATABASES = {
         'HOST': 'localhost',
         'PORT': '3306',
         'USER': 'accoplacers',
-        'PASSWORD': 'accoplacers'
+        'PASSWORD': 'accoplacers',
+        # Keep each WSGI worker's connection open between requests, and check
+        # it is still alive before reusing it after an error.
+        'CONN_MAX_AGE': env.int('DB_CONN_MAX_AGE', default=0 if RUNNING_ASGI else 300),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# ASGI and threaded workers: share a pool of connections per process
+# instead (base.db_pool). Connections go back to the pool after every
+# request, so CONN_MAX_AGE must be 0.
+if env.bool('DB_POOL', default=False):
+    DATABASES['default'].update({
+        'ENGINE': 'base.db_backends.mysql',
+        'CONN_MAX_AGE': 0,
+        'POOL': {
+            'SIZE': env.int('DB_POOL_SIZE', default=5),
+            'MAX_OVERFLOW': env.int('DB_POOL_MAX_OVERFLOW', default=10),
+            'TIMEOUT': 30,
+            'RECYCLE': 3600,
+        },
+    })
+
+# Optional read replica for dashboards, searches and admin changelists
+# (base.db_routers). Without DATABASE_REPLICA_HOST everything uses `default`.
+if env('DATABASE_REPLICA_HOST', default=''):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': env('DATABASE_REPLICA_HOST'),
+        'PORT': env('DATABASE_REPLICA_PORT', default='3306'),
+    }
+
+DATABASE_ROUTERS = ['base.db_routers.ReplicaRouter']
+REPLICA_DATABASE = 'replica'
+# Seconds a browser keeps reading from the primary after it wrote something.
+REPLICA_PIN_SECONDS = 10
+# Replication lag (seconds) above which reads go back to the primary, and how
+# often each process re-checks it.
+REPLICA_MAX_LAG = 5
+REPLICA_LAG_CHECK_INTERVAL = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -149,9 +196,29 @@ STATICFILES_DIRS = [
     BASE_DIR / "base" / "static",  # adjust to your app name
 ]
 
+# collectstatic writes content-hashed copies plus .gz/.br variants, which
+# base.middleware.StaticAssetMiddleware serves with far-future caching.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "base.storage.CompressedManifestStaticFilesStorage"},
+}
+
+# Strip indentation and comments from HTML responses before they are compressed.
+MINIFY_HTML = True
+
+# Cache lifetime (seconds) for static files without a content hash, e.g. favicon.ico.
+STATIC_MAX_AGE = 3600
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Resumes and candidate photos are served by base.views.registration_file after
+# a permission check. Set to 'x-accel-redirect' (nginx, with an `internal`
+# location at SENDFILE_URL_PREFIX aliased to MEDIA_ROOT) or 'x-sendfile'
+# (Apache/lighttpd) to let the proxy do the transfer; empty streams from Django.
+SENDFILE_BACKEND = env('SENDFILE_BACKEND', default='')
+SENDFILE_URL_PREFIX = '/protected-media/'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -164,3 +231,73 @@ STRIPE_SECRET_KEY = env("STRIPE_SECRET_KEY")
 # File upload size limits (10 MB per file, 15 MB total request)
 DATA_UPLOAD_MAX_MEMORY_SIZE = 15 * 1024 * 1024   # 15 MB
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024   # 10 MB
+
+# Allowed slowdown (as a fraction of the stored baseline) before
+# `manage.py benchmark_hot_paths` reports a regression.
+BENCHMARK_REGRESSION_THRESHOLD = 0.25
+
+# Admin changelists: seconds to cache list_filter choices, and the table size
+# above which unfiltered lists use the database's row estimate instead of COUNT(*).
+ADMIN_FILTER_CACHE_TIMEOUT = 300
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 10000
+
+# Background task queue (`manage.py run_workers`): attempts before a task is
+# dead-lettered, retry backoff in seconds, and how long a running task may
+# stay locked before it is assumed abandoned.
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_BASE_DELAY = 30
+TASK_RETRY_MAX_DELAY = 3600
+TASK_LOCK_TIMEOUT = 600
+
+# Outgoing email (interest digests). Use the console/locmem/filebased
+# backends locally; production reads SMTP credentials from the environment.
+EMAIL_BACKEND = env('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = env('EMAIL_HOST', default='localhost')
+EMAIL_PORT = env.int('EMAIL_PORT', default=587)
+EMAIL_HOST_USER = env('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = env.bool('EMAIL_USE_TLS', default=True)
+DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL', default='Accoplacers <no-reply@accoplacers.com>')
+
+# Absolute base URL used for links in emails.
+SITE_URL = env('SITE_URL', default='https://accoplacers.com')
+
+# Pending interest notifications sent per mail connection.
+NOTIFICATION_DIGEST_BATCH_SIZE = 500
+
+# Seconds the facet cells (base.facets) stay cached; writes also clear the cache.
+FACET_CACHE_TIMEOUT = 300
+
+# Seconds the rendered landing and terms pages (base.page_cache) stay cached.
+PAGE_CACHE_SECONDS = env.int('PAGE_CACHE_SECONDS', default=600)
+
+# Async dashboard views (base.async_views), switched on by acco/asgi.py, and
+# the size of the thread pool they run their independent queries on.
+ASYNC_DASHBOARDS = env.bool('ASYNC_DASHBOARDS', default=False)
+ASYNC_QUERY_WORKERS = env.int('ASYNC_QUERY_WORKERS', default=8)
+
+# Recommendations stored per employer/candidate by
+# `manage.py refresh_recommendations` (base.recommendations).
+RECOMMENDATIONS_TOP_N = 12
+
+# Seconds a row must be old before `manage.py refresh_rollups` folds it in,
+# so inserts still in flight (with lower ids) aren't skipped.
+ROLLUP_SETTLE_SECONDS = 60
+
+# Site-wide IP blocklist (base.ipblock): BlockedNetwork rows plus an optional
+# file of addresses/CIDR ranges, rechecked by each process every
+# IP_BLOCKLIST_CHECK_INTERVAL seconds. An address blocked by rate_limit
+# IP_BLOCKLIST_RATE_LIMIT_STRIKES times in a day is blocked everywhere for
+# IP_BLOCKLIST_RATE_LIMIT_SECONDS (0 strikes turns that off).
+IP_BLOCKLIST_ENABLED = env.bool('IP_BLOCKLIST_ENABLED', default=True)
+IP_BLOCKLIST_FILE = env('IP_BLOCKLIST_FILE', default='')
+IP_BLOCKLIST_CHECK_INTERVAL = 5
+IP_BLOCKLIST_RATE_LIMIT_STRIKES = 3
+IP_BLOCKLIST_RATE_LIMIT_SECONDS = 24 * 60 * 60
+# Addresses the cleanup commands find junk submissions from stay blocked this long.
+IP_BLOCKLIST_CLEANUP_SECONDS = 30 * 24 * 60 * 60
+
+# Reverse proxies (addresses or CIDR ranges) whose X-Forwarded-For is
+# believed: the client is the rightmost hop that isn't one of them. Requests
+# from anywhere else are attributed to REMOTE_ADDR and the header is ignored.
+TRUSTED_PROXIES = env.list('TRUSTED_PROXIES', default=['127.0.0.1', '::1'])
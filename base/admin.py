@@ -1,15 +1,88 @@
-from django.contrib import admin
-from .models import Registration, Contact, Employer, JobOpening, EmployerInterest
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from .models import (
+    Registration, Contact, Employer, JobOpening, EmployerInterest, EmployeeInterest, Task, DeadLetterTask,
+    NormalizedValue, NormalizedAlias, UnmappedValue, BlockedNetwork
+)
+from .admin_mixins import LargeTableAdminMixin
+from .exports import export_response, spec_for_model
+from .importers import IMPORTERS, open_upload
+from . import dimensions, facets, taskqueue
+
+# Only the first few row errors are shown after an admin upload.
+MAX_IMPORT_ERRORS_SHOWN = 20
+
+
+@admin.action(description='Export selected to CSV')
+def export_as_csv(modeladmin, request, queryset):
+    spec = spec_for_model(queryset.model)
+    return export_response(spec, queryset, 'csv', filename=queryset.model._meta.model_name)
+
+
+@admin.action(description='Export selected to Excel (.xlsx)')
+def export_as_xlsx(modeladmin, request, queryset):
+    spec = spec_for_model(queryset.model)
+    return export_response(spec, queryset, 'xlsx', filename=queryset.model._meta.model_name)
+
+
+class CsvImportMixin:
+    """Adds an "Import CSV" button and upload page to a ModelAdmin."""
+    import_kind = None
+    change_list_template = 'admin/base/change_list_import.html'
+
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        return [
+            path('import-csv/', self.admin_site.admin_view(self.import_csv_view), name='%s_%s_import_csv' % info),
+        ] + super().get_urls()
+
+    def import_csv_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        opts = self.model._meta
+        importer_class = IMPORTERS[self.import_kind]
+
+        if request.method == 'POST' and request.FILES.get('csv_file'):
+            # Hashed in this process: a process pool doesn't belong in a web worker.
+            # Big files with many passwords are faster through `manage.py import_csv`.
+            importer = importer_class(workers=1, dry_run=bool(request.POST.get('dry_run')))
+            result = importer.run(open_upload(request.FILES['csv_file']))
+            for line, message in result.errors[:MAX_IMPORT_ERRORS_SHOWN]:
+                messages.error(request, f"Line {line}: {message}")
+            if result.failed > MAX_IMPORT_ERRORS_SHOWN:
+                messages.error(request, f"… and {result.failed - MAX_IMPORT_ERRORS_SHOWN} more row error(s).")
+            for line, message in result.duplicates[:MAX_IMPORT_ERRORS_SHOWN]:
+                messages.warning(request, f"Line {line}: {message}")
+            verb = 'Would import' if importer.dry_run else 'Imported'
+            messages.success(request, f"{verb} {result.created} {opts.verbose_name_plural} ({result.skipped} duplicate(s) skipped).")
+            return redirect(reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist'))
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': opts,
+            'title': f'Import {opts.verbose_name_plural} from CSV',
+            'required_columns': importer_class.required_columns,
+        }
+        return TemplateResponse(request, 'admin/base/import_csv.html', context)
 
 
 @admin.register(Registration)
-class RegistrationAdmin(admin.ModelAdmin):
-    list_display = ('employee_id', 'name', 'email', 'phone', 'role', 'location', 'experience', 'plan', 'is_placed', 'created_at')
+class RegistrationAdmin(CsvImportMixin, LargeTableAdminMixin, admin.ModelAdmin):
+    import_kind = 'candidates'
+    facet_name = 'registrations'
+    search_id_lookups = {'EMP': 'pk'}
+    list_display = ('employee_id', 'name', 'email', 'phone', 'role', 'location', 'experience', 'plan', 'is_placed', 'shortlist_count', 'created_at')
     search_fields = ('id', 'name', 'email', 'role', 'location', 'qualification')
     list_filter = ('is_placed', 'experience', 'qualification', 'plan', 'created_at', 'location')
-    readonly_fields = ('employee_id', 'created_at')
+    readonly_fields = (
+        'employee_id', 'created_at', 'client_ip', 'shortlist_count', 'experience_months',
+        'normalized_location', 'normalized_role', 'normalized_qualification', 'normalized_nationality',
+    )
     ordering = ('-created_at',)
-    actions = ['mark_as_placed', 'mark_as_available']
+    actions = ['mark_as_placed', 'mark_as_available', export_as_csv, export_as_xlsx]
 
     fieldsets = (
         ('Employee ID', {
@@ -22,7 +95,14 @@ class RegistrationAdmin(admin.ModelAdmin):
             'fields': ('qualification', 'experience', 'role', 'resume', 'photo')
         }),
         ('Plan & Status', {
-            'fields': ('plan', 'is_placed', 'created_at')
+            'fields': ('plan', 'is_placed', 'shortlist_count', 'created_at', 'client_ip')
+        }),
+        ('Normalized', {
+            'fields': (
+                'experience_months', 'normalized_location', 'normalized_role',
+                'normalized_qualification', 'normalized_nationality',
+            ),
+            'classes': ('collapse',),
         }),
     )
 
@@ -35,30 +115,33 @@ class RegistrationAdmin(admin.ModelAdmin):
 
     @admin.action(description='Mark selected employees as Placed')
     def mark_as_placed(self, request, queryset):
-        updated = queryset.update(is_placed=True)
+        updated = facets.update_queryset(queryset, is_placed=True)
         self.message_user(request, f"{updated} employee(s) marked as placed.")
 
     @admin.action(description='Mark selected employees as Available')
     def mark_as_available(self, request, queryset):
-        updated = queryset.update(is_placed=False)
+        updated = facets.update_queryset(queryset, is_placed=False)
         self.message_user(request, f"{updated} employee(s) marked as available.")
 
 
 @admin.register(Contact)
-class ContactAdmin(admin.ModelAdmin):
+class ContactAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'email', 'phone', 'created_at')
     search_fields = ('name', 'email', 'message')
-    readonly_fields = ('created_at',)
+    readonly_fields = ('created_at', 'client_ip')
     ordering = ('-created_at',)
 
 
 @admin.register(Employer)
-class EmployerAdmin(admin.ModelAdmin):
+class EmployerAdmin(CsvImportMixin, LargeTableAdminMixin, admin.ModelAdmin):
+    import_kind = 'employers'
+    search_id_lookups = {'EMPR': 'pk'}
     list_display = ('employer_id', 'company_name', 'email', 'phone', 'industry', 'location', 'created_at')
     search_fields = ('id', 'company_name', 'email', 'industry', 'location')
     list_filter = ('industry', 'location', 'created_at')
-    readonly_fields = ('employer_id', 'created_at')
+    readonly_fields = ('employer_id', 'created_at', 'client_ip')
     ordering = ('-created_at',)
+    actions = [export_as_csv, export_as_xlsx]
     
     fieldsets = (
         ('Employer ID', {
@@ -81,20 +164,31 @@ class EmployerAdmin(admin.ModelAdmin):
 
 
 @admin.register(JobOpening)
-class JobOpeningAdmin(admin.ModelAdmin):
-    list_display = ('title', 'employer', 'location', 'job_type', 'is_active', 'created_at')
+class JobOpeningAdmin(CsvImportMixin, LargeTableAdminMixin, admin.ModelAdmin):
+    import_kind = 'job_openings'
+    facet_name = 'jobs'
+    list_select_related = ('employer',)
+    search_id_lookups = {'EMPR': 'employer_id'}
+    list_display = (
+        'title', 'employer', 'location', 'job_type', 'is_active', 'publish_at', 'expires_at', 'interest_count', 'created_at',
+    )
     search_fields = ('title', 'employer__company_name')
     list_filter = ('job_type', 'is_active', 'location', 'created_at')
+    readonly_fields = ('interest_count',)
     ordering = ('-created_at',)
+    actions = [export_as_csv, export_as_xlsx]
 
 
 @admin.register(EmployerInterest)
-class EmployerInterestAdmin(admin.ModelAdmin):
+class EmployerInterestAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('employer', 'employee_id_display', 'employee_name', 'employee_role', 'created_at')
     search_fields = ('employer__company_name', 'employee__name', 'employee__role')
     list_filter = ('employer', 'created_at')
+    list_select_related = ('employer', 'employee')
+    search_id_lookups = {'EMP': 'employee_id', 'EMPR': 'employer_id'}
     ordering = ('-created_at',)
     readonly_fields = ('employer', 'employee', 'created_at')
+    actions = [export_as_csv, export_as_xlsx]
 
     def employee_id_display(self, obj):
         return f"EMP-{obj.employee.id:04d}"
@@ -109,4 +203,124 @@ class EmployerInterestAdmin(admin.ModelAdmin):
     def employee_role(self, obj):
         return obj.employee.role
     employee_role.short_description = 'Role'
-    employee_role.admin_order_field = 'employee__role'
\ No newline at end of file
+    employee_role.admin_order_field = 'employee__role'
+
+
+@admin.register(EmployeeInterest)
+class EmployeeInterestAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('employee_id_display', 'employee_name', 'job', 'created_at')
+    search_fields = ('employee__name', 'job__title', 'job__employer__company_name')
+    list_filter = ('job', 'created_at')
+    # JobOpening.__str__ follows job.employer.
+    list_select_related = ('employee', 'job__employer')
+    search_id_lookups = {'EMP': 'employee_id', 'EMPR': 'job__employer_id'}
+    ordering = ('-created_at',)
+    readonly_fields = ('employee', 'job', 'created_at')
+    actions = [export_as_csv, export_as_xlsx]
+
+    def employee_id_display(self, obj):
+        return f"EMP-{obj.employee.id:04d}"
+    employee_id_display.short_description = 'Employee ID'
+    employee_id_display.admin_order_field = 'employee__id'
+
+    def employee_name(self, obj):
+        return obj.employee.name
+    employee_name.short_description = 'Candidate Name'
+    employee_name.admin_order_field = 'employee__name'
+
+
+class NormalizedAliasInline(admin.TabularInline):
+    model = NormalizedAlias
+    fields = ('key',)
+    extra = 0
+
+
+@admin.register(NormalizedValue)
+class NormalizedValueAdmin(admin.ModelAdmin):
+    list_display = ('name', 'kind')
+    list_filter = ('kind',)
+    search_fields = ('name', 'aliases__key')
+    inlines = [NormalizedAliasInline]
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        NormalizedAlias.objects.get_or_create(
+            kind=obj.kind, key=dimensions.normalize_key(obj.name), defaults={'value': obj}
+        )
+
+    def save_formset(self, request, form, formset, change):
+        for alias in formset.save(commit=False):
+            alias.kind = form.instance.kind
+            alias.key = dimensions.normalize_key(alias.key)
+            alias.save()
+        for alias in formset.deleted_objects:
+            alias.delete()
+        taskqueue.enqueue('remap_dimensions', {'kind': form.instance.kind})
+
+
+@admin.register(UnmappedValue)
+class UnmappedValueAdmin(admin.ModelAdmin):
+    list_display = ('raw_value', 'kind', 'occurrences', 'first_seen', 'last_seen')
+    list_filter = ('kind',)
+    search_fields = ('raw_value', 'key')
+    ordering = ('-occurrences',)
+    fields = ('kind', 'raw_value', 'key', 'occurrences', 'value')
+    readonly_fields = ('kind', 'raw_value', 'key', 'occurrences')
+    autocomplete_fields = ('value',)
+    actions = ['create_as_new_values']
+
+    def has_add_permission(self, request):
+        return False
+
+    def save_model(self, request, obj, form, change):
+        if obj.value_id:
+            dimensions.map_unmapped(obj, obj.value)
+        else:
+            super().save_model(request, obj, form, change)
+
+    @admin.action(description='Create selected spellings as new canonical values')
+    def create_as_new_values(self, request, queryset):
+        for unmapped in queryset:
+            dimensions.map_unmapped(unmapped, dimensions.create_value(unmapped.kind, unmapped.raw_value))
+        self.message_user(request, f"{len(queryset)} value(s) created and mapped.")
+
+
+@admin.register(BlockedNetwork)
+class BlockedNetworkAdmin(admin.ModelAdmin):
+    list_display = ('network', 'source', 'reason', 'expires_at', 'created_at')
+    list_filter = ('source',)
+    search_fields = ('network', 'reason')
+    ordering = ('-created_at',)
+    readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(Task)
+class TaskAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'priority', 'attempts', 'max_attempts', 'run_at', 'locked_by', 'created_at')
+    search_fields = ('name',)
+    list_filter = ('status', 'name', 'created_at')
+    ordering = ('-id',)
+    readonly_fields = ('attempts', 'locked_by', 'locked_at', 'last_error', 'created_at', 'finished_at')
+    actions = ['retry_tasks']
+
+    @admin.action(description='Retry selected tasks')
+    def retry_tasks(self, request, queryset):
+        updated = taskqueue.retry(queryset)
+        self.message_user(request, f"{updated} task(s) queued again.")
+
+
+@admin.register(DeadLetterTask)
+class DeadLetterTaskAdmin(TaskAdmin):
+    list_display = ('id', 'name', 'attempts', 'short_error', 'finished_at', 'created_at')
+    list_filter = ('name', 'finished_at')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).filter(status=Task.DEAD)
+
+    def has_add_permission(self, request):
+        return False
+
+    def short_error(self, obj):
+        lines = obj.last_error.strip().splitlines()
+        return lines[-1] if lines else ''
+    short_error.short_description = 'Last error'
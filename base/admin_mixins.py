@@ -0,0 +1,193 @@
+"""
+Changelist helpers for large tables.
+
+``LargeTableAdminMixin`` combines:
+
+* select-related defaults for every foreign key, so ``list_display``
+  callables that follow relations don't run one query per row;
+* ``EstimatedCountPaginator``, which reads the row estimate from the
+  database catalogue instead of running ``COUNT(*)`` on unfiltered lists;
+* cached choices for value and relation ``list_filter``s, which otherwise run
+  ``SELECT DISTINCT`` over the whole table on every changelist load;
+* for models with a ``facet_name``, value filters answered from the facet
+  cells (``base.facets``), with a count next to each choice;
+* an ``EMP-0042`` / ``EMPR-0042`` search shortcut that resolves straight to a
+  primary-key lookup;
+* changelist pages read from the replica when one is configured
+  (``base.db_routers``).
+"""
+import re
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections, models
+from django.utils.functional import cached_property
+from django.utils.translation import gettext as _
+
+from . import facets
+from .db_routers import use_replica_for_request
+
+ID_CODE_RE = re.compile(r'^\s*(EMPR|EMP)-?0*(\d+)\s*$', re.IGNORECASE)
+
+
+def filter_cache_timeout():
+    return getattr(settings, 'ADMIN_FILTER_CACHE_TIMEOUT', 300)
+
+
+def estimate_row_count(model, using='default'):
+    """
+    Return the planner's row estimate for ``model``'s table, or ``None`` when
+    the backend has no cheap estimate.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                [table],
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Uses the table estimate for unfiltered changelists of large tables.
+
+    Filtered or searched lists, and tables below
+    ``ADMIN_ESTIMATED_COUNT_THRESHOLD`` rows, still get an exact count.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is not None and not query.where:
+            estimate = estimate_row_count(queryset.model, using=queryset.db)
+            if estimate is not None and estimate >= getattr(settings, 'ADMIN_ESTIMATED_COUNT_THRESHOLD', 10000):
+                return estimate
+        return super().count
+
+
+class CachedAllValuesFieldListFilter(admin.AllValuesFieldListFilter):
+    """``AllValuesFieldListFilter`` whose DISTINCT values are cached."""
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        key = f'admin_filter:{model._meta.label_lower}:{field_path}'
+        choices = cache.get(key)
+        if choices is None:
+            choices = list(self.lookup_choices)
+            cache.set(key, choices, filter_cache_timeout())
+        self.lookup_choices = choices
+
+
+class CachedRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """``RelatedFieldListFilter`` whose (pk, label) choices are cached."""
+
+    def field_choices(self, field, request, model_admin):
+        key = f'admin_filter:{field.model._meta.label_lower}:{field.name}'
+        choices = cache.get(key)
+        if choices is None:
+            choices = [(pk, str(label)) for pk, label in super().field_choices(field, request, model_admin)]
+            cache.set(key, choices, filter_cache_timeout())
+        return choices
+
+
+class FacetFieldListFilter(admin.AllValuesFieldListFilter):
+    """
+    Choices and per-choice counts from ``FacetCell`` instead of the source table.
+
+    Counts honour the other facet filters in the query string; search terms
+    and non-facet filters are not reflected in them.
+    """
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        spec = facets.FACETS[model_admin.facet_name]
+        dimension = next(d for d in spec.dimensions if d.field == field_path and d.filterable)
+        filters = {}
+        for other in spec.dimensions:
+            value = request.GET.get(f'{other.field}__exact')
+            if other is not dimension and other.filterable and value not in (None, ''):
+                try:
+                    filters[other.name] = {model._meta.get_field(other.field).to_python(value)}
+                except ValidationError as e:
+                    # The changelist redirects to ?e=1, as for any other bad lookup.
+                    raise IncorrectLookupParameters(e)
+        result = facets.facet_counts(model_admin.facet_name, filters, [dimension.name])
+        self.facet_counts = {value: count for value, count in result['facets'][dimension.name]}
+        self.lookup_choices = sorted(self.facet_counts, key=str)
+
+    def choices(self, changelist):
+        # Always shows counts, so Django's own facet queries (?_facets) are never run.
+        yield {
+            'selected': self.lookup_val is None and self.lookup_val_isnull is None,
+            'query_string': changelist.get_query_string(remove=[self.lookup_kwarg, self.lookup_kwarg_isnull]),
+            'display': _('All'),
+        }
+        for value in self.lookup_choices:
+            count = self.facet_counts[value]
+            if value is None:
+                continue
+            value = str(value)
+            yield {
+                'selected': self.lookup_val is not None and value in self.lookup_val,
+                'query_string': changelist.get_query_string({self.lookup_kwarg: value}, [self.lookup_kwarg_isnull]),
+                'display': f'{value} ({count})',
+            }
+
+
+class LargeTableAdminMixin:
+    paginator = EstimatedCountPaginator
+    # The "N total" link next to search results costs a second COUNT(*).
+    show_full_result_count = False
+
+    # Maps an ID code prefix to the lookup it resolves to, e.g. {'EMP': 'pk'}.
+    search_id_lookups = {}
+
+    # Name of the base.facets spec whose cells back this model's value filters.
+    facet_name = None
+
+    def changelist_view(self, request, extra_context=None):
+        use_replica_for_request(request)
+        return super().changelist_view(request, extra_context)
+
+    def get_list_select_related(self, request):
+        if self.list_select_related is False:
+            return [field.name for field in self.model._meta.concrete_fields if field.many_to_one]
+        return self.list_select_related
+
+    def get_list_filter(self, request):
+        list_filter = []
+        for item in super().get_list_filter(request):
+            if isinstance(item, str) and '__' not in item:
+                field = self.model._meta.get_field(item)
+                if self.facet_name and facets.is_faceted_field(self.model, item):
+                    item = (item, FacetFieldListFilter)
+                elif field.many_to_one:
+                    item = (item, CachedRelatedFieldListFilter)
+                elif not field.choices and not isinstance(field, (models.BooleanField, models.DateField)):
+                    item = (item, CachedAllValuesFieldListFilter)
+            list_filter.append(item)
+        return list_filter
+
+    def get_search_results(self, request, queryset, search_term):
+        match = ID_CODE_RE.match(search_term or '')
+        if match:
+            lookup = self.search_id_lookups.get(match.group(1).upper())
+            if lookup:
+                return queryset.filter(**{lookup: int(match.group(2))}), False
+        return super().get_search_results(request, queryset, search_term)
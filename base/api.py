@@ -0,0 +1,228 @@
+"""
+Read-only JSON API (``/api/v1/``) for mobile and partner clients.
+
+``GET /api/v1/<resource>/`` returns ``{'results': […], 'next_cursor': …}``,
+newest first (``?sort=`` picks another keyset column), ``?limit=`` rows a
+page and ``?cursor=`` for the next one, using the same opaque keyset
+cursors as the job feed. ``GET /api/v1/<resource>/<id>/`` returns one
+object. ``?fields=id,title,…`` selects the fields returned; only those
+columns are fetched, through ``values()``. Responses carry an ETag and
+answer ``If-None-Match`` with 304.
+
+Clients sign in through the normal employee or employer login and send the
+session cookie. ``RESOURCES`` maps each resource to what each user type
+sees: ``interests`` are an employer's shortlist or a candidate's job
+interests, and only employers can list candidates.
+"""
+from django.core.files.storage import default_storage
+from django.db.models import F
+from django.http import JsonResponse
+
+from .db_routers import read_from_replica
+from .job_feed import FEED_SORTS, filter_jobs, live_jobs, page_size
+from .models import EmployeeInterest, Employer, EmployerInterest, Registration
+from .pagination import InvalidCursor, etag_json_response, keyset_page
+
+USER_TYPES = ('employee', 'employer')
+
+
+class Resource:
+    def __init__(self, fields, default_fields, queryset, sorts=None, filter_params=None, transforms=None):
+        # public name → ORM lookup
+        self.fields = fields
+        self.default_fields = default_fields
+        # Called with the signed-in user's id; returns what they may read.
+        self.queryset = queryset
+        # ?sort= → keyset column, the first being the default
+        self.sorts = sorts or {'newest': 'created_at'}
+        # Called with (queryset, request.GET) to apply the resource's filters.
+        self.filter_params = filter_params
+        # public name → function turning the stored value into the API value
+        self.transforms = transforms or {}
+
+    def parse_fields(self, params):
+        """The field names asked for with ``?fields=``. Raises ``ValueError`` for unknown ones."""
+        raw = params.get('fields', '').strip()
+        if not raw:
+            return list(self.default_fields)
+        names = list(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+        unknown = [name for name in names if name not in self.fields]
+        if unknown or not names:
+            raise ValueError(
+                f"Unknown field(s): {', '.join(unknown) or raw}. Choose from: {', '.join(self.fields)}"
+            )
+        return names
+
+    def select(self, queryset, names, *extra):
+        """``queryset.values()`` of ``names`` (plus ``'pk'`` and ``extra`` columns)."""
+        plain = [self.fields[name] for name in names if self.fields[name] == name]
+        renamed = {name: F(self.fields[name]) for name in names if self.fields[name] != name}
+        return queryset.values(*dict.fromkeys(['pk', *plain, *extra]), **renamed)
+
+    def serialize(self, row, names):
+        return {
+            name: self.transforms[name](row[name]) if name in self.transforms else row[name]
+            for name in names
+        }
+
+
+def file_url(value):
+    return default_storage.url(value) if value else None
+
+
+JOBS = Resource(
+    fields={
+        'id': 'id',
+        'title': 'title',
+        'employer_id': 'employer_id',
+        'company': 'employer__company_name',
+        'job_type': 'job_type',
+        'location': 'location',
+        'salary_range': 'salary_range',
+        'description': 'description',
+        'requirements': 'requirements',
+        'interest_count': 'interest_count',
+        'publish_at': 'publish_at',
+        'expires_at': 'expires_at',
+    },
+    default_fields=('id', 'title', 'company', 'job_type', 'location', 'salary_range', 'publish_at'),
+    queryset=lambda user_id: live_jobs(),
+    sorts=FEED_SORTS,
+    filter_params=filter_jobs,
+)
+
+CANDIDATES = Resource(
+    # What the employer dashboard shows; no contact details.
+    fields={
+        'id': 'id',
+        'name': 'name',
+        'role': 'role',
+        'location': 'location',
+        'qualification': 'qualification',
+        'experience': 'experience',
+        'skills': 'skills',
+        'plan': 'plan',
+        'is_placed': 'is_placed',
+        'shortlist_count': 'shortlist_count',
+        'has_photo': 'photo',
+        'created_at': 'created_at',
+    },
+    default_fields=('id', 'name', 'role', 'location', 'experience', 'is_placed'),
+    queryset=lambda user_id: Registration.objects.all(),
+    sorts={'newest': 'created_at', 'popular': 'shortlist_count'},
+    # The photo itself is served by registration_file, which checks the session.
+    transforms={'has_photo': bool},
+)
+
+EMPLOYERS = Resource(
+    fields={
+        'id': 'id',
+        'company_name': 'company_name',
+        'industry': 'industry',
+        'location': 'location',
+        'company_description': 'company_description',
+        'logo_url': 'logo',
+        'created_at': 'created_at',
+    },
+    default_fields=('id', 'company_name', 'industry', 'location'),
+    queryset=lambda user_id: Employer.objects.all(),
+    transforms={'logo_url': file_url},
+)
+
+SHORTLISTS = Resource(
+    fields={
+        'id': 'id',
+        'candidate_id': 'employee_id',
+        'candidate_name': 'employee__name',
+        'candidate_role': 'employee__role',
+        'created_at': 'created_at',
+    },
+    default_fields=('id', 'candidate_id', 'created_at'),
+    queryset=lambda user_id: EmployerInterest.objects.filter(employer_id=user_id),
+)
+
+JOB_INTERESTS = Resource(
+    fields={
+        'id': 'id',
+        'job_id': 'job_id',
+        'job_title': 'job__title',
+        'company': 'job__employer__company_name',
+        'created_at': 'created_at',
+    },
+    default_fields=('id', 'job_id', 'created_at'),
+    queryset=lambda user_id: EmployeeInterest.objects.filter(employee_id=user_id),
+)
+
+# resource → {user type: Resource}
+RESOURCES = {
+    'jobs': {'employee': JOBS, 'employer': JOBS},
+    'candidates': {'employer': CANDIDATES},
+    'employers': {'employee': EMPLOYERS, 'employer': EMPLOYERS},
+    'interests': {'employee': JOB_INTERESTS, 'employer': SHORTLISTS},
+}
+
+
+def session_user(request):
+    """``(user_type, id)`` of the signed-in employee or employer, or ``None``."""
+    user_type = request.session.get('user_type')
+    user_id = request.session.get(f'{user_type}_id') if user_type in USER_TYPES else None
+    return (user_type, user_id) if user_id is not None else None
+
+
+def resolve(request, resource):
+    """``(Resource, user id, None)``, or ``(None, None, error response)``."""
+    if resource not in RESOURCES:
+        return None, None, JsonResponse({'error': 'Unknown resource'}, status=404)
+    user = session_user(request)
+    if user is None:
+        return None, None, JsonResponse({'error': 'Not authenticated'}, status=401)
+    spec = RESOURCES[resource].get(user[0])
+    if spec is None:
+        return None, None, JsonResponse({'error': 'Not available to this account'}, status=403)
+    return spec, user[1], None
+
+
+@read_from_replica
+def api_list(request, resource):
+    spec, user_id, error = resolve(request, resource)
+    if error:
+        return error
+    try:
+        names = spec.parse_fields(request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    sort = request.GET.get('sort') or next(iter(spec.sorts))
+    if sort not in spec.sorts:
+        return JsonResponse({'error': f"Unknown sort. Choose from: {', '.join(spec.sorts)}"}, status=400)
+
+    queryset = spec.queryset(user_id)
+    if spec.filter_params:
+        queryset = spec.filter_params(queryset, request.GET)
+    sort_field = spec.sorts[sort]
+    try:
+        rows, next_cursor = keyset_page(
+            spec.select(queryset, names, sort_field), request.GET.get('cursor'), page_size(request.GET),
+            field=sort_field,
+        )
+    except InvalidCursor:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+    return etag_json_response(request, {
+        'results': [spec.serialize(row, names) for row in rows],
+        'next_cursor': next_cursor,
+    })
+
+
+@read_from_replica
+def api_detail(request, resource, pk):
+    spec, user_id, error = resolve(request, resource)
+    if error:
+        return error
+    try:
+        names = spec.parse_fields(request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    row = spec.select(spec.queryset(user_id).filter(pk=pk), names).first()
+    if row is None:
+        return JsonResponse({'error': 'Not found'}, status=404)
+    return etag_json_response(request, spec.serialize(row, names))
+
@@ -0,0 +1,141 @@
+"""
+Async versions of the dashboards, used when the site is served over ASGI
+(``acco/asgi.py`` turns on ``ASYNC_DASHBOARDS``).
+
+Each dashboard needs several independent queries. Django's async ORM
+methods (``aget``, ``acount`` …) all hand their work to the same single
+thread, so awaiting them together would still run them one after another.
+``gather_queries`` runs them on a bounded thread pool
+(``ASYNC_QUERY_WORKERS``) instead, each thread with its own connection, so
+the page waits for the slowest query rather than for the sum of them.
+The template is then rendered in the request's sync thread, where lazy
+lookups may still query the database. POSTs are passed to the sync views.
+"""
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.db import close_old_connections
+from django.shortcuts import redirect, render
+from django.utils import timezone
+
+from . import facets, views
+from .db_routers import read_from_replica
+from .job_feed import build_feed, recommended_jobs
+from .recommendations import recommended_ids
+from .models import Employer, EmployerInterest, EmployeeInterest, JobOpening, Recommendation, Registration, JOB_TYPES
+
+_executor = None
+
+
+def executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'ASYNC_QUERY_WORKERS', 8),
+            thread_name_prefix='dashboard-query',
+        )
+    return _executor
+
+
+def _run_query(func):
+    # The same connection housekeeping Django does around a request.
+    close_old_connections()
+    try:
+        return func()
+    finally:
+        close_old_connections()
+
+
+async def gather_queries(**queries):
+    """Run each zero-argument callable on the query pool and return ``{name: result}``."""
+    loop = asyncio.get_running_loop()
+    names = list(queries)
+    results = await asyncio.gather(*(
+        # copy_context() carries the replica routing state into the worker thread.
+        loop.run_in_executor(executor(), contextvars.copy_context().run, _run_query, queries[name])
+        for name in names
+    ))
+    return dict(zip(names, results))
+
+
+def _first(queryset):
+    return lambda: queryset.first()
+
+
+async def _render(request, template_name, context):
+    return await sync_to_async(render)(request, template_name, context)
+
+
+@login_required(login_url='/admin/login/')
+@read_from_replica
+async def registrations_dashboard(request):
+    if request.method == 'POST':
+        return await sync_to_async(views.registrations_dashboard)(request)
+
+    results = await gather_queries(
+        registrations=lambda: list(Registration.objects.all().order_by('-id')),
+        employers=lambda: list(Employer.objects.all().order_by('-id')),
+        job_openings=lambda: list(JobOpening.objects.all().order_by('-created_at')),
+        placed_count=Registration.objects.filter(is_placed=True).count,
+        interests=lambda: list(
+            EmployerInterest.objects.select_related('employer', 'employee').order_by('-created_at')
+        ),
+        employee_interests=lambda: list(
+            EmployeeInterest.objects.select_related('employee', 'job', 'job__employer').order_by('-created_at')
+        ),
+    )
+    results['now'] = timezone.now()
+    return await _render(request, 'base/registrations_dashboard.html', results)
+
+
+@read_from_replica
+async def employer_dashboard(request):
+    if request.method == 'POST':
+        return await sync_to_async(views.employer_dashboard)(request)
+    employer_id = await request.session.aget('employer_id')
+    if employer_id is None or await request.session.aget('user_type') != 'employer':
+        messages.error(request, "Please login to access your dashboard.")
+        return redirect('employer_login')
+
+    results = await gather_queries(
+        employer=_first(Employer.objects.filter(id=employer_id)),
+        employees=lambda: list(Registration.objects.all().order_by(*views.candidate_ordering(request))),
+        interested_ids=lambda: set(
+            EmployerInterest.objects.filter(employer_id=employer_id).values_list('employee_id', flat=True)
+        ),
+        candidate_facets=lambda: facets.facet_counts('registrations', dimensions=views.CANDIDATE_FACETS),
+        recommended_ids=lambda: recommended_ids(Recommendation.CANDIDATES, employer_id),
+    )
+    if results['employer'] is None:
+        return redirect('employer_login')
+    results['recommended'] = views.recommended_candidates(
+        results['employees'], results.pop('recommended_ids'), results['interested_ids']
+    )
+    for emp in results['employees']:
+        emp.experience_band = facets.experience_band(emp.experience)
+    results['sort'] = request.GET.get('sort', 'newest')
+    return await _render(request, 'base/employer_dashboard.html', results)
+
+
+@read_from_replica
+async def employee_dashboard(request):
+    if request.method == 'POST':
+        return await sync_to_async(views.employee_dashboard)(request)
+    employee_id = await request.session.aget('employee_id')
+    if employee_id is None or await request.session.aget('user_type') != 'employee':
+        messages.error(request, "Please login to access your dashboard.")
+        return redirect('employee_login')
+
+    results = await gather_queries(
+        employee=_first(Registration.objects.filter(id=employee_id)),
+        job_feed=lambda: build_feed(employee_id, {}),
+        recommended_jobs=lambda: recommended_jobs(employee_id),
+    )
+    if results['employee'] is None:
+        return redirect('employee_login')
+    return await _render(request, 'base/employee_dashboard.html', {**results, 'job_types': JOB_TYPES})
@@ -0,0 +1,203 @@
+"""
+Micro-benchmarks for the helpers that run on every request.
+
+Each benchmark is registered with ``@hot_path`` and returns a zero-argument
+callable. ``measure()`` times it with ``timeit`` and records the bytes
+allocated by a single call with ``tracemalloc``. Baselines live in
+``benchmark_baseline.json`` next to this module and are compared by the
+``benchmark_hot_paths`` management command.
+
+Absolute timings depend on the machine and whatever else it is doing, so
+every run also times ``reference()``, a fixed piece of plain Python, and
+each hot path is compared by its ``ratio`` to that: how many reference
+runs one call costs. ``ns_per_op`` is kept for reading only.
+"""
+import json
+import timeit
+import tracemalloc
+from pathlib import Path
+
+BASELINE_PATH = Path(__file__).resolve().parent / 'benchmark_baseline.json'
+
+# Allocation noise below this many bytes is never reported as a regression.
+ALLOC_SLACK_BYTES = 256
+
+HOT_PATHS = {}
+
+
+def hot_path(name):
+    """Register a benchmark factory under ``name``."""
+    def decorator(factory):
+        HOT_PATHS[name] = factory
+        return factory
+    return decorator
+
+
+REFERENCE_WORDS = tuple(f'  Word{i} ' for i in range(32))
+
+
+def reference():
+    """The yardstick: string methods, a dict and a loop, like the hot paths."""
+    seen = {}
+    for word in REFERENCE_WORDS:
+        key = word.strip().lower()
+        seen[key] = seen.get(key, 0) + len(key)
+    return seen
+
+
+def _request(**meta):
+    from django.test import RequestFactory
+    return RequestFactory().get('/', **meta)
+
+
+@hot_path('validators.validate_no_sql_injection')
+def bench_validate_no_sql_injection():
+    from .validators import validate_no_sql_injection
+    return lambda: validate_no_sql_injection('Senior accountant with IFRS and VAT experience')
+
+
+@hot_path('validators.validate_company_name')
+def bench_validate_company_name():
+    from .validators import validate_company_name
+    return lambda: validate_company_name('Al Noor Trading & Co. (LLC)')
+
+
+@hot_path('validators.validate_phone_number')
+def bench_validate_phone_number():
+    from .validators import validate_phone_number
+    return lambda: validate_phone_number('+971 50-123-4567')
+
+
+@hot_path('validators.validate_safe_email')
+def bench_validate_safe_email():
+    from .validators import validate_safe_email
+    return lambda: validate_safe_email('candidate.name@example.com')
+
+
+@hot_path('validators.validate_text_input')
+def bench_validate_text_input():
+    from .validators import validate_text_input
+    return lambda: validate_text_input('Bachelor of Commerce', min_length=2, max_length=100)
+
+
+@hot_path('decorators.get_client_ip')
+def bench_get_client_ip():
+    from .decorators import get_client_ip
+    request = _request(HTTP_X_FORWARDED_FOR='203.0.113.7, 10.0.0.1', REMOTE_ADDR='10.0.0.1')
+    return lambda: get_client_ip(request)
+
+
+@hot_path('decorators.rate_limit')
+def bench_rate_limit():
+    from .decorators import rate_limit
+
+    def benchmark_view(request):
+        return None
+
+    # A limit that is never reached keeps every call on the allowed path.
+    view = rate_limit(max_requests=10 ** 12, time_window=60)(benchmark_view)
+    request = _request(REMOTE_ADDR='198.51.100.23')
+    return lambda: view(request)
+
+
+@hot_path('ipblock.is_blocked')
+def bench_ipblock_is_blocked():
+    import ipaddress
+    import random
+    from .ipblock import Blocklist, PrefixTrie, client_addresses
+
+    rng = random.Random(0)
+    networks = [ipaddress.ip_network((rng.getrandbits(24) << 8, 24)) for _ in range(5000)]
+    networks += [ipaddress.ip_network((rng.getrandbits(48) << 80, 48)) for _ in range(5000)]
+    blocklist = Blocklist()
+    blocklist.trie = PrefixTrie(networks)
+    # The middleware's allowed path: a proxied client that isn't blocked.
+    request = _request(HTTP_X_FORWARDED_FOR='203.0.113.7, 10.0.0.1', REMOTE_ADDR='10.0.0.1')
+    return lambda: blocklist.is_blocked(client_addresses(request))
+
+
+@hot_path('models.hash_plaintext_password')
+def bench_hash_plaintext_password():
+    from .models import hash_plaintext_password
+    # Model saves almost always carry an already hashed password.
+    hashed = 'pbkdf2_sha256$1000000$salt$' + 'x' * 44
+    return lambda: hash_plaintext_password(hashed)
+
+
+def measure(func, repeat=5, number=None):
+    """
+    Return ``{'ns_per_op': ..., 'ratio': ..., 'alloc_bytes': ...}`` for
+    ``func``. Each repeat times ``func`` and then ``reference()``, so both
+    best times come from the same stretch of machine load.
+    """
+    func()  # warm caches (compiled regexes, cache backends, lazy imports)
+    timer, reference_timer = timeit.Timer(func), timeit.Timer(reference)
+    if number is None:
+        number, _ = timer.autorange()
+    reference_number, _ = reference_timer.autorange()
+    best = reference_best = float('inf')
+    for _ in range(repeat):
+        best = min(best, timer.timeit(number))
+        reference_best = min(reference_best, reference_timer.timeit(reference_number))
+
+    tracemalloc.start()
+    try:
+        func()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'ns_per_op': round(best / number * 1e9, 1),
+        'ratio': round((best / number) / (reference_best / reference_number), 3),
+        'alloc_bytes': max(peak - current, 0),
+    }
+
+
+def run(names=None, repeat=5):
+    """Measure the selected hot paths (all of them by default)."""
+    results = {}
+    for name, factory in HOT_PATHS.items():
+        if names and name not in names:
+            continue
+        results[name] = measure(factory(), repeat=repeat)
+    return results
+
+
+def load_baseline(path=BASELINE_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def find_regressions(results, baseline, threshold):
+    """
+    Compare ``results`` with ``baseline``.
+
+    Returns a list of ``(name, metric, baseline_value, current_value)`` for
+    every metric that grew by more than ``threshold`` (0.25 = 25%). Time is
+    compared through ``ratio``; baselines written before it existed are
+    only checked for allocations.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if 'ratio' in previous and current['ratio'] > previous['ratio'] * (1 + threshold):
+            regressions.append((name, 'ratio', previous['ratio'], current['ratio']))
+        allowed_alloc = previous['alloc_bytes'] * (1 + threshold) + ALLOC_SLACK_BYTES
+        if current['alloc_bytes'] > allowed_alloc:
+            regressions.append((name, 'alloc_bytes', previous['alloc_bytes'], current['alloc_bytes']))
+    return regressions
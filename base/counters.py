@@ -0,0 +1,87 @@
+"""
+Denormalized interest counters.
+
+``Registration.shortlist_count`` counts the ``EmployerInterest`` rows of a
+candidate and ``JobOpening.interest_count`` the ``EmployeeInterest`` rows of
+a job, so listings can sort by popularity on an index instead of grouping
+the interest tables. The signal handlers in ``base.signals`` add or remove
+one with an ``F()`` update in the same transaction as the interest row;
+that also covers admin deletes and cascades. ``manage.py
+reconcile_counters`` repairs drift (raw SQL, restored backups) in batches.
+"""
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import EmployeeInterest, EmployerInterest, JobOpening, Registration
+
+
+class CounterSpec:
+    def __init__(self, name, interest_model, fk_name, model, field):
+        self.name = name
+        self.interest_model = interest_model
+        self.fk_name = fk_name
+        self.model = model
+        self.field = field
+
+    @property
+    def fk_attname(self):
+        return self.interest_model._meta.get_field(self.fk_name).attname
+
+
+COUNTERS = {
+    'shortlists': CounterSpec('shortlists', EmployerInterest, 'employee', Registration, 'shortlist_count'),
+    'job_interests': CounterSpec('job_interests', EmployeeInterest, 'job', JobOpening, 'interest_count'),
+}
+
+
+def spec_for_interest(model):
+    for spec in COUNTERS.values():
+        if spec.interest_model is model:
+            return spec
+    return None
+
+
+def adjust(spec, object_id, delta):
+    """Add ``delta`` to the counter of ``object_id`` without letting it go below zero."""
+    rows = spec.model.objects.filter(pk=object_id)
+    if delta < 0:
+        rows = rows.filter(**{f'{spec.field}__gte': -delta})
+    rows.update(**{spec.field: F(spec.field) + delta})
+
+
+def reconcile(spec, batch_size=1000):
+    """
+    Recount ``spec`` for every row, ``batch_size`` primary keys at a time.
+
+    Returns ``(rows_scanned, rows_fixed)``.
+    """
+    scanned = fixed = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            # Locking the rows first makes a concurrent toggle's F() update wait
+            # until this batch commits, so it lands on top of the recount.
+            batch = list(
+                spec.model.objects.select_for_update()
+                .filter(pk__gt=last_id).order_by('pk').only('pk', spec.field)[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].pk
+            actual = dict(
+                spec.interest_model.objects.filter(**{f'{spec.fk_attname}__in': [obj.pk for obj in batch]})
+                .order_by()
+                .values_list(spec.fk_attname)
+                .annotate(rows=Count('pk'))
+            )
+            drifted = []
+            for obj in batch:
+                count = actual.get(obj.pk, 0)
+                if getattr(obj, spec.field) != count:
+                    setattr(obj, spec.field, count)
+                    drifted.append(obj)
+            if drifted:
+                spec.model.objects.bulk_update(drifted, [spec.field])
+        scanned += len(batch)
+        fixed += len(drifted)
+    return scanned, fixed
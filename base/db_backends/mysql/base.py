@@ -0,0 +1,18 @@
+"""
+MySQL backend with the optional in-process connection pool (``base.db_pool``).
+
+Set ``'ENGINE': 'base.db_backends.mysql'`` and a ``POOL`` dict in the
+database settings to enable it.
+"""
+from django.db.backends.mysql.base import Database, DatabaseWrapper as MySQLDatabaseWrapper
+
+from base.db_pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, MySQLDatabaseWrapper):
+    def ping_raw_connection(self, connection):
+        try:
+            connection.ping()
+        except Database.Error:
+            return False
+        return True
@@ -0,0 +1,197 @@
+"""
+In-process database connection pool.
+
+Django keeps one connection per thread and alias. ``CONN_MAX_AGE`` reuses
+it across requests, which is enough for one-thread-per-process WSGI
+workers. Under ASGI, or threaded workers, every thread opens its own
+connection. ``PooledDatabaseWrapperMixin`` puts a shared pool behind those
+per-thread wrappers instead:
+
+* ``connect()`` borrows an idle connection, or opens a new one while fewer
+  than ``SIZE + MAX_OVERFLOW`` are open. Otherwise it waits up to
+  ``TIMEOUT`` seconds for one to come back, then raises ``PoolTimeout``.
+* ``close()`` rolls back anything left open and returns the connection.
+  Connections beyond ``SIZE`` are closed instead of kept idle.
+* A borrowed connection is pinged when it has been idle for more than
+  ``PING_AFTER`` seconds. It is replaced when it is older than ``RECYCLE``
+  seconds (keep this below MySQL's ``wait_timeout``).
+
+It is configured with a ``POOL`` dict in the database settings and used
+together with ``CONN_MAX_AGE = 0``, so every request returns its
+connection to the pool.
+"""
+import threading
+import time
+from collections import deque
+
+from django.db import DatabaseError
+
+DEFAULT_POOL_OPTIONS = {
+    'SIZE': 5,
+    'MAX_OVERFLOW': 10,
+    'TIMEOUT': 30,
+    'RECYCLE': 3600,
+    'PING_AFTER': 30,
+}
+
+
+class PoolTimeout(DatabaseError):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, connect, ping, size=5, max_overflow=10, timeout=30, recycle=3600, ping_after=30):
+        self._connect = connect
+        self._ping = ping
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+        self._cond = threading.Condition()
+        # (connection, opened_at, released_at), most recently released last
+        self._idle = deque()
+        self._opened_at = {}
+        self._open = 0
+        self.stats = {'connects': 0, 'reuses': 0, 'discards': 0, 'waits': 0}
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._cond:
+                if self._idle:
+                    item = self._idle.pop()
+                elif self._open < self.size + self.max_overflow:
+                    self._open += 1
+                    item = None
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(
+                            f"No database connection available within {self.timeout}s "
+                            f"({self._open} open)"
+                        )
+                    self.stats['waits'] += 1
+                    self._cond.wait(remaining)
+                    continue
+
+            if item is None:
+                return self._open_new()
+            connection, opened_at, released_at = item
+            now = time.monotonic()
+            if self.recycle and now - opened_at > self.recycle:
+                self._discard(connection)
+                continue
+            if now - released_at > self.ping_after and not self._ping(connection):
+                self._discard(connection)
+                continue
+            self.stats['reuses'] += 1
+            return connection
+
+    def release(self, connection, reusable=True):
+        with self._cond:
+            opened_at = self._opened_at.get(id(connection))
+            if reusable and opened_at is not None and len(self._idle) < self.size:
+                self._idle.append((connection, opened_at, time.monotonic()))
+                self._cond.notify()
+                return
+        self._discard(connection)
+
+    def close_all(self):
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+        for connection, _opened_at, _released_at in idle:
+            self._discard(connection)
+
+    def _open_new(self):
+        try:
+            connection = self._connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._opened_at[id(connection)] = time.monotonic()
+            self.stats['connects'] += 1
+        return connection
+
+    def _discard(self, connection):
+        with self._cond:
+            # Connections from before close_pools() were never counted by this pool.
+            if self._opened_at.pop(id(connection), None) is not None:
+                self._open -= 1
+                self.stats['discards'] += 1
+                self._cond.notify()
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(wrapper):
+    """The pool for ``wrapper``'s alias, created on first use."""
+    with _pools_lock:
+        pool = _pools.get(wrapper.alias)
+        if pool is None:
+            options = {**DEFAULT_POOL_OPTIONS, **wrapper.settings_dict['POOL']}
+            pool = _pools[wrapper.alias] = ConnectionPool(
+                connect=wrapper.open_raw_connection,
+                ping=wrapper.ping_raw_connection,
+                size=options['SIZE'],
+                max_overflow=options['MAX_OVERFLOW'],
+                timeout=options['TIMEOUT'],
+                recycle=options['RECYCLE'],
+                ping_after=options['PING_AFTER'],
+            )
+        return pool
+
+
+def close_pools():
+    """Close every idle pooled connection and forget the pools."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Mix into a backend's ``DatabaseWrapper``. Without a ``POOL`` setting it
+    behaves exactly like the backend it wraps.
+    """
+
+    @property
+    def pool(self):
+        if not self.settings_dict.get('POOL'):
+            return None
+        return get_pool(self)
+
+    def open_raw_connection(self):
+        return super().get_new_connection(self.get_connection_params())
+
+    def ping_raw_connection(self, connection):
+        raise NotImplementedError
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        return pool.acquire()
+
+    def _close(self):
+        pool = self.pool
+        if pool is None or self.connection is None:
+            return super()._close()
+        reusable = not self.errors_occurred
+        if reusable and (self.in_atomic_block or not self.get_autocommit()):
+            try:
+                self.connection.rollback()
+            except Exception:
+                reusable = False
+        pool.release(self.connection, reusable=reusable)
@@ -0,0 +1,208 @@
+"""
+Read-replica routing.
+
+When ``DATABASES`` has a ``REPLICA_DATABASE`` alias, reads made by views
+marked with ``@read_from_replica`` (and by admin changelists) go to the
+replica. All other reads and every write go to ``default``. Reads fall
+back to the primary when:
+
+* the request is pinned: the same browser wrote something less than
+  ``REPLICA_PIN_SECONDS`` ago (tracked with a cookie set by
+  ``ReplicaPinMiddleware``), so it reads its own writes;
+* the current request has already written, or is inside a transaction
+  on the primary;
+* the replica lags by more than ``REPLICA_MAX_LAG`` seconds, or can't be
+  reached. Lag is checked at most every ``REPLICA_LAG_CHECK_INTERVAL``
+  seconds per process.
+
+Sessions are always read from and written to the primary, and session
+writes don't pin: a login must be visible on the very next request.
+Outside requests, ``with replica_reads():`` opts a block in.
+"""
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+PIN_COOKIE = 'db_pin'
+
+# Apps whose rows must never be read stale, and whose writes don't pin.
+PRIMARY_ONLY_APPS = {'sessions'}
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class RoutingState:
+    def __init__(self, use_replica=False, pinned=False):
+        self.use_replica = use_replica
+        self.pinned = pinned
+        self.wrote = False
+
+
+_state = contextvars.ContextVar('db_routing_state', default=None)
+
+# alias → (monotonic time of the check, replica usable)
+_health = {}
+
+
+def replica_alias():
+    return getattr(settings, 'REPLICA_DATABASE', 'replica')
+
+
+def pin_seconds():
+    return getattr(settings, 'REPLICA_PIN_SECONDS', 10)
+
+
+def replica_lag(alias):
+    """Seconds the replica is behind, ``0`` if it isn't replicating, ``None`` if replication is broken."""
+    connection = connections[alias]
+    if connection.vendor != 'mysql':
+        return 0
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute('SHOW REPLICA STATUS')
+        except DatabaseError:
+            # MySQL < 8.0.22 / MariaDB
+            cursor.execute('SHOW SLAVE STATUS')
+        row = cursor.fetchone()
+        if row is None:
+            return 0
+        columns = [column[0] for column in cursor.description]
+    status = dict(zip(columns, row))
+    return status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+
+
+def replica_available():
+    alias = replica_alias()
+    if alias not in settings.DATABASES:
+        return False
+    now = time.monotonic()
+    checked = _health.get(alias)
+    if checked and now - checked[0] < getattr(settings, 'REPLICA_LAG_CHECK_INTERVAL', 10):
+        return checked[1]
+    try:
+        lag = replica_lag(alias)
+    except DatabaseError as e:
+        logger.warning("Replica %s unavailable, reading from the primary: %s", alias, e)
+        lag = None
+    healthy = lag is not None and lag <= getattr(settings, 'REPLICA_MAX_LAG', 5)
+    if not healthy and lag is not None:
+        logger.warning("Replica %s is %ss behind, reading from the primary", alias, lag)
+    _health[alias] = (now, healthy)
+    return healthy
+
+
+def use_replica_for_request(request):
+    """Let the rest of ``request`` (including template rendering) read from the replica."""
+    state = _state.get()
+    if state is not None and request.method in SAFE_METHODS:
+        state.use_replica = True
+
+
+def read_from_replica(view_func):
+    """Mark a read-only view (sync or async) as safe to serve from the replica."""
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            use_replica_for_request(request)
+            return await view_func(request, *args, **kwargs)
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        use_replica_for_request(request)
+        return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def replica_reads():
+    """Route the reads in this block to the replica (for commands and tasks)."""
+    token = _state.set(RoutingState(use_replica=True))
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return DEFAULT_DB_ALIAS
+        state = _state.get()
+        if state is None or not state.use_replica or state.pinned or state.wrote:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return replica_alias() if replica_available() else None
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None and model._meta.app_label not in PRIMARY_ONLY_APPS:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == replica_alias():
+            return False
+        return None
+
+
+class ReplicaPinMiddleware:
+    """Tracks writes per request and pins the browser to the primary for a while after one."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RoutingState(pinned=self.is_pinned(request))
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.process_response(request, response, state)
+
+    async def __acall__(self, request):
+        state = RoutingState(pinned=self.is_pinned(request))
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.process_response(request, response, state)
+
+    def process_response(self, request, response, state):
+        if state.wrote:
+            response.set_cookie(
+                PIN_COOKIE, str(int(time.time())), max_age=pin_seconds(),
+                httponly=True, samesite='Lax', secure=request.is_secure(),
+            )
+        return response
+
+    def is_pinned(self, request):
+        try:
+            wrote_at = int(request.COOKIES.get(PIN_COOKIE, ''))
+        except ValueError:
+            return False
+        return time.time() - wrote_at < pin_seconds()
@@ -2,18 +2,38 @@ from django.core.cache import cache
 from django.http import JsonResponse, HttpResponse
 from functools import wraps
 import hashlib
+import ipaddress
+
+from .ipblock import is_trusted_proxy, record_rate_limit_block
 
 
 def get_client_ip(request):
-    """Get the client's IP address from the request."""
-    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-    if x_forwarded_for:
-        ip = x_forwarded_for.split(',')[0]
-    else:
-        ip = request.META.get('REMOTE_ADDR')
+    """
+    The client's IP address: ``REMOTE_ADDR``, or when that is one of
+    ``TRUSTED_PROXIES``, the rightmost ``X-Forwarded-For`` hop that isn't.
+    Hops further left were sent by the client and can say anything.
+    """
+    ip = request.META.get('REMOTE_ADDR', '')
+    if not is_trusted_proxy(ip):
+        return ip
+    for hop in reversed(request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')):
+        hop = hop.strip()
+        if not hop:
+            continue
+        ip = hop
+        if not is_trusted_proxy(hop):
+            break
     return ip
 
 
+def get_valid_client_ip(request):
+    """``get_client_ip`` if it is a well-formed address, else ``None`` (for storing with a submission)."""
+    try:
+        return str(ipaddress.ip_address((get_client_ip(request) or '').strip()))
+    except ValueError:
+        return None
+
+
 def rate_limit(max_requests=5, time_window=60, block_duration=300):
     """
     Rate limiting decorator.
@@ -47,6 +67,8 @@ def rate_limit(max_requests=5, time_window=60, block_duration=300):
                 # Block the IP
                 cache.set(block_key, True, block_duration)
                 cache.delete(cache_key)
+                # Repeat offenders go on the site-wide blocklist
+                record_rate_limit_block(ip)
 
                 if request.method == 'POST':
                     return JsonResponse({
@@ -0,0 +1,222 @@
+"""
+Normalized candidate dimensions.
+
+``Registration`` keeps what the candidate typed in ``location``, ``role``,
+``qualification``, ``nationality`` and ``experience``. Alongside those it
+keeps indexed columns that can be filtered without string matching:
+
+* ``experience_months``, parsed from text such as "3 years", "18 months"
+  or "Fresher";
+* ``normalized_<kind>`` foreign keys to ``NormalizedValue``, found by
+  looking up the spelling's normalized key in ``NormalizedAlias``.
+
+A spelling with no alias leaves the foreign key empty and is counted in
+``UnmappedValue`` for staff to map in the admin, once per save that sets
+it. Mapping one enqueues ``remap_dimensions``, which fills in the rows
+still waiting for it.
+``manage.py backfill_dimensions`` applies all of this to existing rows.
+"""
+import re
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import NormalizedAlias, NormalizedValue, Registration, UnmappedValue
+
+# kind → (free-text field, foreign key field)
+KIND_FIELDS = {
+    'location': ('location', 'normalized_location'),
+    'role': ('role', 'normalized_role'),
+    'qualification': ('qualification', 'normalized_qualification'),
+    'nationality': ('nationality', 'normalized_nationality'),
+}
+
+SOURCE_FIELDS = list(Registration.DIMENSION_SOURCE_FIELDS)
+NORMALIZED_FIELDS = ['experience_months'] + [fk_field for _raw, fk_field in KIND_FIELDS.values()]
+
+NON_WORD_RE = re.compile(r'[\W_]+', re.UNICODE)
+NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+
+# Upper bound in months (exclusive) → label.
+EXPERIENCE_BANDS = (
+    (12, '0-1 years'),
+    (36, '1-3 years'),
+    (60, '3-5 years'),
+    (120, '5-10 years'),
+)
+EXPERIENCE_BAND_MAX = '10+ years'
+EXPERIENCE_UNKNOWN = 'Not specified'
+
+
+def normalize_key(text):
+    """Case-, punctuation- and spacing-insensitive key: " Dubai,  U.A.E " → "dubai u a e"."""
+    return ' '.join(NON_WORD_RE.sub(' ', (text or '').casefold()).split())[:100]
+
+
+def parse_experience_months(text):
+    """Months of experience in free text, or ``None`` when there is no number."""
+    text = (text or '').lower()
+    if 'fresh' in text:
+        return 0
+    match = NUMBER_RE.search(text)
+    if not match:
+        return None
+    number = float(match.group())
+    return round(number if 'month' in text else number * 12)
+
+
+def band_for_months(months):
+    if months is None:
+        return EXPERIENCE_UNKNOWN
+    for limit, label in EXPERIENCE_BANDS:
+        if months < limit:
+            return label
+    return EXPERIENCE_BAND_MAX
+
+
+def experience_band(text):
+    """Experience band label for free-text experience."""
+    return band_for_months(parse_experience_months(text))
+
+
+def resolve_keys(wanted):
+    """Map ``{kind: {key, …}}`` to ``{(kind, key): NormalizedValue id}`` in one query."""
+    condition = Q()
+    for kind, keys in wanted.items():
+        if keys:
+            condition |= Q(kind=kind, key__in=keys)
+    if not condition:
+        return {}
+    return {
+        (kind, key): value_id
+        for kind, key, value_id in NormalizedAlias.objects.filter(condition).values_list('kind', 'key', 'value_id')
+    }
+
+
+def create_value(kind, name):
+    """Get or create the canonical value ``name``, alias its own spelling and take it off the review queue."""
+    key = normalize_key(name)
+    value, _created = NormalizedValue.objects.get_or_create(kind=kind, name=name.strip())
+    NormalizedAlias.objects.get_or_create(kind=kind, key=key, defaults={'value': value})
+    UnmappedValue.objects.filter(kind=kind, key=key).delete()
+    return value
+
+
+def map_unmapped(unmapped, value):
+    """Alias ``unmapped``'s spelling to ``value``, drop it from the queue and fill in waiting rows."""
+    from .taskqueue import enqueue
+
+    with transaction.atomic():
+        NormalizedAlias.objects.update_or_create(kind=unmapped.kind, key=unmapped.key, defaults={'value': value})
+        UnmappedValue.objects.filter(pk=unmapped.pk).delete()
+        transaction.on_commit(lambda: enqueue('remap_dimensions', {'kind': unmapped.kind}))
+
+
+def apply_dimensions(registrations, create_missing=False):
+    """
+    Fill the normalized columns of ``registrations`` in place.
+
+    Costs one alias query for the whole list. Returns a ``Counter`` of
+    ``(kind, key, raw_value)`` for spellings without an alias, or creates
+    canonical values for them when ``create_missing`` is set.
+    """
+    wanted = {kind: set() for kind in KIND_FIELDS}
+    for registration in registrations:
+        registration.experience_months = parse_experience_months(registration.experience)
+        for kind, (raw_field, _fk_field) in KIND_FIELDS.items():
+            key = normalize_key(getattr(registration, raw_field))
+            if key:
+                wanted[kind].add(key)
+
+    resolved = resolve_keys(wanted)
+    unmapped = Counter()
+    for registration in registrations:
+        for kind, (raw_field, fk_field) in KIND_FIELDS.items():
+            raw = getattr(registration, raw_field) or ''
+            key = normalize_key(raw)
+            value_id = resolved.get((kind, key)) if key else None
+            if key and value_id is None:
+                if create_missing:
+                    value_id = resolved[(kind, key)] = create_value(kind, raw).id
+                else:
+                    unmapped[(kind, key, raw.strip())] += 1
+            setattr(registration, f'{fk_field}_id', value_id)
+    return unmapped
+
+
+def normalize_changed(registration):
+    """
+    ``apply_dimensions`` for one registration being saved, skipped when it
+    was loaded from the database and no source field has been edited since.
+    Returns the unmapped spellings of the edited fields only, so saving a
+    row again doesn't count its spellings again.
+    """
+    loaded = getattr(registration, '_loaded_sources', {})
+    changed = {
+        field for field in SOURCE_FIELDS
+        if field not in loaded or getattr(registration, field) != loaded[field]
+    }
+    if not changed:
+        return Counter()
+    unmapped = apply_dimensions([registration])
+    registration._loaded_sources = {field: getattr(registration, field) for field in SOURCE_FIELDS}
+    return Counter({
+        (kind, key, raw): count for (kind, key, raw), count in unmapped.items()
+        if KIND_FIELDS[kind][0] in changed
+    })
+
+
+def record_unmapped(unmapped, replace=False):
+    """
+    Queue unmapped spellings for review.
+
+    Occurrences are added to existing queue entries, or overwritten with
+    ``replace`` (used by the backfill, which sees every row).
+    """
+    for (kind, key, raw), count in unmapped.items():
+        updated = UnmappedValue.objects.filter(kind=kind, key=key).update(
+            occurrences=count if replace else F('occurrences') + count,
+            last_seen=timezone.now(),
+        )
+        if not updated:
+            UnmappedValue.objects.get_or_create(
+                kind=kind, key=key, defaults={'raw_value': raw[:100], 'occurrences': count},
+            )
+
+
+def backfill(batch_size=500, create_missing=False, queryset=None):
+    """
+    Recompute the normalized columns for ``queryset`` (default: every registration).
+
+    Works in primary-key batches and only writes rows whose values changed.
+    Returns ``(rows_scanned, rows_updated, unmapped_counter)``.
+    """
+    queryset = (queryset if queryset is not None else Registration.objects.all()).only(
+        'id', *SOURCE_FIELDS, *NORMALIZED_FIELDS,
+    )
+    scanned = updated = 0
+    unmapped = Counter()
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id).order_by('id')[:batch_size])
+        if not batch:
+            break
+        last_id = batch[-1].id
+        before = {registration.id: _normalized(registration) for registration in batch}
+        unmapped.update(apply_dimensions(batch, create_missing=create_missing))
+        changed = [registration for registration in batch if _normalized(registration) != before[registration.id]]
+        if changed:
+            # bulk_update skips signals; none of these columns are faceted.
+            Registration.objects.bulk_update(changed, NORMALIZED_FIELDS, batch_size=batch_size)
+        scanned += len(batch)
+        updated += len(changed)
+    return scanned, updated, unmapped
+
+
+def _normalized(registration):
+    return tuple(
+        getattr(registration, field if field == 'experience_months' else f'{field}_id')
+        for field in NORMALIZED_FIELDS
+    )
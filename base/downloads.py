@@ -0,0 +1,150 @@
+"""
+Serving private media files (resumes, candidate photos) after a permission check.
+
+``serve_file`` hands the transfer to the front proxy when
+``SENDFILE_BACKEND`` is set. Nginx uses ``X-Accel-Redirect`` to an
+``internal`` location mapped onto ``MEDIA_ROOT``; Apache and lighttpd use
+``X-Sendfile``. The proxy then handles Range and caching itself. Without a
+proxy the file goes out as a ``FileResponse`` (``sendfile`` under
+gunicorn) with single-range ``206`` responses and ETag revalidation.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils.http import content_disposition_header, http_date, parse_etags, parse_http_date_safe
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFile:
+    """
+    A read window over an open file.
+
+    ``read()`` stops after ``length`` bytes; ``fileno()`` is passed through
+    so ``wsgi.file_wrapper`` can still ``sendfile`` from the current offset,
+    bounded by the response's Content-Length.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    Return ``(start, end)`` (inclusive) for a single ``bytes=`` range.
+
+    Returns ``None`` to serve the whole file (missing, malformed or
+    multi-range headers) and raises ``ValueError`` when the range can't be
+    satisfied.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+        if start >= size:
+            raise ValueError(header)
+    else:
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            # An empty file has no last N bytes to send.
+            raise ValueError(header)
+        start, end = max(size - suffix, 0), size - 1
+    return start, end
+
+
+def file_etag(stat):
+    return f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+
+
+def _proxy_response(backend, path, content_type):
+    response = HttpResponse(content_type=content_type)
+    if backend == 'x-accel-redirect':
+        relative = os.path.relpath(path, settings.MEDIA_ROOT)
+        prefix = getattr(settings, 'SENDFILE_URL_PREFIX', '/protected-media/')
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(relative.replace(os.sep, '/'))
+    elif backend == 'x-sendfile':
+        response['X-Sendfile'] = path
+    else:
+        raise ValueError(f"Unknown SENDFILE_BACKEND '{backend}'")
+    return response
+
+
+def serve_file(request, field_file):
+    """Stream ``field_file`` (a model ``FieldFile``) to an already-authorized request."""
+    if not field_file:
+        raise Http404("No file")
+    path = os.path.abspath(field_file.path)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise Http404("File not found")
+
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    disposition = content_disposition_header(False, os.path.basename(path))
+    backend = getattr(settings, 'SENDFILE_BACKEND', '')
+
+    if backend:
+        response = _proxy_response(backend, path, content_type)
+        response['Content-Disposition'] = disposition
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    etag = file_etag(stat)
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None and ('*' in if_none_match or etag in parse_etags(if_none_match)):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if range_header and (not if_range or if_range == etag or parse_http_date_safe(if_range) == int(stat.st_mtime)):
+        try:
+            byte_range = parse_range(range_header, stat.st_size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+
+    if byte_range is None:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = FileResponse(RangeFile(open(path, 'rb'), start, length), status=206, content_type=content_type)
+        response['Content-Length'] = length
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+
+    response['Content-Disposition'] = disposition
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,364 @@
+"""
+Streaming CSV/XLSX exports.
+
+Rows are read in keyset batches with ``values_list()`` and written straight
+into a ``StreamingHttpResponse`` so memory use does not grow with the table
+size.
+"""
+import csv
+import datetime
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.core.exceptions import ValidationError
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Registration, Employer, JobOpening, EmployerInterest, EmployeeInterest
+
+CHUNK_SIZE = 2000
+
+# Spreadsheet apps execute cells starting with these characters as formulas.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# Characters that are not allowed anywhere in an XML 1.0 document.
+ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def employee_code(value):
+    return f"EMP-{value:04d}"
+
+
+def employer_code(value):
+    return f"EMPR-{value:04d}"
+
+
+class ExportSpec:
+    """Describes the columns and the allowed filters of one export."""
+
+    def __init__(self, model, columns, filters=(), date_field='created_at'):
+        self.model = model
+        self.columns = columns
+        self.filters = filters
+        self.date_field = date_field
+
+    @property
+    def headers(self):
+        return [header for header, _field, _formatter in self.columns]
+
+    @property
+    def fields(self):
+        return [field for _header, field, _formatter in self.columns]
+
+    def filter_queryset(self, queryset, params):
+        """
+        Apply the same filters the admin changelist offers.
+
+        ``params`` uses the admin's query-string names, e.g. ``plan=premium``,
+        ``is_placed=1``, ``employer=4``, ``created_at__gte=2025-01-01`` (or
+        the full datetime the admin's date filter links to). Raises
+        ``ValueError`` for a value that can't be parsed.
+        """
+        lookups = {}
+        for name in self.filters:
+            value = params.get(name) or params.get(f'{name}__exact') or params.get(f'{name}__id__exact')
+            if value in (None, ''):
+                continue
+            field = self.model._meta.get_field(name)
+            if field.get_internal_type() == 'BooleanField':
+                value = value.lower() in ('1', 'true', 'yes', 'on')
+            else:
+                try:
+                    value = (field.target_field if field.is_relation else field).to_python(value)
+                except ValidationError:
+                    raise ValueError(f"Invalid value for {name}: {value!r}")
+            lookups[name if not field.is_relation else f'{name}_id'] = value
+        for suffix in ('gte', 'lt'):
+            name = f'{self.date_field}__{suffix}'
+            value = (params.get(name) or '').strip()
+            if not value:
+                continue
+            try:
+                moment, day = parse_datetime(value), parse_date(value)
+            except ValueError:
+                moment = day = None
+            if moment is not None:
+                if timezone.is_naive(moment):
+                    moment = timezone.make_aware(moment)
+                lookups[name] = moment
+            elif day is not None:
+                lookups[f'{self.date_field}__date__{suffix}'] = day
+            else:
+                raise ValueError(f"Invalid date for {name}: {value!r}")
+        return queryset.filter(**lookups)
+
+    def rows(self, queryset):
+        """
+        Yield formatted rows newest first, ``CHUNK_SIZE`` at a time.
+
+        mysqlclient buffers a whole result set client-side even with
+        ``iterator()``, so batches are fetched by primary-key keyset instead
+        of one big query.
+        """
+        formatters = [formatter for _header, _field, formatter in self.columns]
+        queryset = queryset.order_by('-pk').values_list('pk', *self.fields)
+        last_pk = None
+        while True:
+            batch = queryset if last_pk is None else queryset.filter(pk__lt=last_pk)
+            batch = list(batch[:CHUNK_SIZE].iterator())
+            if not batch:
+                return
+            last_pk = batch[-1][0]
+            for row in batch:
+                yield [
+                    formatter(value) if formatter and value is not None else value
+                    for formatter, value in zip(formatters, row[1:])
+                ]
+
+
+EXPORTS = {
+    'registrations': ExportSpec(
+        Registration,
+        columns=[
+            ('Employee ID', 'id', employee_code),
+            ('Name', 'name', None),
+            ('Email', 'email', None),
+            ('Phone', 'phone', None),
+            ('Nationality', 'nationality', None),
+            ('Location', 'location', None),
+            ('Qualification', 'qualification', None),
+            ('Experience', 'experience', None),
+            ('Role', 'role', None),
+            ('Skills', 'skills', None),
+            ('Plan', 'plan', None),
+            ('Placed', 'is_placed', None),
+            ('Resume', 'resume', None),
+            ('Registered', 'created_at', None),
+        ],
+        filters=('is_placed', 'experience', 'qualification', 'plan', 'location'),
+    ),
+    'employers': ExportSpec(
+        Employer,
+        columns=[
+            ('Employer ID', 'id', employer_code),
+            ('Company', 'company_name', None),
+            ('Email', 'email', None),
+            ('Phone', 'phone', None),
+            ('Industry', 'industry', None),
+            ('Location', 'location', None),
+            ('Description', 'company_description', None),
+            ('Registered', 'created_at', None),
+        ],
+        filters=('industry', 'location'),
+    ),
+    'job_openings': ExportSpec(
+        JobOpening,
+        columns=[
+            ('Job ID', 'id', None),
+            ('Title', 'title', None),
+            ('Employer ID', 'employer_id', employer_code),
+            ('Company', 'employer__company_name', None),
+            ('Location', 'location', None),
+            ('Job Type', 'job_type', None),
+            ('Salary Range', 'salary_range', None),
+            ('Active', 'is_active', None),
+            ('Requirements', 'requirements', None),
+            ('Description', 'description', None),
+            ('Posted', 'created_at', None),
+            ('Published', 'publish_at', None),
+            ('Expires', 'expires_at', None),
+        ],
+        filters=('job_type', 'is_active', 'location'),
+    ),
+    'employer_interests': ExportSpec(
+        EmployerInterest,
+        columns=[
+            ('Employer ID', 'employer_id', employer_code),
+            ('Company', 'employer__company_name', None),
+            ('Employee ID', 'employee_id', employee_code),
+            ('Candidate Name', 'employee__name', None),
+            ('Role', 'employee__role', None),
+            ('Shortlisted', 'created_at', None),
+        ],
+        filters=('employer',),
+    ),
+    'employee_interests': ExportSpec(
+        EmployeeInterest,
+        columns=[
+            ('Employee ID', 'employee_id', employee_code),
+            ('Candidate Name', 'employee__name', None),
+            ('Job ID', 'job_id', None),
+            ('Job Title', 'job__title', None),
+            ('Company', 'job__employer__company_name', None),
+            ('Applied', 'created_at', None),
+        ],
+        filters=('job',),
+    ),
+}
+
+
+def get_export(dataset):
+    try:
+        return EXPORTS[dataset]
+    except KeyError:
+        raise Http404(f"Unknown export: {dataset}")
+
+
+def spec_for_model(model):
+    for spec in EXPORTS.values():
+        if spec.model is model:
+            return spec
+    raise LookupError(f"No export defined for {model.__name__}")
+
+
+def _cell_text(value, escape_formulas=True):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'Yes' if value else 'No'
+    if isinstance(value, datetime.datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    text = str(value)
+    if escape_formulas and text.startswith(FORMULA_PREFIXES):
+        text = "'" + text
+    return text
+
+
+class Echo:
+    """File-like object whose ``write`` simply returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(headers, rows):
+    writer = csv.writer(Echo())
+    yield '\ufeff'  # BOM so Excel opens UTF-8 correctly
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow([_cell_text(value) for value in row])
+
+
+class _ChunkBuffer:
+    """Non-seekable sink for ``zipfile``; written bytes are drained by the generator."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def _xlsx_cell(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c t="n"><v>{value}</v></c>'
+    # Inline strings are never evaluated, so formula escaping is CSV-only.
+    text = escape(ILLEGAL_XML_CHARS.sub('', _cell_text(value, escape_formulas=False)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def stream_xlsx(headers, rows, sheet_name='Export', rows_per_chunk=500):
+    """
+    Yield an .xlsx workbook piece by piece.
+
+    The worksheet is written through ``zipfile`` into a non-seekable buffer,
+    so entries use data descriptors and nothing has to be held in memory
+    beyond the rows written since the last drain.
+    """
+    sink = _ChunkBuffer()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', XLSX_CONTENT_TYPES)
+        archive.writestr('_rels/.rels', XLSX_ROOT_RELS)
+        archive.writestr('xl/workbook.xml', XLSX_WORKBOOK.format(name=escape(sheet_name[:31])))
+        archive.writestr('xl/_rels/workbook.xml.rels', XLSX_WORKBOOK_RELS)
+        yield sink.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(('<row>' + ''.join(_xlsx_cell(h) for h in headers) + '</row>').encode())
+            pending = []
+            for row in rows:
+                pending.append('<row>' + ''.join(_xlsx_cell(value) for value in row) + '</row>')
+                if len(pending) >= rows_per_chunk:
+                    sheet.write(''.join(pending).encode())
+                    pending.clear()
+                    data = sink.drain()
+                    if data:
+                        yield data
+            sheet.write(''.join(pending).encode())
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.drain()
+
+
+def export_response(spec, queryset, fmt, filename):
+    """Build a streaming response for ``queryset`` in ``fmt`` ('csv' or 'xlsx')."""
+    rows = spec.rows(queryset)
+    if fmt == 'csv':
+        response = StreamingHttpResponse(stream_csv(spec.headers, rows), content_type='text/csv; charset=utf-8')
+    elif fmt == 'xlsx':
+        response = StreamingHttpResponse(
+            stream_xlsx(spec.headers, rows, sheet_name=filename),
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+    else:
+        raise Http404(f"Unknown export format: {fmt}")
+    stamp = timezone.localtime().strftime('%Y%m%d-%H%M')
+    response['Content-Disposition'] = f'attachment; filename="{filename}-{stamp}.{fmt}"'
+    return response
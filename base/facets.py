@@ -0,0 +1,251 @@
+"""
+Facet counts ("how many candidates per location, role, experience band …").
+
+Rather than counting the source table, each faceted model keeps a small
+``FacetCell`` table with one row per distinct combination of its dimension
+values and the number of rows sharing it. The signal handlers in
+``base.signals`` move rows between cells (-1 / +1) on save and delete, so
+the cells stay exact without recounting. Cells are cached, and
+``facet_counts`` combines them with any set of active filters in Python.
+A dimension is counted against the filters on the *other* dimensions, so
+a selected location still shows how many candidates the other locations
+have.
+
+Bulk writes that skip signals (``bulk_create``, ``QuerySet.update``) must go
+through ``add_instances`` / ``update_queryset``; ``manage.py rebuild_facets``
+recomputes everything from the source tables.
+"""
+import hashlib
+import json
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F
+
+from .dimensions import experience_band
+from .models import FacetCell, JobOpening, Registration
+
+
+class Dimension:
+    """One facet: a model field, optionally bucketed by ``transform``."""
+
+    def __init__(self, name, field, transform=None):
+        self.name = name
+        self.field = field
+        self.transform = transform
+
+    @property
+    def filterable(self):
+        """Whether the facet value equals the column value, so it can be used in a WHERE clause."""
+        return self.transform is None
+
+    def value(self, row):
+        value = row[self.field]
+        return self.transform(value) if self.transform else value
+
+
+class FacetSpec:
+    def __init__(self, name, model, dimensions):
+        self.name = name
+        self.model = model
+        self.dimensions = dimensions
+        self.fields = sorted({dimension.field for dimension in dimensions})
+
+    @property
+    def cache_key(self):
+        return f'facets:{self.name}'
+
+    def dimension(self, name):
+        for dimension in self.dimensions:
+            if dimension.name == name:
+                return dimension
+        raise KeyError(name)
+
+    def values_for(self, row):
+        return tuple(dimension.value(row) for dimension in self.dimensions)
+
+    def instance_row(self, instance):
+        return {field: getattr(instance, field) for field in self.fields}
+
+    def parse_filters(self, params):
+        """
+        ``{dimension: set(values)}`` from a QueryDict such as
+        ``?location=Dubai&plan=premium``. Raises ``ValueError`` for a value
+        the column can't hold, e.g. ``?is_placed=abc``.
+        """
+        filters = {}
+        for dimension in self.dimensions:
+            raw_values = [value for value in params.getlist(dimension.name) if value != '']
+            if not raw_values:
+                continue
+            if dimension.filterable:
+                model_field = self.model._meta.get_field(dimension.field)
+                try:
+                    raw_values = [model_field.to_python(value) for value in raw_values]
+                except ValidationError as e:
+                    raise ValueError(f"{dimension.name}: {'; '.join(e.messages)}")
+            filters[dimension.name] = set(raw_values)
+        return filters
+
+
+FACETS = {
+    'registrations': FacetSpec('registrations', Registration, [
+        Dimension('location', 'location'),
+        Dimension('role', 'role'),
+        Dimension('experience', 'experience', experience_band),
+        Dimension('qualification', 'qualification'),
+        Dimension('plan', 'plan'),
+        Dimension('is_placed', 'is_placed'),
+    ]),
+    'jobs': FacetSpec('jobs', JobOpening, [
+        Dimension('location', 'location'),
+        Dimension('job_type', 'job_type'),
+        Dimension('is_active', 'is_active'),
+    ]),
+}
+
+
+def spec_for_model(model):
+    for spec in FACETS.values():
+        if spec.model is model:
+            return spec
+    return None
+
+
+def cell_key(values):
+    encoded = json.dumps(values, separators=(',', ':'), default=str)
+    return hashlib.sha1(encoded.encode()).hexdigest()
+
+
+def _invalidate(spec):
+    transaction.on_commit(lambda: cache.delete(spec.cache_key))
+
+
+def apply_deltas(spec, deltas):
+    """Add ``deltas`` (``{values: change}``) to the matching cells, creating cells as needed."""
+    for values, delta in deltas.items():
+        if not delta:
+            continue
+        key = cell_key(values)
+        cells = FacetCell.objects.filter(facet=spec.name, key=key)
+        if cells.update(count=F('count') + delta):
+            continue
+        try:
+            with transaction.atomic():
+                FacetCell.objects.create(facet=spec.name, key=key, values=list(values), count=delta)
+        except IntegrityError:
+            # Another request created the cell first.
+            cells.update(count=F('count') + delta)
+    _invalidate(spec)
+
+
+def record_change(spec, old_row, new_row):
+    """Move one row from the cell of ``old_row`` to the cell of ``new_row`` (either may be ``None``)."""
+    deltas = Counter()
+    if old_row is not None:
+        deltas[spec.values_for(old_row)] -= 1
+    if new_row is not None:
+        deltas[spec.values_for(new_row)] += 1
+    apply_deltas(spec, deltas)
+
+
+def add_instances(objects):
+    """Count freshly ``bulk_create``d objects."""
+    objects = list(objects)
+    if not objects:
+        return
+    spec = spec_for_model(type(objects[0]))
+    apply_deltas(spec, Counter(spec.values_for(spec.instance_row(obj)) for obj in objects))
+
+
+def update_queryset(queryset, **changes):
+    """``queryset.update(**changes)`` that keeps the facet cells in step. Returns the row count."""
+    spec = spec_for_model(queryset.model)
+    with transaction.atomic():
+        groups = list(queryset.order_by().values(*spec.fields).annotate(rows=Count('pk')))
+        updated = queryset.update(**changes)
+        deltas = Counter()
+        for group in groups:
+            rows = group.pop('rows')
+            deltas[spec.values_for(group)] -= rows
+            deltas[spec.values_for({**group, **changes})] += rows
+        apply_deltas(spec, deltas)
+    return updated
+
+
+def rebuild(spec):
+    """Recount every cell of ``spec`` from its source table. Returns the number of cells."""
+    counts = Counter()
+    for group in spec.model.objects.order_by().values(*spec.fields).annotate(rows=Count('pk')):
+        counts[spec.values_for(group)] += group.pop('rows')
+    with transaction.atomic():
+        FacetCell.objects.filter(facet=spec.name).delete()
+        FacetCell.objects.bulk_create([
+            FacetCell(facet=spec.name, key=cell_key(values), values=list(values), count=count)
+            for values, count in counts.items()
+        ], batch_size=1000)
+    _invalidate(spec)
+    return len(counts)
+
+
+def load_cells(spec):
+    """``[(values, count), …]`` for ``spec``, from the cache when possible."""
+    cells = cache.get(spec.cache_key)
+    if cells is None:
+        cells = [
+            (tuple(values), count)
+            for values, count in FacetCell.objects.filter(facet=spec.name, count__gt=0).values_list('values', 'count')
+        ]
+        cache.set(spec.cache_key, cells, getattr(settings, 'FACET_CACHE_TIMEOUT', 300))
+    return cells
+
+
+def facet_counts(name, filters=None, dimensions=None):
+    """
+    Counts per value for each dimension of facet ``name`` under ``filters``.
+
+    ``filters`` maps dimension names to sets of accepted values. Returns
+    ``{'total': n, 'facets': {dimension: [(value, count), …]}}`` with each
+    list sorted by count, largest first.
+    """
+    spec = FACETS[name]
+    filters = filters or {}
+    positions = {dimension.name: index for index, dimension in enumerate(spec.dimensions)}
+    active = [(positions[dim], accepted) for dim, accepted in filters.items() if dim in positions]
+    wanted = dimensions or list(positions)
+
+    counters = {dim: Counter() for dim in wanted}
+    total = 0
+    for values, count in load_cells(spec):
+        failed = [index for index, accepted in active if values[index] not in accepted]
+        if not failed:
+            total += count
+        if len(failed) > 1:
+            continue
+        for dim in wanted:
+            index = positions[dim]
+            # Only the dimension's own filter may fail: it is ignored for its own counts.
+            if not failed or failed == [index]:
+                counters[dim][values[index]] += count
+
+    return {
+        'total': total,
+        'facets': {
+            dim: sorted(counter.items(), key=lambda item: (-item[1], str(item[0])))
+            for dim, counter in counters.items()
+        },
+    }
+
+
+def is_faceted_field(model, field_name):
+    """Whether admin filters on ``field_name`` can be answered from facet cells."""
+    spec = spec_for_model(model)
+    if spec is None:
+        return False
+    field = model._meta.get_field(field_name)
+    if field.choices or isinstance(field, models.BooleanField):
+        return False
+    return any(dimension.field == field_name and dimension.filterable for dimension in spec.dimensions)
@@ -0,0 +1,41 @@
+"""
+Process-pool password hashing.
+
+Kept free of model imports so spawned workers can unpickle these functions
+before ``django.setup()`` has run.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def _hash_password(password):
+    from django.contrib.auth.hashers import make_password
+    return make_password(password)
+
+
+def pool_size(workers=None):
+    """The number of processes for ``workers``; ``None`` means one per CPU."""
+    return workers or os.cpu_count() or 1
+
+
+def create_pool(workers=None):
+    """Start a pool of spawned (not forked) processes, so no DB connection is shared."""
+    return ProcessPoolExecutor(
+        max_workers=pool_size(workers),
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+    )
+
+
+def hash_passwords(passwords, pool=None, workers=1):
+    """Hash ``passwords`` in order, in ``pool`` (of ``workers`` processes) when one is given."""
+    if pool is None or len(passwords) < 2:
+        return [_hash_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    return list(pool.map(_hash_password, passwords, chunksize=chunksize))
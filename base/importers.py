@@ -0,0 +1,355 @@
+"""
+Bulk CSV import for candidates, employers and job openings.
+
+Rows are read from a text stream with ``csv.DictReader`` and processed in
+batches: each row is checked with the same validators the registration views
+use, duplicate emails are found with one query per batch, plaintext passwords
+are hashed in a process pool and the valid rows are written with a single
+``bulk_create`` inside a transaction.
+"""
+import csv
+import io
+import re
+
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from . import dimensions, facets
+from .hashing import create_pool, hash_passwords, pool_size
+from .models import Registration, Employer, JobOpening, HASHED_PASSWORD_PREFIX, JOB_TYPES, is_unusable_password
+from .validators import (
+    validate_company_name,
+    validate_phone_number,
+    validate_safe_email,
+    validate_text_input
+)
+
+DEFAULT_BATCH_SIZE = 1000
+
+EMPLOYER_REF_RE = re.compile(r'(?:EMPR-)?0*(\d+)', re.IGNORECASE)
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        # (line, message) of rows left out as duplicates, and of rows that failed
+        self.duplicates = []
+        self.errors = []
+
+    def add_duplicate(self, line, message):
+        self.duplicates.append((line, message))
+
+    def add_error(self, line, message):
+        self.errors.append((line, message))
+
+    @property
+    def skipped(self):
+        return len(self.duplicates)
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+
+class BaseImporter:
+    """
+    Subclasses set ``model`` and ``required_columns`` and implement
+    ``clean_row()``, which returns the model field values for one row or
+    raises ``ValidationError``.
+    """
+    model = None
+    required_columns = ()
+    unique_field = None
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, workers=None, dry_run=False):
+        self.batch_size = batch_size
+        self.workers = workers
+        self.dry_run = dry_run
+        self._pool = None
+        # unique_field values (lowercased) already taken in this run, across batches
+        self._seen = set()
+
+    def clean_row(self, row):
+        raise NotImplementedError
+
+    def prepare_batch(self, rows, result):
+        """Hook for per-batch lookups; returns the rows that should be created."""
+        return rows
+
+    def before_create(self, objects):
+        """Hook for filling in derived fields, called inside the batch's transaction."""
+
+    def run(self, stream):
+        """Import every row of ``stream`` (a text file object) and return an ``ImportResult``."""
+        result = ImportResult()
+        reader = csv.DictReader(stream)
+        header = [name.strip() for name in reader.fieldnames or []]
+        missing = [name for name in self.required_columns if name not in header]
+        if missing:
+            result.add_error(1, f"Missing column(s): {', '.join(missing)}")
+            return result
+        reader.fieldnames = header
+        self._seen = set()
+
+        try:
+            batch = []
+            for row in reader:
+                line = reader.line_num
+                try:
+                    batch.append((line, self.clean_row({k: (v or '').strip() for k, v in row.items() if k})))
+                except ValidationError as e:
+                    result.add_error(line, '; '.join(e.messages))
+                if len(batch) >= self.batch_size:
+                    self._process_batch(batch, result)
+                    batch = []
+            if batch:
+                self._process_batch(batch, result)
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+        return result
+
+    def _process_batch(self, rows, result):
+        if self.unique_field:
+            rows = self._dedupe(rows, result)
+        rows = self.prepare_batch(rows, result)
+        if not rows:
+            return
+        if any('password' in values for _line, values in rows):
+            self._hash_passwords(rows)
+        objects = [self.model(**values) for _line, values in rows]
+        if self.dry_run:
+            result.created += len(objects)
+            return
+        try:
+            with transaction.atomic():
+                self.before_create(objects)
+                self.model.objects.bulk_create(objects, batch_size=self.batch_size)
+                if facets.spec_for_model(self.model):
+                    # bulk_create skips the signals that maintain facet counts.
+                    facets.add_instances(objects)
+        except IntegrityError as e:
+            # A concurrent registration took one of the emails; report the batch.
+            for line, _values in rows:
+                result.add_error(line, f"Batch rejected by the database: {e}")
+            return
+        result.created += len(objects)
+
+    def _dedupe(self, rows, result):
+        field = self.unique_field
+        unique_rows = []
+        for line, values in rows:
+            key = values[field].lower()
+            if key in self._seen:
+                # Also when the first copy was in an earlier batch: a dry run never wrote it.
+                result.add_duplicate(line, f"Duplicate {field} in file: {values[field]}")
+                continue
+            self._seen.add(key)
+            unique_rows.append((line, values))
+
+        existing = {
+            value.lower()
+            for value in self.model.objects.filter(
+                **{f'{field}__in': [values[field] for _line, values in unique_rows]}
+            ).values_list(field, flat=True)
+        }
+        if not existing:
+            return unique_rows
+        kept = []
+        for line, values in unique_rows:
+            if values[field].lower() in existing:
+                result.add_duplicate(line, f"An account with this {field} already exists: {values[field]}")
+            else:
+                kept.append((line, values))
+        return kept
+
+    def _hash_passwords(self, rows):
+        pending = [
+            values for _line, values in rows
+            if values.get('password')
+            and not values['password'].startswith(HASHED_PASSWORD_PREFIX)
+            and not is_unusable_password(values['password'])
+        ]
+        if not pending:
+            return
+        workers = pool_size(self.workers)
+        if self._pool is None and workers > 1 and len(pending) > 1:
+            self._pool = create_pool(workers)
+        hashed = hash_passwords([values['password'] for values in pending], self._pool, workers)
+        for values, password in zip(pending, hashed):
+            values['password'] = password
+
+
+def _clean_password(password, required):
+    if not password:
+        if required:
+            # Imported accounts without a password must reset it before logging in.
+            return make_password(None)
+        return None
+    if password.startswith(HASHED_PASSWORD_PREFIX):
+        # Exported from another install; stored as is, so it must really be a hash.
+        try:
+            decoded = identify_hasher(password).decode(password)
+        except ValueError:
+            decoded = None
+        if not decoded or not decoded['salt'] or not decoded['hash']:
+            raise ValidationError("Password looks like a pbkdf2_sha256 hash but is malformed.")
+        return password
+    if len(password) < 6:
+        raise ValidationError("Password must be at least 6 characters long.")
+    if len(password) > 128:
+        raise ValidationError("Password is too long (max 128 characters).")
+    return password
+
+
+def _collect(checks):
+    """Run ``checks`` and raise one ValidationError listing every failure."""
+    errors = []
+    for label, check in checks:
+        try:
+            check()
+        except ValidationError as e:
+            errors.extend(f"{label}: {message}" for message in e.messages)
+    if errors:
+        raise ValidationError(errors)
+
+
+class CandidateImporter(BaseImporter):
+    model = Registration
+    required_columns = ('name', 'email', 'phone', 'nationality', 'location', 'qualification', 'experience', 'role')
+    unique_field = 'email'
+
+    def clean_row(self, row):
+        values = {name: row.get(name, '') for name in self.required_columns}
+        skills = row.get('skills', '')
+        plan = row.get('plan', '').lower() or 'basic'
+        _collect([
+            ('name', lambda: validate_text_input(values['name'], min_length=2, max_length=150)),
+            ('email', lambda: validate_safe_email(values['email'])),
+            ('phone', lambda: validate_phone_number(values['phone'])),
+            ('nationality', lambda: validate_text_input(values['nationality'], min_length=2, max_length=100)),
+            ('location', lambda: validate_text_input(values['location'], min_length=2, max_length=100)),
+            ('qualification', lambda: validate_text_input(values['qualification'], min_length=2, max_length=100)),
+            ('experience', lambda: validate_text_input(values['experience'], min_length=1, max_length=20)),
+            ('role', lambda: validate_text_input(values['role'], min_length=2, max_length=100)),
+            ('skills', lambda: validate_text_input(skills, min_length=0, max_length=2000)),
+        ])
+        if plan not in dict(Registration.PLAN_CHOICES):
+            raise ValidationError(f"plan: Invalid plan '{plan}'.")
+        values.update(
+            password=_clean_password(row.get('password', ''), required=False),
+            skills=skills or None,
+            plan=plan,
+            is_placed=row.get('is_placed', '').lower() in ('1', 'true', 'yes'),
+        )
+        return values
+
+    def before_create(self, objects):
+        # bulk_create skips the pre_save signal that normally fills these in.
+        dimensions.record_unmapped(dimensions.apply_dimensions(objects))
+
+
+class EmployerImporter(BaseImporter):
+    model = Employer
+    required_columns = ('company_name', 'email', 'phone', 'location', 'industry')
+    unique_field = 'email'
+
+    def clean_row(self, row):
+        values = {name: row.get(name, '') for name in self.required_columns}
+        description = row.get('company_description', '')
+        _collect([
+            ('company_name', lambda: validate_company_name(values['company_name'])),
+            ('email', lambda: validate_safe_email(values['email'])),
+            ('phone', lambda: validate_phone_number(values['phone'])),
+            ('location', lambda: validate_text_input(values['location'], min_length=2, max_length=100)),
+            ('industry', lambda: validate_text_input(values['industry'], min_length=2, max_length=100)),
+            ('company_description', lambda: validate_text_input(description, min_length=0, max_length=2000)),
+        ])
+        values.update(
+            password=_clean_password(row.get('password', ''), required=True),
+            company_description=description,
+        )
+        return values
+
+
+class JobOpeningImporter(BaseImporter):
+    """
+    The ``employer`` column accepts an employer email, a numeric id or an
+    ``EMPR-0042`` code.
+    """
+    model = JobOpening
+    required_columns = ('employer', 'title', 'description', 'requirements', 'location')
+
+    def clean_row(self, row):
+        values = {name: row.get(name, '') for name in self.required_columns}
+        salary_range = row.get('salary_range', '')
+        job_type = row.get('job_type', '') or 'Full-time'
+        _collect([
+            ('employer', lambda: validate_text_input(values['employer'], min_length=1, max_length=254)),
+            ('title', lambda: validate_text_input(values['title'], min_length=2, max_length=200)),
+            ('description', lambda: validate_text_input(values['description'], min_length=2, max_length=5000)),
+            ('requirements', lambda: validate_text_input(values['requirements'], min_length=2, max_length=5000)),
+            ('location', lambda: validate_text_input(values['location'], min_length=2, max_length=100)),
+            ('salary_range', lambda: validate_text_input(salary_range, min_length=0, max_length=50)),
+        ])
+        if job_type not in JOB_TYPES:
+            raise ValidationError(f"job_type: Must be one of {', '.join(JOB_TYPES)}.")
+        values.update(
+            salary_range=salary_range,
+            job_type=job_type,
+            is_active=row.get('is_active', '').lower() not in ('0', 'false', 'no'),
+        )
+        return values
+
+    def prepare_batch(self, rows, result):
+        ids = set()
+        emails = set()
+        for _line, values in rows:
+            employer_id = self._parse_employer_id(values['employer'])
+            if employer_id is None:
+                emails.add(values['employer'])
+            else:
+                ids.add(employer_id)
+
+        # One lookup resolves every employer referenced by the batch.
+        known_ids = set()
+        by_email = {}
+        for pk, email in Employer.objects.filter(Q(id__in=ids) | Q(email__in=emails)).values_list('id', 'email'):
+            known_ids.add(pk)
+            by_email[email.lower()] = pk
+
+        resolved = []
+        for line, values in rows:
+            ref = values.pop('employer')
+            employer_id = self._parse_employer_id(ref)
+            if employer_id is None:
+                employer_id = by_email.get(ref.lower())
+            elif employer_id not in known_ids:
+                employer_id = None
+            if employer_id is None:
+                result.add_error(line, f"employer: No employer found for '{ref}'.")
+                continue
+            values['employer_id'] = employer_id
+            resolved.append((line, values))
+        return resolved
+
+    @staticmethod
+    def _parse_employer_id(ref):
+        match = EMPLOYER_REF_RE.fullmatch(ref)
+        return int(match.group(1)) if match else None
+
+
+IMPORTERS = {
+    'candidates': CandidateImporter,
+    'employers': EmployerImporter,
+    'job_openings': JobOpeningImporter,
+}
+
+
+def open_upload(uploaded_file):
+    """Wrap an uploaded file as a text stream without reading it into memory."""
+    uploaded_file.seek(0)
+    return io.TextIOWrapper(uploaded_file.file, encoding='utf-8-sig', newline='')
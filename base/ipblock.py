@@ -0,0 +1,288 @@
+"""
+IP blocklist enforced by ``IPBlocklistMiddleware`` before sessions, views
+or the database see a request.
+
+Blocked IPv4/IPv6 ranges come from ``BlockedNetwork`` rows and, optionally,
+``IP_BLOCKLIST_FILE`` (one address or CIDR range per line, ``#`` comments).
+Each process compiles them into a ``PrefixTrie``: a multibit trie with one
+level per address byte, where ranges that don't end on a byte boundary are
+expanded into the byte values they cover. A lookup is at most 4 (IPv4) or
+16 (IPv6) dict lookups.
+
+Every ``IP_BLOCKLIST_CHECK_INTERVAL`` seconds a process compares a cheap
+signature of the table (row count, last change) and the file's mtime with
+what it compiled, and recompiles when they differ or an entry expired, so
+changes reach every worker without a restart.
+
+Entries are also added automatically: an address that keeps tripping
+``rate_limit`` is blocked for ``IP_BLOCKLIST_RATE_LIMIT_SECONDS``, and the
+cleanup commands block the addresses their findings were submitted from for
+``IP_BLOCKLIST_CLEANUP_SECONDS``. Only public addresses are blocked
+automatically: never loopback, private ranges or ``TRUSTED_PROXIES``, so a
+forged header can't get the reverse proxy itself blocked.
+"""
+import ipaddress
+import logging
+import os
+import socket
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.db.models import Count, Max, Min, Q
+from django.utils import timezone
+
+from .models import BlockedNetwork
+
+logger = logging.getLogger(__name__)
+
+V4_MAPPED_PREFIX = b'\0' * 10 + b'\xff\xff'
+
+# Marks a byte value whose whole subtree is blocked.
+BLOCKED = True
+
+
+def packed_address(address):
+    """``address`` as 4 or 16 bytes (IPv4-mapped IPv6 as IPv4), or ``None`` if it isn't an IP."""
+    try:
+        return socket.inet_pton(socket.AF_INET, address)
+    except OSError:
+        pass
+    try:
+        packed = socket.inet_pton(socket.AF_INET6, address.partition('%')[0])
+    except OSError:
+        return None
+    return packed[12:] if packed[:12] == V4_MAPPED_PREFIX else packed
+
+
+class PrefixTrie:
+    def __init__(self, networks=()):
+        # Keyed by address length in bytes.
+        self.roots = {4: {}, 16: {}}
+        self.size = 0
+        for network in networks:
+            self.add(network)
+
+    def add(self, network):
+        """Block an ``ipaddress`` network."""
+        packed = network.network_address.packed
+        full_bytes, rest = divmod(network.prefixlen, 8)
+        node = self.roots[len(packed)]
+        if node is BLOCKED:
+            return
+        if network.prefixlen == 0:
+            self.roots[len(packed)] = BLOCKED
+            self.size += 1
+            return
+        for byte in packed[:full_bytes - (0 if rest else 1)]:
+            child = node.get(byte)
+            if child is BLOCKED:
+                return  # already covered by a shorter range
+            if child is None:
+                child = node[byte] = {}
+            node = child
+        if rest:
+            first = packed[full_bytes]
+            for byte in range(first, first + (1 << (8 - rest))):
+                node[byte] = BLOCKED
+        else:
+            node[packed[full_bytes - 1]] = BLOCKED
+        self.size += 1
+
+    def __len__(self):
+        return self.size
+
+    def contains_packed(self, packed):
+        node = self.roots[len(packed)]
+        for byte in packed:
+            if node is BLOCKED:
+                return True
+            node = node.get(byte)
+            if node is None:
+                return False
+        return node is BLOCKED
+
+    def __contains__(self, address):
+        packed = packed_address(address.strip())
+        return packed is not None and self.contains_packed(packed)
+
+
+def parse_network(value):
+    """An ``ipaddress`` network for an address or CIDR range; host bits are cleared."""
+    return ipaddress.ip_network(value.strip(), strict=False)
+
+
+def file_networks(path):
+    networks = []
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.partition('#')[0].strip()
+            if not line:
+                continue
+            try:
+                networks.append(parse_network(line))
+            except ValueError:
+                logger.warning("%s:%s: not an IP address or range: %r", path, number, line)
+    return networks
+
+
+# (TRUSTED_PROXIES setting, compiled trie), recompiled when the setting changes.
+_trusted_proxies = ((), PrefixTrie())
+
+
+def trusted_proxies():
+    """``TRUSTED_PROXIES`` as a ``PrefixTrie``."""
+    global _trusted_proxies
+    value = getattr(settings, 'TRUSTED_PROXIES', ())
+    if _trusted_proxies[0] is not value:
+        _trusted_proxies = (value, PrefixTrie(parse_network(network) for network in value))
+    return _trusted_proxies[1]
+
+
+def is_trusted_proxy(address):
+    trie = trusted_proxies()
+    return bool(trie) and bool(address) and address in trie
+
+
+def check_interval():
+    return getattr(settings, 'IP_BLOCKLIST_CHECK_INTERVAL', 5)
+
+
+class Blocklist:
+    """This process's compiled blocklist."""
+
+    def __init__(self):
+        self.trie = PrefixTrie()
+        self.signature = None
+        self.expires_at = None
+        self.checked_at = None
+
+    def needs_check(self):
+        return self.checked_at is None or time.monotonic() - self.checked_at >= check_interval()
+
+    def current_signature(self):
+        path = getattr(settings, 'IP_BLOCKLIST_FILE', '')
+        try:
+            mtime = os.stat(path).st_mtime if path else None
+        except OSError:
+            mtime = None
+        table = BlockedNetwork.objects.aggregate(rows=Count('id'), changed=Max('updated_at'))
+        return table['rows'], table['changed'], path, mtime
+
+    def refresh(self):
+        """Recompile if the table or file changed or an entry expired since the last compile."""
+        self.checked_at = time.monotonic()
+        try:
+            signature = self.current_signature()
+            expired = self.expires_at is not None and self.expires_at <= timezone.now()
+            if signature != self.signature or expired:
+                self.compile(signature)
+        except DatabaseError as e:
+            # Keep enforcing the last compiled list rather than failing every request.
+            logger.warning("Could not reload the IP blocklist: %s", e)
+
+    def compile(self, signature):
+        now = timezone.now()
+        active = BlockedNetwork.objects.filter(Q(expires_at__isnull=True) | Q(expires_at__gt=now))
+        networks = []
+        for value in active.values_list('network', flat=True):
+            try:
+                networks.append(parse_network(value))
+            except ValueError:
+                logger.warning("Ignoring invalid blocked network %r", value)
+        path = signature[2]
+        if path and signature[3] is not None:
+            networks.extend(file_networks(path))
+        self.trie = PrefixTrie(networks)
+        self.expires_at = active.aggregate(next=Min('expires_at'))['next']
+        self.signature = signature
+
+    def is_blocked(self, addresses):
+        trie = self.trie
+        return any(address in trie for address in addresses)
+
+
+_blocklist = Blocklist()
+
+
+def blocklist():
+    return _blocklist
+
+
+def client_addresses(request):
+    """
+    ``REMOTE_ADDR`` and every ``X-Forwarded-For`` hop.
+
+    Checking all of them means a client can't slip past by prepending a
+    made-up address to the header.
+    """
+    addresses = [request.META.get('REMOTE_ADDR', '')]
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if forwarded:
+        addresses.extend(forwarded.split(','))
+    return addresses
+
+
+def block(value, source=BlockedNetwork.MANUAL, reason='', expires_at=None):
+    """Add (or extend) a blocked range. Raises ``ValueError`` for an invalid one."""
+    network = str(parse_network(value))
+    entry, created = BlockedNetwork.objects.get_or_create(
+        network=network, defaults={'source': source, 'reason': reason[:255], 'expires_at': expires_at},
+    )
+    if not created and entry.expires_at is not None and (expires_at is None or expires_at > entry.expires_at):
+        entry.expires_at = expires_at
+        entry.save(update_fields=['expires_at', 'updated_at'])
+    return entry
+
+
+def auto_blockable(address):
+    """Whether ``address`` may be blocked automatically: a valid public address that isn't a trusted proxy."""
+    try:
+        ip = ipaddress.ip_address(address.strip())
+    except (AttributeError, ValueError):
+        return False
+    if getattr(ip, 'ipv4_mapped', None):
+        ip = ip.ipv4_mapped
+    return ip.is_global and not is_trusted_proxy(str(ip))
+
+
+def block_addresses(addresses, source, reason):
+    """
+    Block each of ``addresses`` for ``IP_BLOCKLIST_CLEANUP_SECONDS``, skipping
+    blanks and those ``auto_blockable`` rejects. Returns the ranges blocked.
+    """
+    seconds = getattr(settings, 'IP_BLOCKLIST_CLEANUP_SECONDS', 30 * 24 * 60 * 60)
+    expires_at = timezone.now() + timedelta(seconds=seconds)
+    blocked = set()
+    for address in addresses:
+        if auto_blockable(address):
+            blocked.add(block(address, source, reason, expires_at=expires_at).network)
+    return blocked
+
+
+def record_rate_limit_block(ip):
+    """
+    Count a ``rate_limit`` block against ``ip``; after
+    ``IP_BLOCKLIST_RATE_LIMIT_STRIKES`` of them within a day, block the
+    address site-wide for ``IP_BLOCKLIST_RATE_LIMIT_SECONDS``.
+    """
+    strikes_needed = getattr(settings, 'IP_BLOCKLIST_RATE_LIMIT_STRIKES', 3)
+    if not strikes_needed or not auto_blockable(ip):
+        return None
+    key = f'ipblock_strikes_{ip}'
+    cache.add(key, 0, 24 * 60 * 60)
+    try:
+        strikes = cache.incr(key)
+    except ValueError:  # expired between add and incr
+        cache.set(key, 1, 24 * 60 * 60)
+        strikes = 1
+    if strikes < strikes_needed:
+        return None
+    cache.delete(key)
+    seconds = getattr(settings, 'IP_BLOCKLIST_RATE_LIMIT_SECONDS', 24 * 60 * 60)
+    return block(
+        ip, BlockedNetwork.RATE_LIMIT, f"{strikes} rate limit blocks",
+        expires_at=timezone.now() + timedelta(seconds=seconds),
+    )
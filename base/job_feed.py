@@ -0,0 +1,119 @@
+"""
+The candidate-facing job feed.
+
+``build_feed`` returns one page of active job openings, newest first or
+(``sort=popular``) by how many candidates are interested, filtered by job
+type, location prefix and keywords in the title or requirements. It also returns the subset of that page the candidate has
+already expressed interest in. ``employee_dashboard`` embeds the first
+page; ``employee/jobs/feed/`` serves the following ones.
+``recommended_jobs`` serializes the candidate's stored recommendations.
+
+Candidates only see live openings: active, published and not expired.
+``expire_jobs`` (``manage.py expire_jobs``) deactivates the expired ones
+in bulk so they drop out of the feed indexes.
+"""
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.timesince import timesince
+
+from . import facets
+from .models import EmployeeInterest, JobOpening, Recommendation
+from .pagination import keyset_page
+from .recommendations import recommended_ids
+from .search import fulltext_filter
+
+FEED_PAGE_SIZE = 20
+MAX_FEED_PAGE_SIZE = 50
+
+# ?sort= → keyset column; each has an index with is_active in front.
+FEED_SORTS = {
+    'newest': 'publish_at',
+    'popular': 'interest_count',
+}
+
+
+def live_jobs(now=None):
+    """Openings candidates may see at ``now``."""
+    now = now or timezone.now()
+    return JobOpening.objects.filter(is_active=True, publish_at__lte=now).filter(
+        # Covers the expired openings expire_jobs hasn't got to yet.
+        Q(expires_at__isnull=True) | Q(expires_at__gt=now)
+    )
+
+
+def expire_jobs(now=None, batch_size=1000):
+    """Deactivate the active openings whose ``expires_at`` has passed, a batch per transaction. Returns how many."""
+    now = now or timezone.now()
+    expired = JobOpening.objects.filter(is_active=True, expires_at__lte=now)
+    total = 0
+    while True:
+        ids = list(expired.order_by('expires_at').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return total
+        # Through facets so the is_active facet counts stay exact.
+        total += facets.update_queryset(expired.filter(pk__in=ids), is_active=False)
+
+
+def filter_jobs(queryset, params):
+    job_type = params.get('job_type', '').strip()
+    if job_type:
+        queryset = queryset.filter(job_type=job_type)
+    location = params.get('location', '').strip()
+    if location:
+        # A prefix match can use job_location_idx; a substring match can't.
+        queryset = queryset.filter(location__istartswith=location)
+    return fulltext_filter(queryset, ['title', 'requirements'], params.get('q', ''))
+
+
+def serialize_job(job):
+    return {
+        'id': job.id,
+        'title': job.title,
+        'company': job.employer.company_name,
+        'job_type': job.job_type,
+        'location': job.location,
+        'salary_range': job.salary_range,
+        'description': job.description,
+        'requirements': job.requirements,
+        'created_at': job.created_at,
+        'publish_at': job.publish_at,
+        'expires_at': job.expires_at,
+        'posted': timesince(job.publish_at),
+        'interest_count': job.interest_count,
+    }
+
+
+def page_size(params):
+    try:
+        size = int(params.get('limit') or FEED_PAGE_SIZE)
+    except ValueError:
+        size = FEED_PAGE_SIZE
+    return max(1, min(size, MAX_FEED_PAGE_SIZE))
+
+
+def build_feed(employee_id, params):
+    """One page of the feed as a JSON-ready dict. Raises ``InvalidCursor`` for a bad cursor."""
+    queryset = filter_jobs(live_jobs().select_related('employer'), params)
+    sort_field = FEED_SORTS.get(params.get('sort'), FEED_SORTS['newest'])
+    jobs, next_cursor = keyset_page(queryset, params.get('cursor'), page_size(params), field=sort_field)
+    interested = EmployeeInterest.objects.filter(
+        employee_id=employee_id, job_id__in=[job.id for job in jobs]
+    ).values_list('job_id', flat=True)
+    return {
+        'jobs': [serialize_job(job) for job in jobs],
+        'next_cursor': next_cursor,
+        'interested_job_ids': sorted(interested),
+    }
+
+
+def recommended_jobs(employee_id):
+    """The candidate's recommended jobs that are still open and not yet picked, best first."""
+    ids = recommended_ids(Recommendation.JOBS, employee_id)
+    if not ids:
+        return []
+    jobs = (
+        live_jobs().select_related('employer')
+        .exclude(employee_interests__employee_id=employee_id)
+        .in_bulk(ids)
+    )
+    return [serialize_job(jobs[pk]) for pk in ids if pk in jobs]
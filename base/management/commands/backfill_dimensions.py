@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from base import dimensions
+
+
+class Command(BaseCommand):
+    help = 'Fills the normalized location/role/qualification/nationality and experience columns of existing registrations'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Registrations read and updated per query (default: 500)',
+        )
+        parser.add_argument(
+            '--create-missing',
+            action='store_true',
+            help='Create a canonical value for every unmapped spelling instead of queueing it for review',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        scanned, updated, unmapped = dimensions.backfill(
+            batch_size=options['batch_size'],
+            create_missing=options['create_missing'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"✓ {scanned} registration(s) scanned, {updated} updated"))
+
+        if not unmapped:
+            return
+        dimensions.record_unmapped(unmapped, replace=True)
+        spellings = {}
+        for (kind, _key, _raw), _count in unmapped.items():
+            spellings[kind] = spellings.get(kind, 0) + 1
+        for kind, count in sorted(spellings.items()):
+            self.stdout.write(self.style.WARNING(f"→ {kind}: {count} unmapped spelling(s) queued for review"))
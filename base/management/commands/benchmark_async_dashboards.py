@@ -0,0 +1,111 @@
+import asyncio
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.core.management.base import BaseCommand, CommandError
+from django.db.backends.utils import CursorWrapper
+from django.test import RequestFactory
+
+from base import async_views, views
+from base.models import Employer, Registration
+
+
+class Command(BaseCommand):
+    help = (
+        'Times the sync and async dashboard views with an added delay per query, '
+        'standing in for the round trip to a remote database'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rtt',
+            default='0,2,5,10,20',
+            help='Comma-separated round-trip times in milliseconds to simulate (default: 0,2,5,10,20)',
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per view and RTT (default: 5)')
+
+    def dashboards(self):
+        """``(label, sync view, async view, path, session)`` for every dashboard that has data."""
+        yield 'registrations_dashboard', views.registrations_dashboard, async_views.registrations_dashboard, '/dashboard/', {}
+        employer = Employer.objects.order_by('id').first()
+        if employer is not None:
+            yield 'employer_dashboard', views.employer_dashboard, async_views.employer_dashboard, \
+                '/employer/dashboard/', {'employer_id': employer.id, 'user_type': 'employer'}
+        else:
+            self.stdout.write(self.style.WARNING("  → No employers yet; skipping employer_dashboard"))
+        employee = Registration.objects.order_by('id').first()
+        if employee is not None:
+            yield 'employee_dashboard', views.employee_dashboard, async_views.employee_dashboard, \
+                '/employee/dashboard/', {'employee_id': employee.id, 'user_type': 'employee'}
+        else:
+            self.stdout.write(self.style.WARNING("  → No registrations yet; skipping employee_dashboard"))
+
+    def build_request(self, path, session):
+        request = RequestFactory().get(path)
+        # An unsaved superuser passes login_required without touching the user table.
+        user = User(username='benchmark', is_staff=True, is_superuser=True)
+        request.user = user
+
+        async def auser():
+            return user
+        request.auser = auser
+        request.session = SessionStore()
+        request.session.update(session)
+        request._messages = FallbackStorage(request)
+        return request
+
+    def handle(self, *args, **options):
+        try:
+            rtts = [float(value) for value in options['rtt'].split(',') if value.strip()]
+        except ValueError:
+            raise CommandError('--rtt must be a comma-separated list of numbers')
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1')
+
+        dashboards = list(self.dashboards())
+        loop = asyncio.new_event_loop()
+        original_execute = CursorWrapper._execute_with_wrappers
+        delay = {'seconds': 0.0}
+
+        def delayed_execute(cursor, *args, **kwargs):
+            # time.sleep releases the GIL, so concurrent queries overlap as they would on the network.
+            time.sleep(delay['seconds'])
+            return original_execute(cursor, *args, **kwargs)
+
+        rows = []
+        CursorWrapper._execute_with_wrappers = delayed_execute
+        try:
+            for rtt in rtts:
+                delay['seconds'] = rtt / 1000
+                for label, sync_view, async_view, path, session in dashboards:
+                    sync_ms = self.time(lambda: sync_view(self.build_request(path, session)), options['repeat'])
+                    async_ms = self.time(
+                        lambda: loop.run_until_complete(async_view(self.build_request(path, session))),
+                        options['repeat'],
+                    )
+                    rows.append((label, rtt, sync_ms, async_ms))
+        finally:
+            CursorWrapper._execute_with_wrappers = original_execute
+            loop.close()
+
+        self.stdout.write(f"{'dashboard':<25} {'rtt ms':>7} {'sync ms':>9} {'async ms':>9} {'change':>8}")
+        self.stdout.write("-" * 62)
+        for label, rtt, sync_ms, async_ms in rows:
+            self.stdout.write(
+                f"{label:<25} {rtt:>7g} {sync_ms:>9.1f} {async_ms:>9.1f} {(async_ms - sync_ms) / sync_ms:>+8.0%}"
+            )
+
+    def time(self, call, repeat):
+        """Median milliseconds for ``call`` over ``repeat`` runs, after one warm-up."""
+        response = call()
+        if response.status_code != 200:
+            raise CommandError(f"Dashboard returned {response.status_code}")
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
@@ -0,0 +1,135 @@
+import statistics
+import threading
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+
+from base.db_pool import DEFAULT_POOL_OPTIONS, PooledDatabaseWrapperMixin, close_pools, get_pool
+
+
+class Command(BaseCommand):
+    help = (
+        'Sends requests through the WSGI handler and reports latency and database connects '
+        'with a connection per request, persistent connections and the connection pool'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/', help='URL to request (default: /)')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per mode (default: 200)')
+        parser.add_argument('--threads', type=int, default=1, help='Concurrent client threads (default: 1)')
+        parser.add_argument(
+            '--conn-max-age',
+            type=int,
+            default=300,
+            help='CONN_MAX_AGE for the persistent mode (default: 300)',
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['threads'] < 1:
+            raise CommandError('--requests and --threads must be at least 1')
+
+        db_settings = connections.settings[DEFAULT_DB_ALIAS]
+        original = dict(db_settings)
+        modes = [
+            ('connection per request', {'CONN_MAX_AGE': 0, 'POOL': None}),
+            (f"persistent ({options['conn_max_age']}s)", {
+                'CONN_MAX_AGE': options['conn_max_age'], 'CONN_HEALTH_CHECKS': True, 'POOL': None,
+            }),
+        ]
+        if isinstance(connections[DEFAULT_DB_ALIAS], PooledDatabaseWrapperMixin):
+            modes.append(('pooled', {'CONN_MAX_AGE': 0, 'POOL': original.get('POOL') or DEFAULT_POOL_OPTIONS}))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f"  → {db_settings['ENGINE']} has no pool; set DB_POOL=1 to include the pooled mode"
+            ))
+
+        store = import_module(settings.SESSION_ENGINE).SessionStore()
+        store['benchmark'] = True
+        store.save()
+        # The session lookup gives every request at least one query.
+        cookie = f'{settings.SESSION_COOKIE_NAME}={store.session_key}'
+
+        rows = []
+        try:
+            for label, overrides in modes:
+                db_settings.clear()
+                db_settings.update(original, **overrides)
+                connections.close_all()
+                close_pools()
+                rows.append((label, *self.run_mode(options, cookie)))
+        finally:
+            db_settings.clear()
+            db_settings.update(original)
+            connections.close_all()
+            close_pools()
+            store.delete()
+
+        self.stdout.write(
+            f"{'mode':<26} {'req/s':>8} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'connects':>9} {'errors':>7}"
+        )
+        self.stdout.write("-" * 80)
+        for label, timings, connects, errors, elapsed in rows:
+            ordered = sorted(timings)
+            self.stdout.write(
+                f"{label:<26} {len(timings) / elapsed:>8.1f} {statistics.mean(timings) * 1000:>8.2f} "
+                f"{ordered[len(ordered) // 2] * 1000:>8.2f} {ordered[int(len(ordered) * 0.95)] * 1000:>8.2f} "
+                f"{connects:>9} {errors:>7}"
+            )
+        if any(errors for _label, _timings, _connects, errors, _elapsed in rows):
+            self.stdout.write(self.style.WARNING(f"  → Some requests to {options['path']} did not return 200"))
+
+    def run_mode(self, options, cookie):
+        """``(timings, physical connects, non-200 responses, wall time)`` for one mode."""
+        handler = WSGIHandler()
+        factory = RequestFactory()
+        host = next((h for h in settings.ALLOWED_HOSTS if h != '*' and not h.startswith('.')), 'testserver')
+        lock = threading.Lock()
+        timings = []
+        errors = []
+        connects = []
+
+        def count_connect(sender, connection, **kwargs):
+            if connection.alias == DEFAULT_DB_ALIAS:
+                with lock:
+                    connects.append(1)
+
+        def client(count):
+            for _ in range(count):
+                environ = factory.get(options['path'], HTTP_HOST=host, HTTP_COOKIE=cookie, secure=True).environ
+                started = time.perf_counter()
+                response = handler(environ, lambda status, headers: None)
+                b''.join(response)
+                response.close()
+                with lock:
+                    timings.append(time.perf_counter() - started)
+                    if response.status_code != 200:
+                        errors.append(response.status_code)
+            connections.close_all()
+
+        per_thread, extra = divmod(options['requests'], options['threads'])
+        threads = [
+            threading.Thread(target=client, args=(per_thread + (1 if index < extra else 0),))
+            for index in range(options['threads'])
+        ]
+        connection_created.connect(count_connect)
+        started = time.perf_counter()
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            connection_created.disconnect(count_connect)
+        elapsed = time.perf_counter() - started
+
+        physical = len(connects)
+        if connections.settings[DEFAULT_DB_ALIAS].get('POOL'):
+            # Borrowing from the pool also fires connection_created.
+            physical = get_pool(connections[DEFAULT_DB_ALIAS]).stats['connects']
+        return timings, physical, len(errors), elapsed
@@ -0,0 +1,72 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from base import benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks per-request helper functions and fails on regressions against the stored baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--update-baseline',
+            action='store_true',
+            help='Write the current measurements to the baseline file instead of comparing',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=None,
+            help='Allowed slowdown as a fraction (default: settings.BENCHMARK_REGRESSION_THRESHOLD)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=7,
+            help='Number of timeit repeats; the best run is kept',
+        )
+        parser.add_argument(
+            'names',
+            nargs='*',
+            help='Only run these hot paths (e.g. decorators.get_client_ip)',
+        )
+
+    def handle(self, *args, **options):
+        threshold = options['threshold']
+        if threshold is None:
+            threshold = getattr(settings, 'BENCHMARK_REGRESSION_THRESHOLD', 0.25)
+
+        unknown = set(options['names']) - set(benchmarks.HOT_PATHS)
+        if unknown:
+            raise CommandError(f"Unknown hot path(s): {', '.join(sorted(unknown))}")
+
+        results = benchmarks.run(options['names'], repeat=options['repeat'])
+        baseline = benchmarks.load_baseline()
+
+        # ratio: cost of one call in runs of benchmarks.reference(), measured alongside.
+        self.stdout.write(
+            f"{'hot path':<45} {'ns/op':>10} {'ratio':>8} {'baseline':>8} {'alloc B':>8} {'baseline':>8}"
+        )
+        self.stdout.write("-" * 92)
+        for name, current in results.items():
+            previous = baseline.get(name, {})
+            self.stdout.write(
+                f"{name:<45} {current['ns_per_op']:>10.1f} {current['ratio']:>8.3f} {previous.get('ratio', '-'):>8} "
+                f"{current['alloc_bytes']:>8} {previous.get('alloc_bytes', '-'):>8}"
+            )
+
+        if options['update_baseline']:
+            baseline.update(results)
+            benchmarks.save_baseline(baseline)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {benchmarks.BASELINE_PATH}"))
+            return
+
+        regressions = benchmarks.find_regressions(results, baseline, threshold)
+        if regressions:
+            for name, metric, before, after in regressions:
+                self.stdout.write(self.style.ERROR(f"  ✗ {name}: {metric} {before} → {after}"))
+            raise CommandError(
+                f"{len(regressions)} hot path metric(s) regressed by more than {threshold:.0%}"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"✓ No regressions beyond {threshold:.0%}"))
@@ -0,0 +1,76 @@
+import gzip
+
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from base import views
+from base.middleware import brotli, minify_html
+from base.models import Employer, Registration
+
+
+class Command(BaseCommand):
+    help = 'Renders each dashboard and reports its size raw, minified, and minified + gzip/brotli'
+
+    def dashboard_requests(self):
+        """``(label, view, request)`` for every dashboard that has data to render."""
+        factory = RequestFactory()
+        employer = Employer.objects.order_by('id').first()
+        employee = Registration.objects.order_by('id').first()
+
+        def build(path, session):
+            request = factory.get(path)
+            # An unsaved superuser passes login_required without touching the user table.
+            request.user = User(username='benchmark', is_staff=True, is_superuser=True)
+            request.session = SessionStore()
+            request.session.update(session)
+            request._messages = FallbackStorage(request)
+            return request
+
+        yield 'registrations_dashboard', views.registrations_dashboard, build('/dashboard/', {})
+        if employer is not None:
+            yield 'employer_dashboard', views.employer_dashboard, build(
+                '/employer/dashboard/', {'employer_id': employer.id, 'user_type': 'employer'}
+            )
+        else:
+            self.stdout.write(self.style.WARNING("  → No employers yet; skipping employer_dashboard"))
+        if employee is not None:
+            yield 'employee_dashboard', views.employee_dashboard, build(
+                '/employee/dashboard/', {'employee_id': employee.id, 'user_type': 'employee'}
+            )
+        else:
+            self.stdout.write(self.style.WARNING("  → No registrations yet; skipping employee_dashboard"))
+
+    def handle(self, *args, **options):
+        rows = []
+        for label, view, request in self.dashboard_requests():
+            response = view(request)
+            if response.status_code != 200:
+                self.stdout.write(self.style.WARNING(f"  → {label} returned {response.status_code}; skipped"))
+                continue
+            raw = response.content
+            minified = minify_html(raw.decode(response.charset)).encode(response.charset)
+            rows.append((
+                label,
+                len(raw),
+                len(minified),
+                len(gzip.compress(raw, compresslevel=6)),
+                len(gzip.compress(minified, compresslevel=6)),
+                len(brotli.compress(minified, quality=5)) if brotli is not None else None,
+            ))
+
+        self.stdout.write(
+            f"{'dashboard':<25} {'raw':>9} {'minified':>9} {'raw+gz':>9} {'min+gz':>9} {'min+br':>9} {'saved':>7}"
+        )
+        self.stdout.write("-" * 83)
+        for label, raw, minified, raw_gz, min_gz, min_br in rows:
+            wire = min_br if min_br is not None else min_gz
+            self.stdout.write(
+                f"{label:<25} {raw:>9} {minified:>9} {raw_gz:>9} {min_gz:>9} "
+                f"{min_br if min_br is not None else '-':>9} {1 - wire / raw:>7.1%}"
+            )
+        if brotli is None:
+            self.stdout.write(self.style.WARNING("  → brotli is not installed; only gzip sizes were measured"))
+        self.stdout.write(self.style.SUCCESS(f"✓ Measured {len(rows)} dashboard(s)"))
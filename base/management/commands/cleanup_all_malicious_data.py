@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
-from base.models import Employer, Contact, Registration
+from base import ipblock
+from base.models import BlockedNetwork, Employer, Contact, Registration
 import re
 
 class Command(BaseCommand):
@@ -11,6 +12,11 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be deleted without actually deleting',
         )
+        parser.add_argument(
+            '--no-block',
+            action='store_true',
+            help="Don't add the addresses the entries came from to the IP blocklist",
+        )
 
     def is_malicious(self, *values):
         """Check if any value contains SQL injection patterns."""
@@ -44,6 +50,7 @@ class Command(BaseCommand):
         self.stdout.write("=" * 70)
 
         total_deleted = 0
+        source_ips = set()
 
         # Clean Employers
         self.stdout.write("\n[1/3] Scanning Employer table...")
@@ -59,6 +66,7 @@ class Command(BaseCommand):
                 self.stdout.write(
                     f"  → Malicious: {employer.company_name} ({employer.email})"
                 )
+                source_ips.add(employer.client_ip)
                 if not dry_run:
                     employer.delete()
                 employer_count += 1
@@ -81,6 +89,7 @@ class Command(BaseCommand):
                 self.stdout.write(
                     f"  → Malicious: {contact.name} ({contact.email})"
                 )
+                source_ips.add(contact.client_ip)
                 if not dry_run:
                     contact.delete()
                 contact_count += 1
@@ -106,6 +115,7 @@ class Command(BaseCommand):
                 self.stdout.write(
                     f"  → Malicious: {reg.name} ({reg.email})"
                 )
+                source_ips.add(reg.client_ip)
                 if not dry_run:
                     reg.delete()
                 registration_count += 1
@@ -126,6 +136,13 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS(
                 f"✓ Successfully cleaned up {total_deleted} malicious entries total!"
             ))
+        source_ips.discard(None)
+        if source_ips and not kwargs.get('no_block'):
+            if dry_run:
+                self.stdout.write(self.style.WARNING(f"Would block {len(source_ips)} source address(es)"))
+            else:
+                blocked = ipblock.block_addresses(source_ips, BlockedNetwork.CLEANUP, 'cleanup_all_malicious_data')
+                self.stdout.write(self.style.SUCCESS(f"✓ Blocked {len(blocked)} source address(es)"))
         self.stdout.write("=" * 70)
 
         # Show recommendations
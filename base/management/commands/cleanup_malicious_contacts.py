@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
-from base.models import Contact
+from base import ipblock
+from base.models import BlockedNetwork, Contact
 import re
 
 class Command(BaseCommand):
@@ -19,6 +20,7 @@ class Command(BaseCommand):
 
         count = 0
         total_checked = 0
+        source_ips = set()
 
         for contact in Contact.objects.all():
             total_checked += 1
@@ -51,8 +53,14 @@ class Command(BaseCommand):
             if is_malicious:
                 self.stdout.write(f"Deleting malicious entry: {contact.name} - {contact.email}")
                 contact.delete()
+                source_ips.add(contact.client_ip)
                 count += 1
 
         self.stdout.write(self.style.SUCCESS(
             f'Successfully cleaned up {count} malicious contact entries out of {total_checked} total entries.'
         ))
+
+        source_ips.discard(None)
+        if source_ips:
+            blocked = ipblock.block_addresses(source_ips, BlockedNetwork.CLEANUP, 'cleanup_malicious_contacts')
+            self.stdout.write(self.style.SUCCESS(f"Blocked {len(blocked)} source address(es)."))
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
-from base.models import Employer
+from base import ipblock
+from base.models import BlockedNetwork, Employer
 import re
 
 class Command(BaseCommand):
@@ -19,6 +20,7 @@ class Command(BaseCommand):
 
         count = 0
         total_checked = 0
+        source_ips = set()
 
         for employer in Employer.objects.all():
             total_checked += 1
@@ -43,8 +45,14 @@ class Command(BaseCommand):
             if is_malicious:
                 self.stdout.write(f"Deleting malicious entry: {employer.company_name} - {employer.email}")
                 employer.delete()
+                source_ips.add(employer.client_ip)
                 count += 1
 
         self.stdout.write(self.style.SUCCESS(
             f'Successfully cleaned up {count} malicious entries out of {total_checked} total entries.'
         ))
+
+        source_ips.discard(None)
+        if source_ips:
+            blocked = ipblock.block_addresses(source_ips, BlockedNetwork.CLEANUP, 'cleanup_malicious_employers')
+            self.stdout.write(self.style.SUCCESS(f"Blocked {len(blocked)} source address(es)."))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from base.job_feed import expire_jobs
+from base.models import JobOpening
+
+
+class Command(BaseCommand):
+    help = 'Deactivates job openings whose expiry date has passed (run it every few minutes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show how many openings would be deactivated without changing them',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Openings deactivated per transaction (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        now = timezone.now()
+        if options['dry_run']:
+            count = JobOpening.objects.filter(is_active=True, expires_at__lte=now).count()
+            self.stdout.write(self.style.WARNING(f"DRY RUN: Would deactivate {count} expired job opening(s)"))
+            return
+
+        count = expire_jobs(now, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"✓ Deactivated {count} expired job opening(s)"))
@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.template.defaultfilters import filesizeformat
+
+from base import media_gc
+
+
+class Command(BaseCommand):
+    help = 'Deletes uploaded files no registration, employer or pending task refers to any more'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be deleted without actually deleting',
+        )
+        parser.add_argument(
+            '--grace-hours',
+            type=float,
+            default=24,
+            help='Only delete files last modified at least this many hours ago (default: 24)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Directories scanned in parallel (default: 4)',
+        )
+
+    def handle(self, *args, **options):
+        if options['grace_hours'] < 1:
+            raise CommandError('--grace-hours must be at least 1 so uploads still being saved are kept')
+        if options['workers'] < 1:
+            raise CommandError('--workers must be at least 1')
+        dry_run = options['dry_run']
+        if dry_run:
+            self.stdout.write(self.style.WARNING("DRY RUN MODE - Nothing will be deleted"))
+
+        totals = media_gc.collect(
+            options['grace_hours'] * 60 * 60, dry_run=dry_run, workers=options['workers'],
+        )
+        overall = media_gc.DirectoryStats()
+        verb = 'would be deleted' if dry_run else 'deleted'
+        for directory, stats in totals.items():
+            overall.merge(stats)
+            style = self.style.WARNING if stats.orphaned else self.style.SUCCESS
+            marker = '→' if stats.orphaned else '✓'
+            self.stdout.write(style(
+                f"{marker} {directory}/: {stats.scanned} file(s), {stats.referenced} referenced, "
+                f"{stats.recent} within the grace period, {stats.orphaned} orphaned "
+                f"({self.size(stats.orphaned_bytes)}) {verb}"
+            ))
+            if stats.failed:
+                self.stdout.write(self.style.ERROR(f"  ✗ {stats.failed} file(s) could not be deleted"))
+
+        reclaimed = self.size(overall.orphaned_bytes)
+        if dry_run:
+            self.stdout.write(self.style.WARNING(
+                f"DRY RUN: Would delete {overall.orphaned} orphaned file(s), reclaiming {reclaimed}"
+            ))
+            self.stdout.write("Run without --dry-run to actually delete them")
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ Deleted {overall.orphaned} orphaned file(s), reclaimed {reclaimed}"
+            ))
+
+    @staticmethod
+    def size(value):
+        return filesizeformat(value).replace('\xa0', ' ')
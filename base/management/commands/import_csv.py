@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from base.importers import IMPORTERS, DEFAULT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Bulk imports candidates, employers or job openings from a CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTERS), help='What the CSV contains')
+        parser.add_argument('path', help='Path to the CSV file (UTF-8, header row required)')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Rows validated and inserted per transaction (default {DEFAULT_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Processes used to hash passwords (default: one per CPU)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate and report without writing to the database',
+        )
+
+    def handle(self, *args, **options):
+        importer = IMPORTERS[options['kind']](
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            dry_run=options['dry_run'],
+        )
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING("DRY RUN MODE - Nothing will be written"))
+
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as f:
+                result = importer.run(f)
+        except OSError as e:
+            raise CommandError(f"Could not read {options['path']}: {e}")
+
+        for line, message in result.duplicates:
+            self.stdout.write(self.style.WARNING(f"  → line {line}: {message}"))
+        for line, message in result.errors:
+            self.stdout.write(self.style.ERROR(f"  ✗ line {line}: {message}"))
+
+        verb = 'Would create' if options['dry_run'] else 'Created'
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {verb} {result.created} {options['kind']} "
+            f"({result.skipped} duplicate(s) skipped, {result.failed} row error(s))"
+        ))
@@ -0,0 +1,75 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from base.models import Registration, ResumeText
+from base.resume_index import save_result
+from base.resume_text import process_file
+
+
+class Command(BaseCommand):
+    help = 'Extracts searchable text from resumes that are new or changed since the last run'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Extraction processes (default: one per CPU)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Registrations loaded per batch (default 200)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-extract every resume even if its content hash is unchanged',
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers'] or os.cpu_count() or 1
+        batch_size = options['batch_size']
+        force = options['force']
+
+        extracted = unchanged = failed = 0
+        last_id = 0
+        # Spawned workers only run resume_text.process_file, which needs no DB access.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            while True:
+                batch = list(
+                    Registration.objects.filter(id__gt=last_id).exclude(resume='')
+                    .order_by('id').values_list('id', 'resume')[:batch_size]
+                )
+                if not batch:
+                    break
+                last_id = batch[-1][0]
+
+                known = {}
+                if not force:
+                    known = dict(
+                        ResumeText.objects.filter(registration_id__in=[pk for pk, _name in batch])
+                        .values_list('registration_id', 'content_hash')
+                    )
+                jobs = [(pk, default_storage.path(name), known.get(pk)) for pk, name in batch]
+
+                for result in pool.map(process_file, *zip(*jobs)):
+                    registration_id, _hash, text, error = result
+                    if text is None:
+                        unchanged += 1
+                        continue
+                    save_result(*result)
+                    if error:
+                        failed += 1
+                        self.stdout.write(self.style.WARNING(f"  → EMP-{registration_id:04d}: {error}"))
+                    else:
+                        extracted += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Extracted {extracted} resume(s), {unchanged} unchanged, {failed} failed"
+        ))
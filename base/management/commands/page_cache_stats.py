@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from base import page_cache
+
+
+class Command(BaseCommand):
+    help = 'Reports the hit ratio of the cached landing and terms pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Zero the counters after reporting them',
+        )
+
+    def handle(self, *args, **options):
+        for page in page_cache.CACHED_PAGES:
+            stats = page_cache.page_stats(page)
+            ratio = 'n/a' if stats['ratio'] is None else f"{stats['ratio']:.1%}"
+            healthy = stats['ratio'] is None or stats['ratio'] >= 0.9
+            style = self.style.SUCCESS if healthy else self.style.WARNING
+            marker = '✓' if healthy else '→'
+            self.stdout.write(style(
+                f"{marker} {page}: {ratio} hit ratio ({stats['hit']} hit(s), {stats['miss']} miss(es), "
+                f"{stats['bypass']} bypassed)"
+            ))
+            if options['reset']:
+                page_cache.reset_stats(page)
+        if options['reset']:
+            self.stdout.write("Counters reset")
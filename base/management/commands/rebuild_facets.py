@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from base import facets
+
+
+class Command(BaseCommand):
+    help = 'Recounts the facet cells from the source tables (after bulk SQL changes or to repair drift)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names',
+            nargs='*',
+            help=f"Facets to rebuild (default: all of {', '.join(facets.FACETS)})",
+        )
+
+    def handle(self, *args, **options):
+        names = options['names'] or list(facets.FACETS)
+        unknown = set(names) - set(facets.FACETS)
+        if unknown:
+            raise CommandError(f"Unknown facet(s): {', '.join(sorted(unknown))}")
+
+        for name in names:
+            cells = facets.rebuild(facets.FACETS[name])
+            self.stdout.write(self.style.SUCCESS(f"✓ {name}: {cells} cell(s)"))
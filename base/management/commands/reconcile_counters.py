@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from base import counters
+
+
+class Command(BaseCommand):
+    help = 'Recounts the denormalized interest counters from the interest tables and fixes any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names',
+            nargs='*',
+            help=f"Counters to reconcile (default: all of {', '.join(counters.COUNTERS)})",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows locked and recounted per transaction (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        names = options['names'] or list(counters.COUNTERS)
+        unknown = set(names) - set(counters.COUNTERS)
+        if unknown:
+            raise CommandError(f"Unknown counter(s): {', '.join(sorted(unknown))}")
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        for name in names:
+            scanned, fixed = counters.reconcile(counters.COUNTERS[name], batch_size=options['batch_size'])
+            style = self.style.WARNING if fixed else self.style.SUCCESS
+            marker = '→' if fixed else '✓'
+            self.stdout.write(style(f"{marker} {name}: {scanned} row(s) checked, {fixed} fixed"))
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from base import recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        'Recomputes the "employers like you also shortlisted" recommendations from the '
+        'interest tables and stores the ones that changed'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'kinds',
+            nargs='*',
+            help=f"Recommendations to refresh (default: all of {', '.join(recommendations.RECOMMENDATIONS)})",
+        )
+        parser.add_argument(
+            '--top-n',
+            type=int,
+            help='Recommendations kept per employer or candidate (default: RECOMMENDATIONS_TOP_N)',
+        )
+
+    def handle(self, *args, **options):
+        kinds = options['kinds'] or list(recommendations.RECOMMENDATIONS)
+        unknown = set(kinds) - set(recommendations.RECOMMENDATIONS)
+        if unknown:
+            raise CommandError(f"Unknown recommendation kind(s): {', '.join(sorted(unknown))}")
+        if options['top_n'] is not None and options['top_n'] < 1:
+            raise CommandError('--top-n must be at least 1')
+
+        for kind in kinds:
+            started = time.monotonic()
+            created, updated, deleted = recommendations.refresh(
+                recommendations.RECOMMENDATIONS[kind], limit=options['top_n']
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ {kind}: {created} created, {updated} updated, {deleted} removed "
+                f"in {time.monotonic() - started:.1f}s"
+            ))
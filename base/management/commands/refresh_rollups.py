@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from base import rollups
+
+
+class Command(BaseCommand):
+    help = 'Folds new source rows into the time-bucketed rollup tables (run it every few minutes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names',
+            nargs='*',
+            help=f"Rollups to refresh (default: all of {', '.join(rollups.ROLLUPS)})",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Source rows folded per transaction (default: 10000)',
+        )
+
+    def handle(self, *args, **options):
+        names = options['names'] or list(rollups.ROLLUPS)
+        unknown = set(names) - set(rollups.ROLLUPS)
+        if unknown:
+            raise CommandError(f"Unknown rollup(s): {', '.join(sorted(unknown))}")
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        for name in names:
+            folded = rollups.ROLLUPS[name](batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"✓ {name}: {folded} row(s) folded"))
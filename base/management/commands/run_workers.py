@@ -0,0 +1,96 @@
+import multiprocessing
+import signal
+import time
+
+from django import db
+from django.core.management.base import BaseCommand
+
+from base import taskqueue
+
+# How often an idle worker looks for tasks abandoned by a crashed worker.
+STALE_CHECK_INTERVAL = 60
+
+
+def worker_loop(poll_interval, burst):
+    """Claim and run tasks until stopped (or, in burst mode, until the queue is empty)."""
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    name = taskqueue.worker_name()
+    last_stale_check = 0
+    while not stopping:
+        try:
+            ran = taskqueue.run_next(name)
+        except db.Error:
+            # Lost the connection; drop it so the next claim reconnects.
+            db.close_old_connections()
+            ran = False
+        if not ran:
+            if burst:
+                break
+            if time.monotonic() - last_stale_check > STALE_CHECK_INTERVAL:
+                taskqueue.requeue_stale()
+                last_stale_check = time.monotonic()
+            time.sleep(poll_interval)
+    db.connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Runs background task workers that claim jobs from the Task table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Number of worker processes (default 2)',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to sleep when the queue is empty (default 1)',
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once the queue is empty instead of polling forever',
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        poll_interval = options['poll_interval']
+        burst = options['burst']
+
+        requeued = taskqueue.requeue_stale()
+        if requeued:
+            self.stdout.write(self.style.WARNING(f"Requeued {requeued} task(s) left running by a dead worker"))
+
+        # Children must open their own database connections.
+        db.connections.close_all()
+
+        context = multiprocessing.get_context('fork')
+        processes = [
+            context.Process(target=worker_loop, args=(poll_interval, burst), daemon=True)
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(self.style.SUCCESS(f"✓ Started {workers} worker(s); press Ctrl+C to stop"))
+
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping workers after their current task…")
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join()
+        self.stdout.write(self.style.SUCCESS("✓ Workers stopped"))
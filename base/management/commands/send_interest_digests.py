@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from base.notifications import send_digests
+
+
+class Command(BaseCommand):
+    help = 'Sends pending interest notifications as one digest email per recipient (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Notifications sent per mail connection (default: settings.NOTIFICATION_DIGEST_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Build the digests without sending them or marking anything sent',
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING("DRY RUN MODE - No email will be sent"))
+
+        digests, notifications = send_digests(batch_size=options['batch_size'], dry_run=options['dry_run'])
+
+        verb = 'Would send' if options['dry_run'] else 'Sent'
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {verb} {digests} digest(s) covering {notifications} notification(s)"
+        ))
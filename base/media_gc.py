@@ -0,0 +1,142 @@
+"""
+Garbage collection of uploaded files nothing points at any more.
+
+Deleting a ``Registration`` or ``Employer`` (cleanup commands, the admin,
+cascades) leaves its resume, photo or logo on disk, and registrations
+that are never completed leave their uploads in ``media/tmp``.
+
+``referenced_names`` streams the file names stored in ``MEDIA_FIELDS``
+into a set per directory, plus the temporary files queued
+``attach_registration_files`` tasks are still going to move. ``collect``
+then walks the upload directories under ``MEDIA_ROOT`` with
+``os.scandir``, one directory per worker thread, and deletes (or, on a dry
+run, only counts) the unreferenced files older than the grace period. The
+grace period also covers uploads whose row or task isn't committed yet and
+temporary files of registrations still in progress.
+"""
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+
+from .models import Employer, Registration, Task
+
+# (model, file field) pairs whose files live under MEDIA_ROOT.
+MEDIA_FIELDS = (
+    (Registration, 'resume'),
+    (Registration, 'photo'),
+    (Employer, 'logo'),
+)
+
+# Where temp_save_registration keeps uploads until the registration is paid for.
+TMP_DIR = 'tmp'
+
+
+def upload_dirs():
+    """The top-level ``MEDIA_ROOT`` directories the collector may delete from."""
+    dirs = {model._meta.get_field(field).upload_to.strip('/').split('/')[0] for model, field in MEDIA_FIELDS}
+    return sorted(dirs | {TMP_DIR})
+
+
+def referenced_names(chunk_size=5000):
+    """``{directory: {file name, …}}`` of every file a row or pending task still needs, relative to ``MEDIA_ROOT``."""
+    referenced = defaultdict(set)
+
+    def add(name):
+        directory, _, filename = os.path.normpath(name).rpartition(os.sep)
+        referenced[directory].add(filename)
+
+    for model, field in MEDIA_FIELDS:
+        names = model.objects.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+        for name in names.order_by().values_list(field, flat=True).iterator(chunk_size=chunk_size):
+            add(name)
+
+    media_root = os.path.abspath(settings.MEDIA_ROOT)
+    pending = Task.objects.filter(
+        name='attach_registration_files', status__in=[Task.QUEUED, Task.RUNNING],
+    ).values_list('payload', flat=True)
+    for payload in pending.iterator(chunk_size=chunk_size):
+        for key in ('resume', 'photo'):
+            path = payload.get(key)
+            if path:
+                add(os.path.relpath(os.path.abspath(path), media_root))
+    return referenced
+
+
+class DirectoryStats:
+    def __init__(self):
+        self.scanned = 0
+        self.referenced = 0
+        self.recent = 0
+        self.orphaned = 0
+        self.orphaned_bytes = 0
+        self.failed = 0
+
+    def merge(self, other):
+        for attr in vars(self):
+            setattr(self, attr, getattr(self, attr) + getattr(other, attr))
+
+
+def sweep_directory(media_root, directory, referenced, cutoff, dry_run):
+    """
+    Delete the unreferenced files directly in ``directory`` (relative to
+    ``media_root``) last modified before ``cutoff``. Returns the
+    ``DirectoryStats`` and the subdirectories still to sweep.
+    """
+    stats = DirectoryStats()
+    subdirs = []
+    keep = referenced.get(directory, ())
+    with os.scandir(os.path.join(media_root, directory)) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(os.path.join(directory, entry.name))
+                continue
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            stats.scanned += 1
+            if entry.name in keep:
+                stats.referenced += 1
+                continue
+            stat = entry.stat(follow_symlinks=False)
+            if stat.st_mtime >= cutoff:
+                stats.recent += 1
+                continue
+            if not dry_run:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    stats.failed += 1
+                    continue
+            stats.orphaned += 1
+            stats.orphaned_bytes += stat.st_size
+    return stats, subdirs
+
+
+def collect(grace_seconds, dry_run=True, workers=4, now=None):
+    """
+    Sweep every directory in ``upload_dirs`` across ``workers`` threads.
+
+    Returns ``{top-level directory: DirectoryStats}``; ``orphaned`` and
+    ``orphaned_bytes`` are what was (or, with ``dry_run``, would be) deleted.
+    """
+    media_root = os.path.abspath(settings.MEDIA_ROOT)
+    cutoff = (now or time.time()) - grace_seconds
+    referenced = referenced_names()
+    totals = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        for directory in upload_dirs():
+            totals[directory] = DirectoryStats()
+            if os.path.isdir(os.path.join(media_root, directory)):
+                pending[pool.submit(sweep_directory, media_root, directory, referenced, cutoff, dry_run)] = directory
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                top = pending.pop(future)
+                stats, subdirs = future.result()
+                totals[top].merge(stats)
+                for subdir in subdirs:
+                    pending[pool.submit(sweep_directory, media_root, subdir, referenced, cutoff, dry_run)] = top
+    return totals
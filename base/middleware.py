@@ -0,0 +1,305 @@
+"""
+Project middleware.
+
+``ResponseOptimizationMiddleware`` strips indentation and comments from
+HTML pages, leaving ``<pre>``, ``<textarea>`` and ``<script>`` bodies and
+quoted attribute values untouched, then compresses text responses with
+brotli or gzip depending on ``Accept-Encoding``. Pages with a CSRF token
+form field are only gzipped, with random padding against BREACH.
+
+``StaticAssetMiddleware`` serves ``STATIC_ROOT`` directly from the WSGI app,
+picking the precompressed ``.br``/``.gz`` variant written by
+``CompressedManifestStaticFilesStorage`` that the client accepts.
+Fingerprinted names get far-future ``immutable`` caching; everything else
+gets ``STATIC_MAX_AGE`` plus ``ETag``/``Last-Modified`` revalidation. Bodies
+go out as ``FileResponse`` so servers with ``wsgi.file_wrapper`` can use
+``sendfile``.
+
+``IPBlocklistMiddleware`` answers requests from blocked addresses (see
+``base.ipblock``) with a bare 403 before any other middleware runs.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import urlsplit
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse, HttpResponseForbidden, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+
+from . import ipblock
+
+try:
+    import brotli
+except ImportError:  # optional dependency; responses fall back to gzip
+    brotli = None
+
+# Preferred first.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def accepted_encodings(header):
+    """Content codings from an ``Accept-Encoding`` header, minus any with ``q=0``."""
+    accepted = set()
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q=') and params[2:] in ('0', '0.0', '0.00', '0.000'):
+            continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticAsset:
+    """Stat results for one static file and its compressed variants."""
+
+    def __init__(self, path, immutable):
+        self.path = path
+        self.immutable = immutable
+        content_type, _encoding = mimetypes.guess_type(path)
+        self.content_type = content_type or 'application/octet-stream'
+        self.variants = {}
+        for encoding, suffix in (('identity', ''),) + ENCODINGS:
+            try:
+                stat = os.stat(path + suffix)
+            except FileNotFoundError:
+                continue
+            etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+            self.variants[encoding] = (path + suffix, stat.st_size, stat.st_mtime, etag)
+
+    @property
+    def cache_control(self):
+        if self.immutable:
+            return f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+        return f"public, max-age={getattr(settings, 'STATIC_MAX_AGE', 3600)}"
+
+    def choose(self, accept_encoding):
+        accepted = accepted_encodings(accept_encoding)
+        for encoding, _suffix in ENCODINGS:
+            if encoding in accepted and encoding in self.variants:
+                return encoding, self.variants[encoding]
+        return None, self.variants['identity']
+
+
+class IPBlocklistMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'IP_BLOCKLIST_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        blocked = ipblock.blocklist()
+        if blocked.needs_check():
+            blocked.refresh()
+        if blocked.is_blocked(ipblock.client_addresses(request)):
+            return HttpResponseForbidden('Forbidden', content_type='text/plain')
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        blocked = ipblock.blocklist()
+        if blocked.needs_check():
+            await sync_to_async(blocked.refresh)()
+        if blocked.is_blocked(ipblock.client_addresses(request)):
+            return HttpResponseForbidden('Forbidden', content_type='text/plain')
+        return await self.get_response(request)
+
+
+class StaticAssetMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        # runserver serves the source directories in development.
+        if settings.DEBUG or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.prefix = urlsplit(settings.STATIC_URL).path
+        self.root = str(settings.STATIC_ROOT)
+        self.hashed_names = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+        self.assets = {}
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.serve_request(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self.serve_request(request) or await self.get_response(request)
+
+    def serve_request(self, request):
+        if request.method in ('GET', 'HEAD') and request.path_info.startswith(self.prefix):
+            return self.serve(request, request.path_info[len(self.prefix):])
+        return None
+
+    def find(self, name):
+        asset = self.assets.get(name)
+        if asset is not None or not name or name.endswith(('/', '.gz', '.br')):
+            return asset
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            # Not remembered: any URL can miss, and the cache would grow with every one probed.
+            return None
+        # Files only change on deploy (collectstatic + restart), and there are only so many of them.
+        asset = self.assets[name] = StaticAsset(path, immutable=name in self.hashed_names)
+        return asset
+
+    def serve(self, request, name):
+        asset = self.find(name)
+        if asset is None:
+            return None
+        encoding, (path, size, mtime, etag) = asset.choose(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            not_modified = '*' in if_none_match or etag in parse_etags(if_none_match)
+        else:
+            since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+            not_modified = since is not None and int(mtime) <= since
+        if not_modified:
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=asset.content_type)
+            del response['Content-Disposition']
+            response['Content-Length'] = size
+            if encoding:
+                response['Content-Encoding'] = encoding
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(mtime)
+        response['Cache-Control'] = asset.cache_control
+        if len(asset.variants) > 1:
+            response['Vary'] = 'Accept-Encoding'
+        return response
+
+
+# Raw-text elements and comments are matched whole; tags are matched with
+# their quoted attribute values so whitespace inside values is never touched.
+HTML_TOKEN_RE = re.compile(
+    r'(?P<raw><(?P<raw_tag>pre|textarea|script)\b.*?</(?P=raw_tag)\s*>)'
+    r'|(?P<style><style\b[^>]*>)(?P<css>.*?)(?P<style_end></style\s*>)'
+    r'|(?P<comment><!--.*?-->)'
+    r'|(?P<tag></?[a-zA-Z][^\s>/]*(?:[^>"\']|"[^"]*"|\'[^\']*\')*>)',
+    re.S | re.I,
+)
+TAG_WHITESPACE_RE = re.compile(r'("[^"]*"|\'[^\']*\')|\s+')
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+WHITESPACE_RE = re.compile(r'\s+')
+
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml',
+)
+
+# Below this many bytes the compression headers outweigh the savings.
+MIN_COMPRESS_LENGTH = 200
+
+
+def _collapse(text):
+    """Collapse whitespace runs, keeping a newline where there was one."""
+    return WHITESPACE_RE.sub(lambda m: '\n' if '\n' in m.group() else ' ', text)
+
+
+def minify_html(html):
+    """Drop comments and indentation from an HTML document without changing how it renders."""
+    parts = []
+    position = 0
+    for match in HTML_TOKEN_RE.finditer(html):
+        parts.append(_collapse(html[position:match.start()]))
+        position = match.end()
+        if match.group('raw'):
+            parts.append(match.group('raw'))
+        elif match.group('style'):
+            css = _collapse(CSS_COMMENT_RE.sub('', match.group('css')))
+            parts.append(_collapse(match.group('style')) + css + match.group('style_end'))
+        elif match.group('comment'):
+            if match.group('comment').startswith('<!--[if'):
+                parts.append(match.group('comment'))  # IE conditional comments
+        else:
+            parts.append(TAG_WHITESPACE_RE.sub(lambda m: m.group(1) or ' ', match.group('tag')))
+    parts.append(_collapse(html[position:]))
+    return ''.join(parts)
+
+
+def compress_body(content, accept_encoding, has_secret=False):
+    """
+    Return ``(encoding, compressed)`` for the best accepted coding, or
+    ``(None, content)``. Bodies with a secret in them (``has_secret``) are
+    only gzipped: brotli has nowhere to put random padding.
+    """
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and 'br' in accepted and not has_secret:
+        return 'br', brotli.compress(content, quality=5)
+    if 'gzip' in accepted:
+        # Random padding in the gzip header is Django's BREACH mitigation.
+        return 'gzip', compress_string(content, max_random_bytes=100)
+    return None, content
+
+
+class ResponseOptimizationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.minify = getattr(settings, 'MINIFY_HTML', True)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '')
+
+        minified = getattr(response, 'minified', False)
+        if self.minify and not minified and response.status_code == 200 and content_type.startswith('text/html'):
+            charset = response.charset
+            response.content = minify_html(response.content.decode(charset)).encode(charset)
+            response['Content-Length'] = len(response.content)
+
+        if len(response.content) < MIN_COMPRESS_LENGTH or not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding, compressed = compress_body(
+            response.content, request.META.get('HTTP_ACCEPT_ENCODING', ''),
+            # The hidden input {% csrf_token %} renders.
+            has_secret=b'csrfmiddlewaretoken' in response.content,
+        )
+        if encoding is None or len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = len(compressed)
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            # The body differs from the identity representation.
+            response['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0012_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InterestNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('shortlisted', 'Candidate shortlisted'), ('applied', 'Candidate interested in job')], max_length=20)),
+                ('recipient_email', models.EmailField(max_length=254)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='base.registration')),
+                ('employer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='base.employer')),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='base.jobopening')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['sent_at', 'recipient_email'], name='notification_outbox_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:14
+
+from django.db import migrations, models
+
+
+def add_fulltext_index(apps, schema_editor):
+    # Keyword search in the job feed; Django has no FULLTEXT index type.
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute('CREATE FULLTEXT INDEX job_keywords_ft ON base_jobopening (title, requirements)')
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute('DROP INDEX job_keywords_ft ON base_jobopening')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0014_resumetext'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobopening',
+            index=models.Index(fields=['is_active', '-created_at', '-id'], name='job_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobopening',
+            index=models.Index(fields=['is_active', 'job_type', '-created_at'], name='job_feed_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobopening',
+            index=models.Index(fields=['location'], name='job_location_idx'),
+        ),
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+    ]
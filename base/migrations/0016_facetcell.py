@@ -0,0 +1,84 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:17
+
+import hashlib
+import json
+import re
+from collections import Counter
+
+from django.db import migrations, models
+
+
+# Frozen copy of the facet dimensions at this migration: (field, bucket by experience band).
+INITIAL_FACETS = {
+    'registrations': ('Registration', [
+        ('location', False), ('role', False), ('experience', True),
+        ('qualification', False), ('plan', False), ('is_placed', False),
+    ]),
+    'jobs': ('JobOpening', [('location', False), ('job_type', False), ('is_active', False)]),
+}
+
+
+NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+
+# Frozen copies of base.facets.experience_band and cell_key at this migration.
+EXPERIENCE_BANDS = ((1, '0-1 years'), (3, '1-3 years'), (5, '3-5 years'), (10, '5-10 years'))
+
+
+def experience_band(text):
+    text = (text or '').lower()
+    if 'fresh' in text:
+        return EXPERIENCE_BANDS[0][1]
+    match = NUMBER_RE.search(text)
+    if not match:
+        return 'Not specified'
+    years = float(match.group())
+    if 'month' in text:
+        years /= 12
+    for limit, label in EXPERIENCE_BANDS:
+        if years < limit:
+            return label
+    return '10+ years'
+
+
+def cell_key(values):
+    encoded = json.dumps(values, separators=(',', ':'), default=str)
+    return hashlib.sha1(encoded.encode()).hexdigest()
+
+
+def populate_facet_cells(apps, schema_editor):
+    FacetCell = apps.get_model('base', 'FacetCell')
+    for facet, (model_name, dimensions) in INITIAL_FACETS.items():
+        model = apps.get_model('base', model_name)
+        fields = [field for field, _banded in dimensions]
+        counts = Counter()
+        for row in model.objects.order_by().values(*fields).annotate(rows=models.Count('pk')):
+            values = tuple(experience_band(row[field]) if banded else row[field] for field, banded in dimensions)
+            counts[values] += row['rows']
+        FacetCell.objects.bulk_create([
+            FacetCell(facet=facet, key=cell_key(values), values=list(values), count=count)
+            for values, count in counts.items()
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0015_job_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=50)),
+                ('key', models.CharField(help_text='SHA-1 of the JSON-encoded values', max_length=40)),
+                ('values', models.JSONField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('facet', 'key')},
+            },
+        ),
+        migrations.RunPython(populate_facet_cells, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0016_facetcell'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='registration',
+            name='experience_months',
+            field=models.PositiveIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='NormalizedValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('location', 'Location'), ('role', 'Role'), ('qualification', 'Qualification'), ('nationality', 'Nationality')], max_length=20)),
+                ('name', models.CharField(max_length=100)),
+            ],
+            options={
+                'ordering': ('kind', 'name'),
+                'unique_together': {('kind', 'name')},
+            },
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='normalized_location',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='base.normalizedvalue'),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='normalized_nationality',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='base.normalizedvalue'),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='normalized_qualification',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='base.normalizedvalue'),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='normalized_role',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='base.normalizedvalue'),
+        ),
+        migrations.CreateModel(
+            name='NormalizedAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('location', 'Location'), ('role', 'Role'), ('qualification', 'Qualification'), ('nationality', 'Nationality')], max_length=20)),
+                ('key', models.CharField(max_length=100)),
+                ('value', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='base.normalizedvalue')),
+            ],
+            options={
+                'verbose_name_plural': 'normalized aliases',
+                'unique_together': {('kind', 'key')},
+            },
+        ),
+        migrations.CreateModel(
+            name='UnmappedValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('location', 'Location'), ('role', 'Role'), ('qualification', 'Qualification'), ('nationality', 'Nationality')], max_length=20)),
+                ('key', models.CharField(max_length=100)),
+                ('raw_value', models.CharField(help_text='One spelling seen in the data', max_length=100)),
+                ('occurrences', models.PositiveIntegerField(default=0)),
+                ('first_seen', models.DateTimeField(auto_now_add=True)),
+                ('last_seen', models.DateTimeField(auto_now=True)),
+                ('value', models.ForeignKey(blank=True, help_text='Pick the canonical value to map this spelling to', null=True, on_delete=django.db.models.deletion.CASCADE, to='base.normalizedvalue')),
+            ],
+            options={
+                'unique_together': {('kind', 'key')},
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:28
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def count_interests(apps, schema_editor):
+    for model_name, interest_name, fk, field in (
+        ('Registration', 'EmployerInterest', 'employee', 'shortlist_count'),
+        ('JobOpening', 'EmployeeInterest', 'job', 'interest_count'),
+    ):
+        model = apps.get_model('base', model_name)
+        interests = apps.get_model('base', interest_name).objects.filter(**{fk: models.OuterRef('pk')})
+        counts = interests.order_by().values(fk).annotate(rows=models.Count('pk')).values('rows')
+        model.objects.update(**{field: Coalesce(models.Subquery(counts), 0)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0017_normalized_dimensions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobopening',
+            name='interest_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='shortlist_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='jobopening',
+            index=models.Index(fields=['is_active', '-interest_count', '-id'], name='job_popular_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['-shortlist_count', '-created_at'], name='registration_popular_idx'),
+        ),
+        migrations.RunPython(count_interests, migrations.RunPython.noop),
+    ]
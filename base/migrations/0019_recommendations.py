@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0018_interest_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Recommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('candidates', 'Candidates for an employer'), ('jobs', 'Jobs for a candidate')], max_length=20)),
+                ('owner_id', models.PositiveIntegerField(help_text='Employer id or registration id, depending on kind')),
+                ('items', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('kind', 'owner_id')},
+            },
+        ),
+    ]
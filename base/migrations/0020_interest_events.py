@@ -0,0 +1,67 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:33
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def log_existing_interests(apps, schema_editor):
+    # The current interests become "added" events at their creation time, oldest first.
+    InterestEvent = apps.get_model('base', 'InterestEvent')
+    for stream, model_name, actor, target in (
+        (1, 'EmployerInterest', 'employer_id', 'employee_id'),
+        (2, 'EmployeeInterest', 'employee_id', 'job_id'),
+    ):
+        rows = apps.get_model('base', model_name).objects.order_by('created_at', 'id')
+        InterestEvent.objects.bulk_create(
+            (
+                InterestEvent(stream=stream, action=1, actor_id=actor_id, target_id=target_id, created_at=created_at)
+                for actor_id, target_id, created_at in rows.values_list(actor, target, 'created_at').iterator()
+            ),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0019_recommendations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InterestEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stream', models.PositiveSmallIntegerField(choices=[(1, 'Employer shortlisted candidate'), (2, 'Candidate interested in job')])),
+                ('action', models.SmallIntegerField(choices=[(1, 'Added'), (-1, 'Removed')])),
+                ('actor_id', models.PositiveIntegerField(help_text='Employer id or registration id, depending on stream')),
+                ('target_id', models.PositiveIntegerField(help_text='Registration id or job id, depending on stream')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_id', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='InterestRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=4)),
+                ('stream', models.PositiveSmallIntegerField(choices=[(1, 'Employer shortlisted candidate'), (2, 'Candidate interested in job')])),
+                ('bucket', models.DateTimeField(help_text='Start of the hour or day, in TIME_ZONE')),
+                ('actor_id', models.PositiveIntegerField()),
+                ('added', models.PositiveIntegerField(default=0)),
+                ('removed', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('period', 'stream', 'bucket', 'actor_id')},
+            },
+        ),
+        migrations.RunPython(log_existing_interests, migrations.RunPython.noop),
+    ]
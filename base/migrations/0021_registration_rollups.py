@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0020_interest_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistrationRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('plan', 'Plan'), ('location', 'Location'), ('role', 'Role')], max_length=20)),
+                ('day', models.DateField(help_text='Registration date in TIME_ZONE')),
+                ('value', models.CharField(max_length=100)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['created_at'], name='registration_created_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='registrationrollup',
+            unique_together={('dimension', 'day', 'value')},
+        ),
+    ]
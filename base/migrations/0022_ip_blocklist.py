@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0021_registration_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlockedNetwork',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('network', models.CharField(help_text='Address or CIDR range, e.g. 203.0.113.0/24', max_length=43, unique=True)),
+                ('source', models.CharField(choices=[('manual', 'Added by staff'), ('rate_limit', 'Repeated rate limit blocks'), ('cleanup', 'Malicious data cleanup')], default='manual', max_length=20)),
+                ('reason', models.CharField(blank=True, max_length=255)),
+                ('expires_at', models.DateTimeField(blank=True, help_text='Leave empty to block until removed', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='contact',
+            name='client_ip',
+            field=models.GenericIPAddressField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='employer',
+            name='client_ip',
+            field=models.GenericIPAddressField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='client_ip',
+            field=models.GenericIPAddressField(blank=True, editable=False, null=True),
+        ),
+    ]
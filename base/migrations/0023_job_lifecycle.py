@@ -0,0 +1,50 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:43
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def publish_at_creation(apps, schema_editor):
+    # Existing openings went live when they were created.
+    apps.get_model('base', 'JobOpening').objects.update(publish_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0022_ip_blocklist'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='jobopening',
+            name='job_feed_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='jobopening',
+            name='job_feed_type_idx',
+        ),
+        migrations.AddField(
+            model_name='jobopening',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, help_text='Deactivated by `manage.py expire_jobs` after this; empty = never', null=True),
+        ),
+        migrations.AddField(
+            model_name='jobopening',
+            name='publish_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Hidden from candidates until then'),
+        ),
+        migrations.RunPython(publish_at_creation, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='jobopening',
+            index=models.Index(fields=['is_active', '-publish_at', '-id'], name='job_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobopening',
+            index=models.Index(fields=['is_active', 'job_type', '-publish_at'], name='job_feed_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobopening',
+            index=models.Index(fields=['is_active', 'expires_at'], name='job_expiry_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:20
+
+import ipaddress
+from datetime import timedelta
+
+from django.db import migrations
+from django.utils import timezone
+
+
+def unblock_private_addresses(apps, schema_editor):
+    # Automatic blocks used to follow a forged X-Forwarded-For, which could block loopback or the proxy itself.
+    BlockedNetwork = apps.get_model('base', 'BlockedNetwork')
+    unsafe = []
+    for pk, network in BlockedNetwork.objects.exclude(source='manual').values_list('pk', 'network'):
+        try:
+            is_global = ipaddress.ip_network(network, strict=False).is_global
+        except ValueError:
+            is_global = False
+        if not is_global:
+            unsafe.append(pk)
+    BlockedNetwork.objects.filter(pk__in=unsafe).delete()
+    # Cleanup blocks used to last forever.
+    BlockedNetwork.objects.filter(source='cleanup', expires_at__isnull=True).update(
+        expires_at=timezone.now() + timedelta(days=30),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0023_job_lifecycle'),
+    ]
+
+    operations = [
+        migrations.RunPython(unblock_private_addresses, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,49 @@
+import ipaddress
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX, UNUSABLE_PASSWORD_SUFFIX_LENGTH
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
+
+
+HASHED_PASSWORD_PREFIX = 'pbkdf2_sha256$'
+
+
+def is_unusable_password(password):
+    """
+    Whether ``password`` is what ``make_password(None)`` returns. Anything
+    else starting with ``'!'`` is somebody's plaintext password.
+    """
+    suffix = password[len(UNUSABLE_PASSWORD_PREFIX):]
+    return (
+        password.startswith(UNUSABLE_PASSWORD_PREFIX)
+        and len(suffix) == UNUSABLE_PASSWORD_SUFFIX_LENGTH
+        and suffix.isascii() and suffix.isalnum()
+    )
+
+
+def hash_plaintext_password(password):
+    """Hash ``password`` unless it is already hashed or marked unusable."""
+    if password and not password.startswith(HASHED_PASSWORD_PREFIX) and not is_unusable_password(password):
+        from django.contrib.auth.hashers import make_password
+        return make_password(password)
+    return password
+
+
+def exclude_counter_fields(instance, save_kwargs):
+    """
+    Leave ``instance.COUNTER_FIELDS`` out of a full save of an existing row.
+
+    Counters only change through ``F()`` updates; writing back the value
+    loaded with the instance would undo increments made since.
+    """
+    if instance._state.adding or save_kwargs.get('force_insert') or save_kwargs.get('update_fields') is not None:
+        return
+    save_kwargs['update_fields'] = [
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in instance.COUNTER_FIELDS
+    ]
+
 
 class Registration(models.Model):
     PLAN_CHOICES = [
@@ -16,21 +61,58 @@ class Registration(models.Model):
     qualification = models.CharField(max_length=100)
     experience = models.CharField(max_length=20)
     role = models.CharField(max_length=100)
+    # Filled from the free-text fields above on save (see base.dimensions)
+    experience_months = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    normalized_location = models.ForeignKey(
+        'NormalizedValue', on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    normalized_role = models.ForeignKey(
+        'NormalizedValue', on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    normalized_qualification = models.ForeignKey(
+        'NormalizedValue', on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    normalized_nationality = models.ForeignKey(
+        'NormalizedValue', on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
     resume = models.FileField(upload_to='resumes/')
     photo = models.ImageField(upload_to='employee_photos/', blank=True, null=True)  # Professional photo
     skills = models.TextField(blank=True, null=True, help_text="Comma-separated list of skills (e.g., Excel, Tally, SAP, QuickBooks)")
     plan = models.CharField(max_length=20, choices=PLAN_CHOICES, default='basic')
     is_placed = models.BooleanField(default=False, help_text="Mark this employee as placed (hired by an employer)")
+    # Number of employers that shortlisted this candidate (see base.counters)
+    shortlist_count = models.PositiveIntegerField(default=0, editable=False)
+    # Where the form was submitted from, so cleanups can block it (see base.ipblock)
+    client_ip = models.GenericIPAddressField(blank=True, null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    COUNTER_FIELDS = ('shortlist_count',)
+    # Free-text columns the normalized ones are derived from (see base.dimensions).
+    DIMENSION_SOURCE_FIELDS = ('experience', 'location', 'role', 'qualification', 'nationality')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-shortlist_count', '-created_at'], name='registration_popular_idx'),
+            # Newest-first listings and date-range rebuilds of the registration rollups.
+            models.Index(fields=['created_at'], name='registration_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name} - {self.role} ({self.plan})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets a save skip renormalizing when none of these were edited.
+        instance._loaded_sources = {
+            name: value for name, value in zip(field_names, values) if name in cls.DIMENSION_SOURCE_FIELDS
+        }
+        return instance
+
     def save(self, *args, **kwargs):
         # Auto-hash password if it's plaintext
-        if self.password and not self.password.startswith('pbkdf2_sha256$'):
-            from django.contrib.auth.hashers import make_password
-            self.password = make_password(self.password)
+        self.password = hash_plaintext_password(self.password)
+        exclude_counter_fields(self, kwargs)
         super().save(*args, **kwargs)
 
 
@@ -44,6 +126,7 @@ class Employer(models.Model):
     location = models.CharField(max_length=100)
     industry = models.CharField(max_length=100)
     logo = models.ImageField(upload_to='employer_logos/', blank=True, null=True)
+    client_ip = models.GenericIPAddressField(blank=True, null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -51,12 +134,13 @@ class Employer(models.Model):
 
     def save(self, *args, **kwargs):
         # Auto-hash password if it's plaintext
-        if self.password and not self.password.startswith('pbkdf2_sha256$'):
-            from django.contrib.auth.hashers import make_password
-            self.password = make_password(self.password)
+        self.password = hash_plaintext_password(self.password)
         super().save(*args, **kwargs)
 
 
+JOB_TYPES = ('Full-time', 'Part-time', 'Contract', 'Remote')
+
+
 class JobOpening(models.Model):
     employer = models.ForeignKey(Employer, on_delete=models.CASCADE, related_name='job_openings')
     title = models.CharField(max_length=200)
@@ -64,19 +148,48 @@ class JobOpening(models.Model):
     requirements = models.TextField()
     salary_range = models.CharField(max_length=50, blank=True)
     location = models.CharField(max_length=100)
-    job_type = models.CharField(max_length=50, default='Full-time')  # Full-time, Part-time, Contract
+    job_type = models.CharField(max_length=50, default='Full-time')  # one of JOB_TYPES
     is_active = models.BooleanField(default=True)
+    publish_at = models.DateTimeField(default=timezone.now, help_text="Hidden from candidates until then")
+    expires_at = models.DateTimeField(
+        blank=True, null=True, help_text="Deactivated by `manage.py expire_jobs` after this; empty = never",
+    )
+    # Number of candidates interested in this job (see base.counters)
+    interest_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    COUNTER_FIELDS = ('interest_count',)
+
+    class Meta:
+        # is_active leads every feed index, so a feed scan only walks the active openings however many
+        # inactive ones pile up. (MySQL ignores index conditions, so a partial index isn't an option.)
+        indexes = [
+            # Newest-first job feed (keyset pagination on publish_at, id).
+            models.Index(fields=['is_active', '-publish_at', '-id'], name='job_feed_idx'),
+            models.Index(fields=['is_active', '-interest_count', '-id'], name='job_popular_idx'),
+            models.Index(fields=['is_active', 'job_type', '-publish_at'], name='job_feed_type_idx'),
+            models.Index(fields=['is_active', 'expires_at'], name='job_expiry_idx'),
+            models.Index(fields=['location'], name='job_location_idx'),
+        ]
+
     def __str__(self):
         return f"{self.title} at {self.employer.company_name}"
 
+    def clean(self):
+        if self.expires_at and self.publish_at and self.expires_at <= self.publish_at:
+            raise ValidationError({'expires_at': "Must be after the publish date."})
+
+    def save(self, *args, **kwargs):
+        exclude_counter_fields(self, kwargs)
+        super().save(*args, **kwargs)
+
 
 class Contact(models.Model):
     name = models.CharField(max_length=150)
     email = models.EmailField()
     phone = models.CharField(max_length=20)
     message = models.TextField()
+    client_ip = models.GenericIPAddressField(blank=True, null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -106,3 +219,300 @@ class EmployeeInterest(models.Model):
     def __str__(self):
         return f"EMP-{self.employee.id:04d} ({self.employee.name}) → {self.job.title} at {self.job.employer.company_name}"
 
+
+
+class InterestEvent(models.Model):
+    """
+    Append-only log of interests being added and removed.
+
+    Kept compact on purpose: plain ids instead of foreign keys and no
+    secondary indexes, so logging is one cheap INSERT and the history
+    outlives the rows it describes. ``base.rollups`` folds it into
+    ``InterestRollup``.
+    """
+    SHORTLIST = 1  # employer → candidate (EmployerInterest)
+    JOB = 2  # candidate → job (EmployeeInterest)
+    STREAM_CHOICES = [
+        (SHORTLIST, 'Employer shortlisted candidate'),
+        (JOB, 'Candidate interested in job'),
+    ]
+    ADDED = 1
+    REMOVED = -1
+    ACTION_CHOICES = [
+        (ADDED, 'Added'),
+        (REMOVED, 'Removed'),
+    ]
+
+    stream = models.PositiveSmallIntegerField(choices=STREAM_CHOICES)
+    action = models.SmallIntegerField(choices=ACTION_CHOICES)
+    actor_id = models.PositiveIntegerField(help_text="Employer id or registration id, depending on stream")
+    target_id = models.PositiveIntegerField(help_text="Registration id or job id, depending on stream")
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.get_stream_display()} {self.get_action_display().lower()}: {self.actor_id} → {self.target_id}"
+
+
+class InterestRollup(models.Model):
+    """Interest events per hour or day, stream and actor (see ``base.rollups``)."""
+    HOUR = 'hour'
+    DAY = 'day'
+    PERIOD_CHOICES = [
+        (HOUR, 'Hour'),
+        (DAY, 'Day'),
+    ]
+
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+    stream = models.PositiveSmallIntegerField(choices=InterestEvent.STREAM_CHOICES)
+    bucket = models.DateTimeField(help_text="Start of the hour or day, in TIME_ZONE")
+    actor_id = models.PositiveIntegerField()
+    added = models.PositiveIntegerField(default=0)
+    removed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        # Also serves the charts' (period, stream, bucket range) queries.
+        unique_together = ('period', 'stream', 'bucket', 'actor_id')
+
+    def __str__(self):
+        return f"{self.get_stream_display()} {timezone.localtime(self.bucket):%Y-%m-%d %H:00} #{self.actor_id}: +{self.added} -{self.removed}"
+
+
+class RegistrationRollup(models.Model):
+    """New registrations per day and plan, location or role (see ``base.rollups``)."""
+    DIMENSION_CHOICES = [
+        ('plan', 'Plan'),
+        ('location', 'Location'),
+        ('role', 'Role'),
+    ]
+
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    day = models.DateField(help_text="Registration date in TIME_ZONE")
+    value = models.CharField(max_length=100)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        # Also serves the time-series (dimension, day range) queries.
+        unique_together = ('dimension', 'day', 'value')
+
+    def __str__(self):
+        return f"{self.get_dimension_display()} {self.value} on {self.day}: {self.count}"
+
+
+class RollupWatermark(models.Model):
+    """The last source row a rollup in ``base.rollups`` has folded in."""
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_id}"
+
+
+class InterestNotification(models.Model):
+    """Outbox row for an interest click, sent later as part of a per-recipient digest."""
+    SHORTLISTED = 'shortlisted'  # employer shortlisted a candidate → tell the candidate
+    APPLIED = 'applied'  # candidate showed interest in a job → tell the employer
+    KIND_CHOICES = [
+        (SHORTLISTED, 'Candidate shortlisted'),
+        (APPLIED, 'Candidate interested in job'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    recipient_email = models.EmailField()
+    employer = models.ForeignKey(Employer, on_delete=models.CASCADE, related_name='+')
+    employee = models.ForeignKey(Registration, on_delete=models.CASCADE, related_name='+')
+    job = models.ForeignKey(JobOpening, on_delete=models.CASCADE, related_name='+', blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['sent_at', 'recipient_email'], name='notification_outbox_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} → {self.recipient_email}"
+
+
+class ResumeText(models.Model):
+    """Plain text pulled from a candidate's resume, kept for search."""
+    registration = models.OneToOneField(
+        Registration, on_delete=models.CASCADE, primary_key=True, related_name='resume_text'
+    )
+    content_hash = models.CharField(max_length=64, help_text="SHA-256 of the file the text came from")
+    text = models.TextField(blank=True)
+    error = models.CharField(max_length=255, blank=True)
+    extracted_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Resume text for EMP-{self.registration_id:04d}"
+
+
+class NormalizedValue(models.Model):
+    """A canonical location, role, qualification or nationality."""
+    KIND_CHOICES = [
+        ('location', 'Location'),
+        ('role', 'Role'),
+        ('qualification', 'Qualification'),
+        ('nationality', 'Nationality'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        unique_together = ('kind', 'name')
+        ordering = ('kind', 'name')
+
+    def __str__(self):
+        return self.name
+
+
+class NormalizedAlias(models.Model):
+    """A spelling (as a normalized key, e.g. "dubai uae") that maps to a canonical value."""
+    kind = models.CharField(max_length=20, choices=NormalizedValue.KIND_CHOICES)
+    key = models.CharField(max_length=100)
+    value = models.ForeignKey(NormalizedValue, on_delete=models.CASCADE, related_name='aliases')
+
+    class Meta:
+        unique_together = ('kind', 'key')
+        verbose_name_plural = 'normalized aliases'
+
+    def __str__(self):
+        return f"{self.key} → {self.value}"
+
+
+class UnmappedValue(models.Model):
+    """A free-text value with no alias yet, queued for staff to map."""
+    kind = models.CharField(max_length=20, choices=NormalizedValue.KIND_CHOICES)
+    key = models.CharField(max_length=100)
+    raw_value = models.CharField(max_length=100, help_text="One spelling seen in the data")
+    occurrences = models.PositiveIntegerField(default=0)
+    value = models.ForeignKey(
+        NormalizedValue, on_delete=models.CASCADE, null=True, blank=True,
+        help_text="Pick the canonical value to map this spelling to",
+    )
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('kind', 'key')
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.raw_value}"
+
+
+class FacetCell(models.Model):
+    """
+    How many rows of a faceted model share one combination of facet values.
+
+    Maintained incrementally by ``base.facets``; ``manage.py rebuild_facets``
+    recomputes it from scratch.
+    """
+    facet = models.CharField(max_length=50)
+    key = models.CharField(max_length=40, help_text="SHA-1 of the JSON-encoded values")
+    values = models.JSONField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('facet', 'key')
+
+    def __str__(self):
+        return f"{self.facet} {self.values}: {self.count}"
+
+
+class Recommendation(models.Model):
+    """
+    The top recommended candidates for an employer, or jobs for a candidate.
+
+    Written by ``manage.py refresh_recommendations`` (see
+    ``base.recommendations``); ``items`` is ``[[id, score], …]``, best first.
+    """
+    CANDIDATES = 'candidates'
+    JOBS = 'jobs'
+    KIND_CHOICES = [
+        (CANDIDATES, 'Candidates for an employer'),
+        (JOBS, 'Jobs for a candidate'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    owner_id = models.PositiveIntegerField(help_text="Employer id or registration id, depending on kind")
+    items = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('kind', 'owner_id')
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.owner_id}: {len(self.items)}"
+
+
+class BlockedNetwork(models.Model):
+    """An IPv4/IPv6 address or range refused by ``IPBlocklistMiddleware`` (see ``base.ipblock``)."""
+    MANUAL = 'manual'
+    RATE_LIMIT = 'rate_limit'
+    CLEANUP = 'cleanup'
+    SOURCE_CHOICES = [
+        (MANUAL, 'Added by staff'),
+        (RATE_LIMIT, 'Repeated rate limit blocks'),
+        (CLEANUP, 'Malicious data cleanup'),
+    ]
+
+    network = models.CharField(max_length=43, unique=True, help_text="Address or CIDR range, e.g. 203.0.113.0/24")
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default=MANUAL)
+    reason = models.CharField(max_length=255, blank=True)
+    expires_at = models.DateTimeField(blank=True, null=True, help_text="Leave empty to block until removed")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.network
+
+    def clean(self):
+        try:
+            self.network = str(ipaddress.ip_network(self.network.strip(), strict=False))
+        except ValueError:
+            raise ValidationError({'network': "Enter an IP address or a CIDR range."})
+
+
+class Task(models.Model):
+    """A unit of background work, claimed and run by `manage.py run_workers`."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    DEAD = 'dead'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (DEAD, 'Dead'),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    priority = models.SmallIntegerField(default=0, help_text="Higher runs first")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-priority', 'run_at'], name='task_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.id} ({self.status})"
+
+
+class DeadLetterTask(Task):
+    """Admin view onto tasks that exhausted their retries."""
+
+    class Meta:
+        proxy = True
+        verbose_name = 'dead-letter task'
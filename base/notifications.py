@@ -0,0 +1,141 @@
+"""
+Interest notifications.
+
+The interest views only append a row to the ``InterestNotification`` outbox
+(or drop the unsent row when the interest is toggled off again). The
+``send_interest_digests`` command later groups pending rows per recipient
+and sends one digest each, reusing a single mail connection per batch.
+"""
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection as db_connection, transaction
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import InterestNotification
+
+DIGEST_TEMPLATES = {
+    InterestNotification.SHORTLISTED: (
+        'base/emails/shortlisted_digest_subject.txt',
+        'base/emails/shortlisted_digest.txt',
+    ),
+    InterestNotification.APPLIED: (
+        'base/emails/applied_digest_subject.txt',
+        'base/emails/applied_digest.txt',
+    ),
+}
+
+
+def record_shortlisted(employer, employee):
+    InterestNotification.objects.create(
+        kind=InterestNotification.SHORTLISTED,
+        recipient_email=employee.email,
+        employer=employer,
+        employee=employee,
+    )
+
+
+def record_applied(employee, job):
+    InterestNotification.objects.create(
+        kind=InterestNotification.APPLIED,
+        recipient_email=job.employer.email,
+        employer_id=job.employer_id,
+        employee=employee,
+        job=job,
+    )
+
+
+def cancel_pending(**lookups):
+    """Drop unsent notifications, e.g. when an interest is toggled off before the digest goes out."""
+    InterestNotification.objects.filter(sent_at__isnull=True, **lookups).delete()
+
+
+def build_digest(kind, recipient_email, notifications):
+    subject_template, body_template = DIGEST_TEMPLATES[kind]
+    context = {
+        'recipient_email': recipient_email,
+        'notifications': notifications,
+        'count': len(notifications),
+        'site_url': getattr(settings, 'SITE_URL', ''),
+    }
+    subject = ' '.join(render_to_string(subject_template, context).split())
+    body = render_to_string(body_template, context)
+    return EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [recipient_email])
+
+
+def _lock_batch(lock_options, after, batch_size):
+    """
+    Lock up to ``batch_size`` pending rows for recipients after ``after``,
+    plus the rest of the last recipient's rows so its digest is not split.
+    """
+    pending = InterestNotification.objects.select_for_update(**lock_options).filter(sent_at__isnull=True)
+    if after is not None:
+        pending = pending.filter(recipient_email__gt=after)
+    pending = pending.select_related('employer', 'employee', 'job').order_by('recipient_email', 'kind', 'id')
+    batch = list(pending[:batch_size])
+    if len(batch) == batch_size:
+        last = batch[-1]
+        batch += pending.filter(
+            Q(kind__gt=last.kind) | Q(kind=last.kind, id__gt=last.id),
+            recipient_email=last.recipient_email,
+        )
+    return batch
+
+
+def send_digests(batch_size=None, dry_run=False):
+    """
+    Send every pending notification as per-recipient digests.
+
+    Batches end at a recipient boundary and are paged by recipient, so a
+    digest is never split and a dry run never revisits rows. Each batch is
+    locked with ``SKIP LOCKED`` and marked sent before the transaction
+    commits, so overlapping runs don't pick it up; the mail goes out after
+    the commit, one digest at a time. When a digest is refused, its rows and
+    the rest of the batch are put back for the next run and the error is
+    raised, so mail that was already accepted is never sent twice. (A crash
+    between the commit and the send loses that batch rather than repeating it.)
+    Returns ``(digests_sent, notifications_sent)``.
+    """
+    batch_size = batch_size or getattr(settings, 'NOTIFICATION_DIGEST_BATCH_SIZE', 500)
+    lock_options = {}
+    if db_connection.features.has_select_for_update_skip_locked:
+        lock_options['skip_locked'] = True
+    if db_connection.features.has_select_for_update_of:
+        # Only lock outbox rows, not the joined employer/candidate/job rows.
+        lock_options['of'] = ('self',)
+
+    digests_sent = 0
+    notifications_sent = 0
+    after = None
+    while True:
+        with transaction.atomic():
+            pending = _lock_batch(lock_options, after, batch_size)
+            if not pending:
+                break
+            if not dry_run:
+                InterestNotification.objects.filter(id__in=[n.id for n in pending]).update(sent_at=timezone.now())
+        after = pending[-1].recipient_email
+
+        digests = []
+        for (recipient_email, kind), group in groupby(pending, key=lambda n: (n.recipient_email, n.kind)):
+            rows = list(group)
+            digests.append((build_digest(kind, recipient_email, rows), [n.id for n in rows]))
+        if dry_run:
+            digests_sent += len(digests)
+            notifications_sent += len(pending)
+            continue
+
+        with get_connection() as mail_connection:
+            for index, (message, ids) in enumerate(digests):
+                try:
+                    mail_connection.send_messages([message])
+                except Exception:
+                    unsent = [pk for _, digest_ids in digests[index:] for pk in digest_ids]
+                    InterestNotification.objects.filter(id__in=unsent).update(sent_at=None)
+                    raise
+                digests_sent += 1
+                notifications_sent += len(ids)
+    return digests_sent, notifications_sent
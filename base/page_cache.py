@@ -0,0 +1,139 @@
+"""
+Server-side caching of the landing and terms pages.
+
+These pages only depend on who is signed in, so ``render_cached`` renders a
+*shell* once per distinct context (anonymous, employee, employer), minifies
+it and keeps it in the cache for ``PAGE_CACHE_SECONDS``. Anonymous visitors
+get the shell as is; for a signed-in user the ``fragments`` (their name) are
+filled in by replacing placeholders, so a hit renders no template at all.
+
+Responses carry an ``ETag`` and ``Last-Modified`` and answer conditional
+requests with 304; they ``Vary: Cookie`` since the session picks the shell.
+While flash messages are pending the page is rendered normally, as the
+shell can't show them.
+
+Shells are shared between visitors, so they must not contain anything
+per-visitor: forms copy the CSRF token from the cookie on submit instead of
+using ``{% csrf_token %}``.
+
+Hits, misses and bypasses are counted per page in the cache;
+``manage.py page_cache_stats`` reports the hit ratio.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.html import escape
+from django.utils.http import http_date
+
+from .middleware import minify_html
+
+# page name → template
+CACHED_PAGES = {
+    'landing': 'base/index.html',
+    'terms': 'base/terms.html',
+}
+
+OUTCOMES = ('hit', 'miss', 'bypass')
+
+PLACEHOLDER = '__page_fragment_{}__'
+
+
+def cache_seconds():
+    return getattr(settings, 'PAGE_CACHE_SECONDS', 600)
+
+
+def shell_key(template_name, context):
+    # A deploy with new static files changes the manifest hash, so shells never point at old assets.
+    version = getattr(staticfiles_storage, 'manifest_hash', '')
+    raw = json.dumps([template_name, context, version], sort_keys=True, default=str)
+    return f'page_cache:{hashlib.sha1(raw.encode()).hexdigest()}'
+
+
+def stats_key(page, outcome):
+    return f'page_cache_stats:{page}:{outcome}'
+
+
+def count(page, outcome):
+    key = stats_key(page, outcome)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:  # evicted between add and incr
+        cache.set(key, 1, None)
+
+
+def page_stats(page):
+    """``{'hit': n, 'miss': n, 'bypass': n, 'ratio': hits / (hits + misses) or None}``."""
+    values = cache.get_many([stats_key(page, outcome) for outcome in OUTCOMES])
+    stats = {outcome: values.get(stats_key(page, outcome), 0) for outcome in OUTCOMES}
+    lookups = stats['hit'] + stats['miss']
+    stats['ratio'] = stats['hit'] / lookups if lookups else None
+    return stats
+
+
+def reset_stats(page):
+    cache.delete_many([stats_key(page, outcome) for outcome in OUTCOMES])
+
+
+def has_pending_messages(request):
+    storage = getattr(request, '_messages', None)
+    # len() loads the messages without marking them as seen.
+    return storage is not None and len(storage) > 0
+
+
+def render_shell(template_name, context, fragments):
+    """``(html, digest, rendered_at)`` with placeholders in place of ``fragments``."""
+    placeholders = {name: PLACEHOLDER.format(name) for name in fragments}
+    # Rendered without the request, so nothing of the current visitor ends up in the shell.
+    html = render_to_string(template_name, {**context, **placeholders})
+    if getattr(settings, 'MINIFY_HTML', True):
+        html = minify_html(html)
+    return html, hashlib.sha1(html.encode()).hexdigest(), int(time.time())
+
+
+def render_cached(request, page, context=None, fragments=None):
+    """
+    Page ``page`` of ``CACHED_PAGES``: the cached shell for ``context`` with
+    ``fragments`` (name → text, escaped here) filled in.
+    """
+    template_name = CACHED_PAGES[page]
+    context = context or {}
+    fragments = fragments or {}
+    # Sets the CSRF cookie the page's forms read their token from.
+    get_token(request)
+    if request.method not in ('GET', 'HEAD') or has_pending_messages(request):
+        count(page, 'bypass')
+        return render(request, template_name, {**context, **fragments})
+
+    key = shell_key(template_name, context)
+    entry = cache.get(key)
+    if entry is None:
+        count(page, 'miss')
+        entry = render_shell(template_name, context, fragments)
+        cache.set(key, entry, cache_seconds())
+    else:
+        count(page, 'hit')
+    html, digest, rendered_at = entry
+
+    if fragments:
+        for name, value in fragments.items():
+            html = html.replace(PLACEHOLDER.format(name), escape(value or ''))
+        digest = hashlib.sha1(f'{digest}{json.dumps(fragments, sort_keys=True)}'.encode()).hexdigest()
+
+    response = HttpResponse(html)
+    response['ETag'] = f'"{digest}"'
+    response['Last-Modified'] = http_date(rendered_at)
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ('Cookie',))
+    # Tells ResponseOptimizationMiddleware the shell is minified already.
+    response.minified = True
+    return get_conditional_response(request, etag=response['ETag'], last_modified=rendered_at, response=response)
@@ -0,0 +1,147 @@
+"""
+"Employers like you also shortlisted" recommendations.
+
+The interest tables form two bipartite graphs: employers × candidates
+(``EmployerInterest``) and candidates × jobs (``EmployeeInterest``). For
+each graph ``build`` loads the sparse owner × item matrix as adjacency
+sets in one query, scores item-item cosine similarity from co-occurrence
+counts (only pairs that share an owner are ever touched), and ranks for
+every owner the items most similar to the ones they already picked.
+
+The top ``RECOMMENDATIONS_TOP_N`` of each owner are stored as one
+``Recommendation`` row, so a dashboard reads them with a single indexed
+lookup. ``manage.py refresh_recommendations`` recomputes the lists and
+only writes the rows whose list changed.
+"""
+import heapq
+import math
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EmployeeInterest, EmployerInterest, Recommendation, Registration
+
+# Most similar items kept per item; bounds the work per owner.
+NEIGHBOURS = 50
+
+
+class RecommendationSpec:
+    def __init__(self, kind, interest_model, owner_field, item_field, eligible):
+        self.kind = kind
+        self.interest_model = interest_model
+        self.owner_field = owner_field
+        self.item_field = item_field
+        # Returns a queryset of the items that may be recommended.
+        self.eligible = eligible
+
+
+def live_jobs():
+    from .job_feed import live_jobs  # job_feed imports this module
+    return live_jobs()
+
+
+RECOMMENDATIONS = {
+    Recommendation.CANDIDATES: RecommendationSpec(
+        Recommendation.CANDIDATES, EmployerInterest, 'employer_id', 'employee_id',
+        lambda: Registration.objects.filter(is_placed=False),
+    ),
+    Recommendation.JOBS: RecommendationSpec(
+        Recommendation.JOBS, EmployeeInterest, 'employee_id', 'job_id',
+        live_jobs,
+    ),
+}
+
+
+def top_n():
+    return getattr(settings, 'RECOMMENDATIONS_TOP_N', 12)
+
+
+def load_graph(spec):
+    """The interest table as ``({owner: {items}}, {item: {owners}})``."""
+    owner_items = defaultdict(set)
+    item_owners = defaultdict(set)
+    rows = spec.interest_model.objects.order_by().values_list(spec.owner_field, spec.item_field)
+    for owner, item in rows.iterator(chunk_size=5000):
+        owner_items[owner].add(item)
+        item_owners[item].add(owner)
+    return owner_items, item_owners
+
+
+def item_similarities(owner_items, item_owners, neighbours=NEIGHBOURS):
+    """``{item: [(other_item, cosine), …]}``, the ``neighbours`` most similar first."""
+    similar = {}
+    for item, owners in item_owners.items():
+        co_counts = Counter()
+        for owner in owners:
+            co_counts.update(owner_items[owner])
+        del co_counts[item]
+        scored = (
+            (other, count / math.sqrt(len(owners) * len(item_owners[other])))
+            for other, count in co_counts.items()
+        )
+        similar[item] = heapq.nlargest(neighbours, scored, key=lambda pair: (pair[1], -pair[0]))
+    return similar
+
+
+def recommend(items, similar, eligible, limit):
+    """The ``limit`` best ``[item, score]`` pairs for an owner who picked ``items``."""
+    scores = Counter()
+    for item in items:
+        for other, similarity in similar.get(item, ()):
+            if other not in items and other in eligible:
+                scores[other] += similarity
+    best = heapq.nlargest(limit, scores.items(), key=lambda pair: (pair[1], -pair[0]))
+    return [[other, round(score, 4)] for other, score in best]
+
+
+def build(spec, limit=None):
+    """``{owner_id: [[item_id, score], …]}`` for every owner with at least one recommendation."""
+    limit = limit or top_n()
+    owner_items, item_owners = load_graph(spec)
+    similar = item_similarities(owner_items, item_owners)
+    eligible = set(spec.eligible().filter(pk__in=list(item_owners)).values_list('pk', flat=True))
+    lists = {}
+    for owner, items in owner_items.items():
+        best = recommend(items, similar, eligible, limit)
+        if best:
+            lists[owner] = best
+    return lists
+
+
+def refresh(spec, limit=None, batch_size=500):
+    """
+    Store the current recommendations of ``spec``, writing only rows that changed.
+
+    Returns ``(created, updated, deleted)``.
+    """
+    lists = build(spec, limit)
+    stored = {
+        row.owner_id: row
+        for row in Recommendation.objects.filter(kind=spec.kind).only('id', 'owner_id', 'items')
+    }
+    new_rows = [
+        Recommendation(kind=spec.kind, owner_id=owner, items=items)
+        for owner, items in lists.items() if owner not in stored
+    ]
+    changed = []
+    now = timezone.now()
+    for owner, row in stored.items():
+        if owner in lists and row.items != lists[owner]:
+            row.items = lists[owner]
+            row.updated_at = now
+            changed.append(row)
+    stale = [row.id for owner, row in stored.items() if owner not in lists]
+    with transaction.atomic():
+        Recommendation.objects.bulk_create(new_rows, batch_size=batch_size)
+        Recommendation.objects.bulk_update(changed, ['items', 'updated_at'], batch_size=batch_size)
+        for start in range(0, len(stale), batch_size):
+            Recommendation.objects.filter(id__in=stale[start:start + batch_size]).delete()
+    return len(new_rows), len(changed), len(stale)
+
+
+def recommended_ids(kind, owner_id):
+    """Item ids recommended to ``owner_id``, best first (one indexed lookup)."""
+    items = Recommendation.objects.filter(kind=kind, owner_id=owner_id).values_list('items', flat=True).first()
+    return [item for item, score in items or ()]
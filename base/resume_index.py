@@ -0,0 +1,45 @@
+"""
+Storage and search for extracted resume text.
+
+Text is kept in ``ResumeText`` keyed by the file's SHA-256, so a resume is
+only re-extracted when its content changes. On MySQL the table carries a
+FULLTEXT index and searches use ``MATCH ... AGAINST``; other backends fall
+back to ``icontains`` per search term.
+"""
+from .models import Registration, ResumeText
+from .resume_text import process_file
+from .search import fulltext_filter, search_terms
+
+
+def save_result(registration_id, content_hash, text, error):
+    """Store the output of ``resume_text.process_file`` (``text=None`` means unchanged)."""
+    if text is None:
+        return False
+    ResumeText.objects.update_or_create(
+        registration_id=registration_id,
+        defaults={'content_hash': content_hash, 'text': text, 'error': error},
+    )
+    return True
+
+
+def index_registration(registration_id, force=False):
+    """Extract and store the resume text of one registration if it changed."""
+    registration = Registration.objects.only('id', 'resume').get(id=registration_id)
+    if not registration.resume:
+        ResumeText.objects.filter(registration_id=registration_id).delete()
+        return False
+    known_hash = None
+    if not force:
+        known_hash = (
+            ResumeText.objects.filter(registration_id=registration_id)
+            .values_list('content_hash', flat=True).first()
+        )
+    return save_result(*process_file(registration.id, registration.resume.path, known_hash))
+
+
+def search_registration_ids(query, limit=500):
+    """Return ids of registrations whose resume text matches every word of ``query``."""
+    if not search_terms(query):
+        return []
+    queryset = fulltext_filter(ResumeText.objects.all(), ['text'], query)
+    return list(queryset.values_list('registration_id', flat=True)[:limit])
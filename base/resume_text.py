@@ -0,0 +1,182 @@
+"""
+Plain-text extraction from uploaded resumes (PDF, DOCX and TXT).
+
+Everything here works on file paths and has no model imports, so it can run
+in spawned worker processes before ``django.setup()``. PDFs are read with
+``pypdf`` when it is installed; otherwise a best-effort stdlib parser pulls
+the text operators out of the page content streams. Both DOCX parts and PDF
+streams are inflated only up to a fixed size, so a small upload can't
+expand into gigabytes in the worker.
+"""
+import hashlib
+import re
+import zipfile
+import zlib
+from xml.etree import ElementTree
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # optional dependency
+    PdfReader = None
+
+# Stored text is capped so the search table stays compact.
+MAX_TEXT_CHARS = 20000
+
+# Refuse to inflate DOCX parts beyond this size (zip bombs).
+MAX_DOCX_XML_BYTES = 20 * 1024 * 1024
+
+# The stdlib PDF parser reads at most this much of a file and inflates each
+# stream to at most MAX_PDF_STREAM_BYTES (deflate bombs).
+MAX_PDF_BYTES = 20 * 1024 * 1024
+MAX_PDF_STREAM_BYTES = 4 * 1024 * 1024
+
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+PDF_STREAM_RE = re.compile(rb'stream\r?\n(.*?)\r?\n?endstream', re.S)
+PDF_TEXT_RE = re.compile(rb'\((?:\\.|[^\\)])*\)|\[(?:\\.|[^\]\\])*\]\s*TJ|T\*|Td|TD|ET')
+PDF_STRING_RE = re.compile(rb'\((?:\\.|[^\\)])*\)')
+PDF_ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f'}
+
+
+class UnsupportedResume(Exception):
+    pass
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def normalize(text):
+    """Collapse whitespace and cap the length."""
+    return ' '.join(text.split())[:MAX_TEXT_CHARS]
+
+
+def extract_txt(path):
+    with open(path, 'rb') as f:
+        data = f.read(MAX_TEXT_CHARS * 4)
+    return data.decode('utf-8', errors='ignore')
+
+
+def extract_docx(path):
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo('word/document.xml')
+        if info.file_size > MAX_DOCX_XML_BYTES:
+            raise UnsupportedResume('document.xml is too large')
+        with archive.open(info) as xml:
+            parts = []
+            for _event, element in ElementTree.iterparse(xml):
+                if element.tag == f'{WORD_NS}t' and element.text:
+                    parts.append(element.text)
+                elif element.tag in (f'{WORD_NS}p', f'{WORD_NS}tab', f'{WORD_NS}br'):
+                    parts.append(' ')
+                    element.clear()
+    return ''.join(parts)
+
+
+def _pdf_unescape(literal):
+    out = bytearray()
+    i = 1
+    end = len(literal) - 1
+    while i < end:
+        ch = literal[i:i + 1]
+        if ch == b'\\' and i + 1 < end:
+            nxt = literal[i + 1:i + 2]
+            octal = re.match(rb'[0-7]{1,3}', literal[i + 1:i + 4])
+            if octal:
+                out.append(int(octal.group(), 8) & 0xFF)
+                i += 1 + len(octal.group())
+                continue
+            out += PDF_ESCAPES.get(nxt, nxt)
+            i += 2
+            continue
+        out += ch
+        i += 1
+    return out.decode('latin-1')
+
+
+def _is_text_content(content):
+    """Page content streams are ASCII operators; font and image streams are binary."""
+    if b'BT' not in content or (b'Tj' not in content and b'TJ' not in content):
+        return False
+    sample = content[:4096]
+    binary = sum(1 for byte in sample if byte < 9 or 13 < byte < 32 or byte > 126)
+    return binary <= len(sample) // 20
+
+
+def _inflate(raw):
+    """``raw`` inflated to at most ``MAX_PDF_STREAM_BYTES``, or as is when it isn't deflated."""
+    try:
+        return zlib.decompressobj().decompress(raw, MAX_PDF_STREAM_BYTES)
+    except zlib.error:
+        return raw
+
+
+def _extract_pdf_stdlib(path):
+    with open(path, 'rb') as f:
+        data = f.read(MAX_PDF_BYTES)
+    parts = []
+    length = 0
+    for match in PDF_STREAM_RE.finditer(data):
+        content = _inflate(match.group(1))
+        if not _is_text_content(content):
+            continue
+        for token in PDF_TEXT_RE.finditer(content):
+            token = token.group()
+            if token.startswith(b'('):
+                text = _pdf_unescape(token)
+            elif token.startswith(b'['):
+                text = ''.join(_pdf_unescape(s) for s in PDF_STRING_RE.findall(token))
+            else:
+                text = ' '
+            parts.append(text)
+            length += len(text)
+            # normalize() keeps no more than this anyway.
+            if length >= MAX_TEXT_CHARS:
+                return ''.join(parts)
+    return ''.join(parts)
+
+
+def extract_pdf(path):
+    if PdfReader is None:
+        return _extract_pdf_stdlib(path)
+    reader = PdfReader(path)
+    return ' '.join(page.extract_text() or '' for page in reader.pages)
+
+
+EXTRACTORS = {
+    '.pdf': extract_pdf,
+    '.docx': extract_docx,
+    '.txt': extract_txt,
+}
+
+
+def extract_text(path):
+    """Return the normalized text of the resume at ``path``."""
+    extension = '.' + path.rsplit('.', 1)[-1].lower() if '.' in path else ''
+    extractor = EXTRACTORS.get(extension)
+    if extractor is None:
+        raise UnsupportedResume(f"Unsupported resume format '{extension or path}'")
+    return normalize(extractor(path))
+
+
+def process_file(registration_id, path, known_hash=None):
+    """
+    Hash and extract one resume.
+
+    Returns ``(registration_id, content_hash, text, error)``; ``text`` is
+    ``None`` when the file is unchanged since ``known_hash``.
+    """
+    try:
+        content_hash = file_sha256(path)
+    except OSError as e:
+        return registration_id, '', '', f"Could not read file: {e}"
+    if content_hash == known_hash:
+        return registration_id, content_hash, None, ''
+    try:
+        return registration_id, content_hash, extract_text(path), ''
+    except Exception as e:  # corrupt uploads must not stop a backfill
+        return registration_id, content_hash, '', f"{type(e).__name__}: {e}"[:255]
@@ -0,0 +1,300 @@
+"""
+Time-bucketed rollups for the staff dashboard charts.
+
+* ``InterestEvent`` (only ever INSERTed, by the signal handlers in
+  ``base.signals``) → hourly and daily ``InterestRollup`` rows.
+* ``Registration`` → daily ``RegistrationRollup`` rows per plan, location
+  and role, counted with the values a candidate registered with.
+
+Each refresh folds the rows after its ``RollupWatermark`` a batch per
+transaction and moves the watermark in the same transaction, so a
+crashed or concurrent run never counts a row twice. Rows younger than
+``ROLLUP_SETTLE_SECONDS`` wait for the next run: an insert that is still
+uncommitted may hold a lower id than one already visible. Registrations
+edited or deleted later are picked up by ``rebuild_registration_rollups``.
+
+Charts read ``interest_activity`` and ``registration_series``, which only
+touch the rollups.
+"""
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+from itertools import takewhile
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import (
+    EmployeeInterest, EmployerInterest, InterestEvent, InterestRollup, Registration, RegistrationRollup,
+    RollupWatermark,
+)
+
+INTEREST_ROLLUP = 'interest_events'
+REGISTRATION_ROLLUP = 'registrations'
+
+PERIODS = (InterestRollup.HOUR, InterestRollup.DAY)
+
+# Buckets a chart may ask for, per period.
+MAX_SPAN = {InterestRollup.HOUR: 24 * 14, InterestRollup.DAY: 366}
+DEFAULT_SPAN = {InterestRollup.HOUR: 48, InterestRollup.DAY: 30}
+
+STREAM_NAMES = {InterestEvent.SHORTLIST: 'shortlists', InterestEvent.JOB: 'job_interests'}
+
+# interest model → (stream, actor attname, target attname)
+INTEREST_STREAMS = {
+    EmployerInterest: (InterestEvent.SHORTLIST, 'employer_id', 'employee_id'),
+    EmployeeInterest: (InterestEvent.JOB, 'employee_id', 'job_id'),
+}
+
+
+def log_interest(instance, action):
+    """Append an event for an interest row being added or removed."""
+    stream, actor_attname, target_attname = INTEREST_STREAMS[type(instance)]
+    InterestEvent.objects.create(
+        stream=stream, action=action,
+        actor_id=getattr(instance, actor_attname), target_id=getattr(instance, target_attname),
+    )
+
+
+def settle_seconds():
+    return getattr(settings, 'ROLLUP_SETTLE_SECONDS', 60)
+
+
+def bucket_start(value, period):
+    """Start of the hour or day (in ``TIME_ZONE``) that ``value`` falls in."""
+    value = timezone.localtime(value).replace(minute=0, second=0, microsecond=0)
+    if period == InterestRollup.DAY:
+        value = value.replace(hour=0)
+    return value
+
+
+def fold_events(events):
+    """Add ``(stream, action, actor_id, created_at)`` tuples to the rollups."""
+    deltas = defaultdict(lambda: [0, 0])
+    for stream, action, actor_id, created_at in events:
+        for period in PERIODS:
+            counts = deltas[(period, stream, bucket_start(created_at, period), actor_id)]
+            counts[0 if action == InterestEvent.ADDED else 1] += 1
+
+    # A superset of the touched rows, narrowed down by key below.
+    existing = {
+        (row.period, row.stream, row.bucket, row.actor_id): row
+        for row in InterestRollup.objects.filter(
+            bucket__in={key[2] for key in deltas}, actor_id__in={key[3] for key in deltas},
+        )
+    }
+    new_rows, changed = [], []
+    for key, (added, removed) in deltas.items():
+        row = existing.get(key)
+        if row is None:
+            period, stream, bucket, actor_id = key
+            new_rows.append(InterestRollup(
+                period=period, stream=stream, bucket=bucket, actor_id=actor_id, added=added, removed=removed,
+            ))
+        else:
+            row.added += added
+            row.removed += removed
+            changed.append(row)
+    InterestRollup.objects.bulk_create(new_rows, batch_size=1000)
+    InterestRollup.objects.bulk_update(changed, ['added', 'removed'], batch_size=1000)
+
+
+def refresh_from_watermark(name, queryset, fields, fold, batch_size):
+    """
+    Pass the settled rows of ``queryset`` after watermark ``name`` to ``fold``
+    and advance the watermark, a batch per transaction.
+
+    ``fields`` are the ``values_list`` columns, ``'id'`` first and the
+    creation time last; ``fold`` gets the rows without the id. Returns how
+    many rows were folded.
+    """
+    folded = 0
+    while True:
+        with transaction.atomic():
+            RollupWatermark.objects.get_or_create(name=name)
+            # The row lock keeps concurrent runs from folding the same batch.
+            watermark = RollupWatermark.objects.select_for_update().get(name=name)
+            cutoff = timezone.now() - timedelta(seconds=settle_seconds())
+            rows = list(
+                queryset.filter(id__gt=watermark.last_id).order_by('id').values_list(*fields)[:batch_size]
+            )
+            settled = list(takewhile(lambda row: row[-1] < cutoff, rows))
+            if not settled:
+                break
+            fold(row[1:] for row in settled)
+            watermark.last_id = settled[-1][0]
+            watermark.save(update_fields=['last_id', 'updated_at'])
+        folded += len(settled)
+        if len(settled) < batch_size:
+            break
+    return folded
+
+
+def refresh_interest_rollups(batch_size=10000):
+    """Fold the settled events after the watermark into the rollups. Returns how many were folded."""
+    return refresh_from_watermark(
+        INTEREST_ROLLUP, InterestEvent.objects.all(),
+        ('id', 'stream', 'action', 'actor_id', 'created_at'), fold_events, batch_size,
+    )
+
+
+REGISTRATION_FIELDS = (
+    'id', 'plan', 'location', 'normalized_location__name', 'role', 'normalized_role__name', 'created_at',
+)
+
+
+def registration_buckets(plan, location, normalized_location, role, normalized_role, created_at):
+    """The ``(dimension, day, value)`` buckets one registration counts in."""
+    day = timezone.localdate(created_at)
+    return [
+        ('plan', day, plan),
+        # The canonical value where base.dimensions has one, so spellings don't split a series.
+        ('location', day, (normalized_location or location.strip() or 'Unknown')[:100]),
+        ('role', day, (normalized_role or role.strip() or 'Unknown')[:100]),
+    ]
+
+
+def fold_registrations(rows):
+    """Add ``REGISTRATION_FIELDS`` rows (without the id) to the daily buckets."""
+    deltas = Counter(bucket for row in rows for bucket in registration_buckets(*row))
+    if not deltas:
+        return
+    existing = {
+        (row.dimension, row.day, row.value): row
+        for row in RegistrationRollup.objects.filter(day__in={key[1] for key in deltas})
+    }
+    new_rows, changed = [], []
+    for key, count in deltas.items():
+        row = existing.get(key)
+        if row is None:
+            dimension, day, value = key
+            new_rows.append(RegistrationRollup(dimension=dimension, day=day, value=value, count=count))
+        else:
+            row.count += count
+            changed.append(row)
+    RegistrationRollup.objects.bulk_create(new_rows, batch_size=1000)
+    RegistrationRollup.objects.bulk_update(changed, ['count'], batch_size=1000)
+
+
+def refresh_registration_rollups(batch_size=10000):
+    """Fold the settled registrations after the watermark into the daily buckets."""
+    return refresh_from_watermark(
+        REGISTRATION_ROLLUP, Registration.objects.all(), REGISTRATION_FIELDS, fold_registrations, batch_size,
+    )
+
+
+def rebuild_registration_rollups(since=None, until=None, chunk_days=30):
+    """
+    Recount the registration buckets of the days ``since``..``until``
+    (inclusive, default: all of them) from the ``Registration`` table,
+    ``chunk_days`` days per transaction. Fixes buckets after registrations
+    were edited or deleted. Returns the number of registrations counted.
+    """
+    refresh_registration_rollups()
+    if since is None:
+        first = Registration.objects.order_by('created_at').values_list('created_at', flat=True).first()
+        if first is None:
+            RegistrationRollup.objects.all().delete()
+            return 0
+        since = timezone.localdate(first)
+    until = until or timezone.localdate()
+    counted = 0
+    start = since
+    while start <= until:
+        end = min(start + timedelta(days=chunk_days), until + timedelta(days=1))
+        with transaction.atomic():
+            # Holding the watermark keeps a concurrent refresh from folding into the chunk mid-rebuild,
+            # and only rows it already covers are counted; later ones are the next refresh's.
+            watermark, _ = RollupWatermark.objects.get_or_create(name=REGISTRATION_ROLLUP)
+            watermark = RollupWatermark.objects.select_for_update().get(pk=watermark.pk)
+            RegistrationRollup.objects.filter(day__gte=start, day__lt=end).delete()
+            rows = list(
+                Registration.objects.filter(
+                    id__lte=watermark.last_id,
+                    created_at__gte=timezone.make_aware(datetime.combine(start, time.min)),
+                    created_at__lt=timezone.make_aware(datetime.combine(end, time.min)),
+                ).values_list(*REGISTRATION_FIELDS[1:])
+            )
+            fold_registrations(rows)
+        counted += len(rows)
+        start = end
+    return counted
+
+
+# name → refresh function, for ``manage.py refresh_rollups``
+ROLLUPS = {
+    'interests': refresh_interest_rollups,
+    'registrations': refresh_registration_rollups,
+}
+
+
+def bucket_range(period, span, now=None):
+    """The last ``span`` bucket starts of ``period``, oldest first, ending with the current one."""
+    current = bucket_start(now or timezone.now(), period)
+    step = timedelta(hours=1) if period == InterestRollup.HOUR else timedelta(days=1)
+    # Stepping in local wall time keeps day buckets on midnight across DST changes.
+    return [
+        timezone.make_aware(current.replace(tzinfo=None) - step * i) for i in range(span - 1, -1, -1)
+    ]
+
+
+def interest_activity(period=InterestRollup.DAY, span=None, streams=None, actor_id=None):
+    """
+    Added and removed interests per bucket, for charts.
+
+    ``{'buckets': [iso, …], 'shortlists': {'added': […], 'removed': […]},
+    'job_interests': {…}}``, limited to ``streams`` if given. With
+    ``actor_id`` (only meaningful for a single stream) the counts are one
+    employer's shortlists or one candidate's job interests.
+    """
+    streams = streams or list(STREAM_NAMES)
+    span = max(1, min(span or DEFAULT_SPAN[period], MAX_SPAN[period]))
+    buckets = bucket_range(period, span)
+    rows = InterestRollup.objects.filter(period=period, stream__in=streams, bucket__gte=buckets[0])
+    if actor_id is not None:
+        rows = rows.filter(actor_id=actor_id)
+    totals = {
+        (row['stream'], row['bucket']): row
+        for row in rows.values('stream', 'bucket').annotate(added_sum=Sum('added'), removed_sum=Sum('removed'))
+    }
+    activity = {'buckets': [bucket.isoformat() for bucket in buckets]}
+    for stream in streams:
+        series = [totals.get((stream, bucket), {}) for bucket in buckets]
+        activity[STREAM_NAMES[stream]] = {
+            'added': [row.get('added_sum', 0) for row in series],
+            'removed': [row.get('removed_sum', 0) for row in series],
+        }
+    return activity
+
+
+def registration_series(dimension, days=None, top=8):
+    """
+    New registrations per day split by ``dimension``, for charts.
+
+    ``{'days': [iso, …], 'series': [{'value': …, 'counts': […]}, …],
+    'total': […]}`` with the ``top`` busiest values over the range; the
+    rest are summed into an "Other" series.
+    """
+    days = max(1, min(days or DEFAULT_SPAN[InterestRollup.DAY], MAX_SPAN[InterestRollup.DAY]))
+    end = timezone.localdate()
+    dates = [end - timedelta(days=i) for i in range(days - 1, -1, -1)]
+    position = {day: i for i, day in enumerate(dates)}
+    counts = defaultdict(lambda: [0] * days)
+    rows = RegistrationRollup.objects.filter(dimension=dimension, day__gte=dates[0]).values_list('day', 'value', 'count')
+    for day, value, count in rows:
+        if day in position:
+            counts[value][position[day]] += count
+
+    ranked = sorted(counts, key=lambda value: (-sum(counts[value]), value))
+    series = [{'value': value, 'counts': counts[value]} for value in ranked[:top]]
+    if len(ranked) > top:
+        series.append({
+            'value': 'Other',
+            'counts': [sum(counts[value][i] for value in ranked[top:]) for i in range(days)],
+        })
+    return {
+        'days': [day.isoformat() for day in dates],
+        'series': series,
+        'total': [sum(values[i] for values in counts.values()) for i in range(days)],
+    }
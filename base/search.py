@@ -0,0 +1,43 @@
+"""
+Keyword filtering that uses a FULLTEXT index on MySQL.
+
+Tables that are searched by keyword get a FULLTEXT index in their
+migration. ``fulltext_filter`` turns user input into a boolean-mode
+``MATCH ... AGAINST`` on MySQL and into ``icontains`` per term elsewhere
+(SQLite in development).
+"""
+import re
+
+from django.db import connections
+from django.db.models import Q
+
+SEARCH_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+# Extra words are ignored rather than building an ever-longer query.
+MAX_TERMS = 10
+
+
+def search_terms(query):
+    return SEARCH_TERM_RE.findall(query or '')[:MAX_TERMS]
+
+
+def fulltext_filter(queryset, columns, query):
+    """Keep rows where every word of ``query`` (as a prefix) appears in one of ``columns``."""
+    terms = search_terms(query)
+    if not terms:
+        return queryset
+    connection = connections[queryset.db]
+    if connection.vendor == 'mysql':
+        # Columns must match the FULLTEXT index exactly; qualify them in case of joins.
+        table = connection.ops.quote_name(queryset.model._meta.db_table)
+        match = ', '.join(f'{table}.{connection.ops.quote_name(column)}' for column in columns)
+        return queryset.extra(
+            where=[f"MATCH ({match}) AGAINST (%s IN BOOLEAN MODE)"],
+            params=[' '.join(f'+{term}*' for term in terms)],
+        )
+    for term in terms:
+        condition = Q()
+        for column in columns:
+            condition |= Q(**{f'{column}__icontains': term})
+        queryset = queryset.filter(condition)
+    return queryset
@@ -0,0 +1,78 @@
+"""
+Signal handlers that keep ``FacetCell`` counts, the normalized
+registration columns, the interest counters and the interest event log in
+step with their models.
+"""
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import counters, dimensions, facets, rollups
+from .models import EmployeeInterest, EmployerInterest, InterestEvent, JobOpening, Registration
+
+
+def _touches_facets(spec, update_fields):
+    return update_fields is None or not set(update_fields).isdisjoint(spec.fields)
+
+
+@receiver(pre_save, sender=Registration)
+def normalize_dimensions(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Partial saves can't add columns to their UPDATE; backfill_dimensions catches those rows up.
+    if raw or (update_fields is not None and not set(dimensions.NORMALIZED_FIELDS) <= set(update_fields)):
+        return
+    unmapped = dimensions.normalize_changed(instance)
+    if unmapped:
+        dimensions.record_unmapped(unmapped)
+
+
+@receiver(pre_save, sender=Registration)
+@receiver(pre_save, sender=JobOpening)
+def remember_facet_values(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    spec = facets.spec_for_model(sender)
+    instance._facet_old_row = None
+    if instance._state.adding or instance.pk is None or not _touches_facets(spec, update_fields):
+        return
+    instance._facet_old_row = sender.objects.filter(pk=instance.pk).values(*spec.fields).first()
+
+
+@receiver(post_save, sender=Registration)
+@receiver(post_save, sender=JobOpening)
+def update_facet_counts(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    spec = facets.spec_for_model(sender)
+    if created:
+        facets.record_change(spec, None, spec.instance_row(instance))
+        return
+    old_row = getattr(instance, '_facet_old_row', None)
+    if old_row is None:
+        return
+    new_row = spec.instance_row(instance)
+    if spec.values_for(old_row) != spec.values_for(new_row):
+        facets.record_change(spec, old_row, new_row)
+
+
+@receiver(pre_delete, sender=Registration)
+@receiver(pre_delete, sender=JobOpening)
+def remove_from_facet_counts(sender, instance, **kwargs):
+    # pre_delete runs inside the deletion's transaction, while deferred fields can still be loaded.
+    spec = facets.spec_for_model(sender)
+    facets.record_change(spec, spec.instance_row(instance), None)
+
+
+@receiver(post_save, sender=EmployerInterest)
+@receiver(post_save, sender=EmployeeInterest)
+def count_interest(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        spec = counters.spec_for_interest(sender)
+        counters.adjust(spec, getattr(instance, spec.fk_attname), 1)
+        rollups.log_interest(instance, InterestEvent.ADDED)
+
+
+@receiver(post_delete, sender=EmployerInterest)
+@receiver(post_delete, sender=EmployeeInterest)
+def uncount_interest(sender, instance, **kwargs):
+    spec = counters.spec_for_interest(sender)
+    counters.adjust(spec, getattr(instance, spec.fk_attname), -1)
+    rollups.log_interest(instance, InterestEvent.REMOVED)
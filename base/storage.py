@@ -0,0 +1,92 @@
+"""
+Static files storage that fingerprints and precompresses assets.
+
+``collectstatic`` writes content-hashed copies plus ``staticfiles.json``
+(Django's manifest storage), then a ``.gz`` and, when the ``brotli`` package
+is installed, a ``.br`` sibling for every compressible file.
+``StaticAssetMiddleware`` serves those variants without compressing
+anything per request.
+"""
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # optional dependency; gzip variants are still written
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {
+    '.css', '.js', '.mjs', '.map', '.json', '.webmanifest', '.svg', '.txt', '.html', '.xml', '.ico',
+}
+
+# Don't keep a compressed copy that saves less than this fraction of the file.
+MIN_SAVING = 0.05
+
+
+def _compress_gzip(data):
+    # mtime=0 keeps the output identical between runs.
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _compress_brotli(data):
+    return brotli.compress(data, quality=11)
+
+
+def compressors():
+    """``(suffix, function)`` pairs for the encodings available here."""
+    available = [('.gz', _compress_gzip)]
+    if brotli is not None:
+        available.insert(0, ('.br', _compress_brotli))
+    return available
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    # Files missing from the manifest are hashed on the fly rather than
+    # raising straight away.
+    manifest_strict = False
+
+    def stored_name(self, name):
+        # A file that doesn't exist at all still makes Django raise
+        # ValueError; the template gets the unhashed name (a 404 for that
+        # asset) instead of failing the whole page.
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            for compressed_name in self.compress(name):
+                yield name, compressed_name, True
+
+    def compress(self, name):
+        """Write compressed siblings of ``name``; returns the names written."""
+        if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+            return []
+        path = self.path(name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return []
+        data = None
+        written = []
+        for suffix, compress in compressors():
+            target = path + suffix
+            if os.path.exists(target) and os.stat(target).st_mtime >= stat.st_mtime:
+                continue
+            if data is None:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            compressed = compress(data)
+            if len(compressed) > len(data) * (1 - MIN_SAVING):
+                continue
+            with open(target, 'wb') as f:
+                f.write(compressed)
+            written.append(name + suffix)
+        return written
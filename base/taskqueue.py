@@ -0,0 +1,139 @@
+"""
+Database-backed background task queue.
+
+Handlers are registered with ``@task('name')`` and receive the JSON payload
+as keyword arguments. Views call ``enqueue()`` and return immediately; the
+``run_workers`` management command claims due tasks with
+``SELECT ... FOR UPDATE SKIP LOCKED``, runs them and retries failures with
+exponential backoff until ``max_attempts`` is reached, after which the task
+is marked dead and shows up in the dead-letter admin.
+"""
+import logging
+import os
+import random
+import socket
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+REGISTRY = {}
+
+
+def task(name):
+    """Register the decorated function as the handler for ``name``."""
+    def decorator(func):
+        REGISTRY[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, priority=0, delay=0, max_attempts=None):
+    """Queue ``name`` to run with ``payload`` after ``delay`` seconds."""
+    if name not in REGISTRY:
+        raise KeyError(f"No task handler registered for '{name}'")
+    return Task.objects.create(
+        name=name,
+        payload=payload or {},
+        priority=priority,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or getattr(settings, 'TASK_MAX_ATTEMPTS', 5),
+    )
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def backoff_seconds(attempts):
+    """Exponential backoff with jitter: ~base, 2×base, 4×base … capped."""
+    base = getattr(settings, 'TASK_RETRY_BASE_DELAY', 30)
+    cap = getattr(settings, 'TASK_RETRY_MAX_DELAY', 3600)
+    delay = min(cap, base * 2 ** max(attempts - 1, 0))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim(worker):
+    """Lock and return the next due task, or ``None`` when the queue is idle."""
+    lock_options = {}
+    if connection.features.has_select_for_update_skip_locked:
+        lock_options['skip_locked'] = True
+    with transaction.atomic():
+        task_obj = (
+            Task.objects.select_for_update(**lock_options)
+            .filter(status=Task.QUEUED, run_at__lte=timezone.now())
+            .order_by('-priority', 'run_at', 'id')
+            .first()
+        )
+        if task_obj is None:
+            return None
+        task_obj.status = Task.RUNNING
+        task_obj.locked_by = worker
+        task_obj.locked_at = timezone.now()
+        task_obj.attempts += 1
+        task_obj.save(update_fields=['status', 'locked_by', 'locked_at', 'attempts'])
+    return task_obj
+
+
+def execute(task_obj):
+    """Run a claimed task and record the outcome. Returns True on success."""
+    handler = REGISTRY.get(task_obj.name)
+    try:
+        if handler is None:
+            raise LookupError(f"No task handler registered for '{task_obj.name}'")
+        handler(**task_obj.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning(
+            "Task %s #%s failed (attempt %s/%s)", task_obj.name, task_obj.id, task_obj.attempts, task_obj.max_attempts
+        )
+        task_obj.last_error = error
+        task_obj.locked_by = ''
+        task_obj.locked_at = None
+        if handler is None or task_obj.attempts >= task_obj.max_attempts:
+            task_obj.status = Task.DEAD
+            task_obj.finished_at = timezone.now()
+        else:
+            task_obj.status = Task.QUEUED
+            task_obj.run_at = timezone.now() + timedelta(seconds=backoff_seconds(task_obj.attempts))
+        task_obj.save(update_fields=['status', 'last_error', 'locked_by', 'locked_at', 'run_at', 'finished_at'])
+        return False
+
+    task_obj.status = Task.DONE
+    task_obj.finished_at = timezone.now()
+    task_obj.locked_by = ''
+    task_obj.locked_at = None
+    task_obj.save(update_fields=['status', 'finished_at', 'locked_by', 'locked_at'])
+    return True
+
+
+def run_next(worker=None):
+    """Claim and run one task. Returns False when nothing was due."""
+    task_obj = claim(worker or worker_name())
+    if task_obj is None:
+        return False
+    execute(task_obj)
+    return True
+
+
+def requeue_stale(timeout=None):
+    """Put back tasks whose worker died while running them."""
+    timeout = timeout or getattr(settings, 'TASK_LOCK_TIMEOUT', 600)
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    return Task.objects.filter(status=Task.RUNNING, locked_at__lt=cutoff).update(
+        status=Task.QUEUED, locked_by='', locked_at=None, run_at=timezone.now(),
+    )
+
+
+def retry(queryset):
+    """Send dead (or any) tasks back to the queue with a fresh attempt budget."""
+    return queryset.update(
+        status=Task.QUEUED, attempts=0, run_at=timezone.now(),
+        locked_by='', locked_at=None, finished_at=None,
+    )
@@ -0,0 +1,46 @@
+"""Background task handlers; imported by BaseConfig.ready() to register them."""
+import os
+
+from django.core.files import File
+
+from . import dimensions
+from .models import Registration
+from .resume_index import index_registration
+from .taskqueue import enqueue, task
+
+
+@task('attach_registration_files')
+def attach_registration_files(registration_id, resume=None, photo=None):
+    """Move the resume/photo saved by temp_save_registration onto the Registration."""
+    registration = Registration.objects.get(id=registration_id)
+    moved = {}
+    for field_name, tmp_path in (('resume', resume), ('photo', photo)):
+        # A retried task may find the file already moved.
+        if not tmp_path or not os.path.exists(tmp_path):
+            continue
+        with open(tmp_path, 'rb') as f:
+            getattr(registration, field_name).save(os.path.basename(tmp_path), File(f), save=False)
+        moved[field_name] = tmp_path
+    if moved:
+        registration.save(update_fields=list(moved))
+    for tmp_path in moved.values():
+        os.remove(tmp_path)
+    if 'resume' in moved:
+        enqueue('index_resume', {'registration_id': registration.id})
+
+
+@task('index_resume')
+def index_resume(registration_id):
+    """Extract the resume text of a registration for search (skipped when unchanged)."""
+    try:
+        index_registration(registration_id)
+    except Registration.DoesNotExist:
+        pass  # deleted before the worker got to it
+
+
+@task('remap_dimensions')
+def remap_dimensions(kind):
+    """Fill in ``normalized_<kind>`` on registrations that had no alias yet (after a new mapping)."""
+    raw_field, fk_field = dimensions.KIND_FIELDS[kind]
+    waiting = Registration.objects.filter(**{f'{fk_field}__isnull': True}).exclude(**{raw_field: ''})
+    dimensions.backfill(queryset=waiting)
@@ -1,3 +1,986 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+import time
+import zipfile
+import zlib
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib import messages
+from django.contrib.auth.models import User
+from django.contrib.messages.storage import default_storage
+from django.contrib.sessions.backends.db import SessionStore
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend
+from django.db import connection
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from . import (
+    counters, dimensions, downloads, ipblock, media_gc, notifications, page_cache, pagination, recommendations,
+    resume_text, rollups, taskqueue,
+)
+from .db_pool import ConnectionPool
+from .decorators import get_client_ip
+from .importers import EmployerImporter
+from .middleware import ResponseOptimizationMiddleware
+from .models import (
+    BlockedNetwork, EmployeeInterest, Employer, EmployerInterest, InterestEvent, InterestNotification, InterestRollup,
+    JobOpening, Recommendation, Registration, Task, UnmappedValue, hash_plaintext_password, is_unusable_password,
+)
+
+
+def make_registration(email='ali@example.com', **fields):
+    return Registration.objects.create(**{
+        'name': 'Ali', 'email': email, 'phone': '+971501234567', 'nationality': 'Atlantis',
+        'location': 'Dubai', 'qualification': 'B.Com', 'experience': '3 years', 'role': 'Accountant',
+        'resume': 'resumes/ali.pdf', **fields,
+    })
+
+
+def make_employer(email='acme@example.com', **fields):
+    return Employer.objects.create(**{
+        'company_name': 'Acme', 'email': email, 'phone': '+971501234567',
+        'location': 'Dubai', 'industry': 'Retail', 'password': 'secret-pass', **fields,
+    })
+
+
+def make_job(employer, **fields):
+    return JobOpening.objects.create(**{
+        'employer': employer, 'title': 'Accountant', 'description': 'Books', 'requirements': 'IFRS',
+        'location': 'Dubai', **fields,
+    })
+
+
+def sign_in(client, user_type, user_id):
+    session = client.session
+    session.update({'user_type': user_type, f'{user_type}_id': user_id})
+    session.save()
+
+
+@override_settings(TRUSTED_PROXIES=['127.0.0.1', '10.0.0.0/8'], IP_BLOCKLIST_CHECK_INTERVAL=0)
+class ClientAddressTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def request(self, remote_addr, forwarded=None):
+        headers = {'REMOTE_ADDR': remote_addr}
+        if forwarded is not None:
+            headers['HTTP_X_FORWARDED_FOR'] = forwarded
+        return self.factory.get('/', **headers)
+
+    def test_header_ignored_from_untrusted_peer(self):
+        self.assertEqual(get_client_ip(self.request('203.0.113.7', '127.0.0.1')), '203.0.113.7')
+
+    def test_rightmost_untrusted_hop_behind_proxies(self):
+        request = self.request('127.0.0.1', '127.0.0.1, 198.51.100.4, 10.1.2.3')
+        self.assertEqual(get_client_ip(request), '198.51.100.4')
+
+    def test_only_trusted_hops(self):
+        self.assertEqual(get_client_ip(self.request('127.0.0.1', '10.0.0.5')), '10.0.0.5')
+        self.assertEqual(get_client_ip(self.request('127.0.0.1')), '127.0.0.1')
+
+    @override_settings(TRUSTED_PROXIES=[])
+    def test_no_proxies_configured(self):
+        self.assertEqual(get_client_ip(self.request('127.0.0.1', '198.51.100.4')), '127.0.0.1')
+
+    def test_auto_blockable(self):
+        for address in (
+            '127.0.0.1', '10.1.1.1', '192.168.0.9', '198.51.100.4', '::1', 'fd00::1', '::ffff:10.0.0.1', 'junk', None,
+        ):
+            self.assertFalse(ipblock.auto_blockable(address), address)
+        self.assertTrue(ipblock.auto_blockable('8.8.8.8'))
+
+    def test_spoofed_loopback_cannot_block_the_proxy(self):
+        # The attack from review: forged X-Forwarded-For: 127.0.0.1 tripping rate limits everywhere.
+        for _ in range(6):
+            for path in ('/contact/', '/employee/register/', '/employer/register/'):
+                self.client.get(path, REMOTE_ADDR='127.0.0.1', HTTP_X_FORWARDED_FOR='127.0.0.1')
+        self.assertFalse(BlockedNetwork.objects.exists())
+        cache.clear()
+        self.assertEqual(self.client.get('/terms/', REMOTE_ADDR='127.0.0.1').status_code, 200)
+
+    def test_strikes_count_against_the_real_client(self):
+        for _ in range(6):
+            for path in ('/contact/', '/employee/register/', '/employer/register/'):
+                self.client.get(path, REMOTE_ADDR='127.0.0.1', HTTP_X_FORWARDED_FOR='1.1.1.1, 8.8.8.8')
+        self.assertEqual(list(BlockedNetwork.objects.values_list('network', flat=True)), ['8.8.8.8/32'])
+        cache.clear()
+        blocked = self.client.get('/terms/', REMOTE_ADDR='127.0.0.1', HTTP_X_FORWARDED_FOR='8.8.8.8')
+        self.assertEqual(blocked.status_code, 403)
+        self.assertEqual(self.client.get('/terms/', REMOTE_ADDR='127.0.0.1').status_code, 200)
+
+    def test_cleanup_blocks_expire_and_skip_private(self):
+        blocked = ipblock.block_addresses(['8.8.4.4', '127.0.0.1', '192.168.1.1', None], BlockedNetwork.CLEANUP, 'test')
+        self.assertEqual(blocked, {'8.8.4.4/32'})
+        entry = BlockedNetwork.objects.get()
+        self.assertGreater(entry.expires_at, timezone.now() + timedelta(days=1))
+
+
+class PrefixTrieTests(SimpleTestCase):
+    def trie(self, *networks):
+        return ipblock.PrefixTrie(ipblock.parse_network(network) for network in networks)
+
+    def test_byte_aligned_and_partial_prefixes(self):
+        trie = self.trie('203.0.113.0/24', '198.51.96.0/20', '192.0.2.7')
+        for address in ('203.0.113.0', '203.0.113.255', '198.51.96.1', '198.51.111.254', '192.0.2.7'):
+            self.assertIn(address, trie)
+        for address in ('203.0.112.255', '198.51.112.0', '198.51.95.255', '192.0.2.8', 'junk', ''):
+            self.assertNotIn(address, trie)
+
+    def test_ipv6_and_families_kept_apart(self):
+        trie = self.trie('2001:db8::/32')
+        self.assertIn('2001:db8:1::5', trie)
+        self.assertNotIn('2001:db9::1', trie)
+        self.assertNotIn('32.1.13.184', trie)
+
+    def test_shorter_range_covers_longer(self):
+        trie = self.trie('10.0.0.0/8', '10.1.2.0/24')
+        self.assertIn('10.200.0.1', trie)
+        self.assertEqual(len(trie), 1)
+
+    def test_everything(self):
+        self.assertIn('8.8.8.8', self.trie('0.0.0.0/0'))
+
+
+class ImporterPasswordTests(TestCase):
+    HEADER = 'company_name,email,phone,location,industry,password\n'
+
+    def run_import(self, *rows):
+        lines = ''.join(
+            f'Acme {i},acme{i}@example.com,+971501234567,Dubai,Retail,{password}\n'
+            for i, password in enumerate(rows)
+        )
+        return EmployerImporter(workers=1).run(io.StringIO(self.HEADER + lines))
+
+    def password(self, i):
+        return Employer.objects.get(email=f'acme{i}@example.com').password
+
+    def test_plaintext_starting_with_bang_is_hashed(self):
+        result = self.run_import('!secret-pass')
+        self.assertFalse(result.failed)
+        self.assertTrue(check_password('!secret-pass', self.password(0)))
+
+    def test_missing_password_is_unusable(self):
+        self.run_import('')
+        self.assertTrue(is_unusable_password(self.password(0)))
+
+    def test_existing_hash_kept(self):
+        hashed = make_password('secret-pass')
+        self.run_import(hashed)
+        self.assertEqual(self.password(0), hashed)
+
+    def test_model_save_hashes_bang_plaintext(self):
+        self.assertTrue(check_password('!secret-pass', hash_plaintext_password('!secret-pass')))
+        unusable = make_password(None)
+        self.assertEqual(hash_plaintext_password(unusable), unusable)
+
+    def test_malformed_hash_rejected(self):
+        result = self.run_import('pbkdf2_sha256$not-a-hash')
+        self.assertTrue(result.failed)
+        self.assertFalse(Employer.objects.exists())
+
+
+class ImporterDuplicateTests(TestCase):
+    CSV = (
+        'company_name,email,phone,location,industry,password\n'
+        'Acme,acme@example.com,+971501234567,Dubai,Retail,\n'
+        'Globex,globex@example.com,+971501234567,Dubai,Retail,\n'
+        'Acme Again,ACME@example.com,+971501234567,Dubai,Retail,\n'
+    )
+
+    def run_import(self, dry_run):
+        return EmployerImporter(batch_size=1, workers=1, dry_run=dry_run).run(io.StringIO(self.CSV))
+
+    def test_duplicate_across_batches_in_dry_run(self):
+        result = self.run_import(dry_run=True)
+        self.assertEqual((result.created, result.skipped, result.failed), (2, 1, 0))
+        self.assertEqual(result.duplicates[0][0], 4)
+        self.assertFalse(Employer.objects.exists())
+
+    def test_real_run_matches_dry_run(self):
+        result = self.run_import(dry_run=False)
+        self.assertEqual((result.created, result.skipped, result.failed), (2, 1, 0))
+        self.assertEqual(Employer.objects.count(), 2)
+
+    def test_existing_account_counted_once(self):
+        make_employer(email='globex@example.com')
+        result = self.run_import(dry_run=False)
+        self.assertEqual((result.created, result.skipped, result.failed), (1, 2, 0))
+
+
+class CompressionTests(TestCase):
+    BODY = '<html><body>' + 'hello world ' * 200 + '</body></html>'
+
+    def encoding(self, with_token):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='br, gzip')
+        body = self.BODY
+        if with_token:
+            body += f'<input type="hidden" name="csrfmiddlewaretoken" value="{get_token(request)}">'
+        middleware = ResponseOptimizationMiddleware(lambda request: HttpResponse(body))
+        return middleware(request).get('Content-Encoding')
+
+    def test_pages_with_csrf_token_are_padded_gzip(self):
+        self.assertEqual(self.encoding(with_token=True), 'gzip')
+
+    def test_other_pages_prefer_brotli(self):
+        self.assertEqual(self.encoding(with_token=False), 'br')
+
+
+class FacetFilterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        sign_in(self.client, 'employer', 1)
+
+    def test_bad_filter_value_is_400(self):
+        response = self.client.get('/facets/registrations/', {'is_placed': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('is_placed', response.json()['error'])
+
+    def test_good_filter_value(self):
+        self.assertEqual(self.client.get('/facets/registrations/', {'is_placed': '1'}).status_code, 200)
+
+
+class AdminFacetFilterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+
+    def test_bad_facet_value_redirects_like_any_bad_lookup(self):
+        for path, lookup in (('registration', 'is_placed__exact'), ('jobopening', 'is_active__exact')):
+            response = self.client.get(f'/admin/base/{path}/', {lookup: 'abc'})
+            self.assertEqual(response.status_code, 302, path)
+            self.assertTrue(response['Location'].endswith('?e=1'), path)
+
+    def test_good_facet_value(self):
+        make_registration()
+        response = self.client.get('/admin/base/registration/', {'is_placed__exact': '0'})
+        self.assertEqual(response.status_code, 200)
+
+
+class ExportFilterTests(TestCase):
+    def setUp(self):
+        staff = User.objects.create_user('staff', password='pw', is_staff=True)
+        self.client.force_login(staff)
+        self.employer = make_employer()
+
+    def export(self, dataset, **params):
+        return self.client.get(f'/dashboard/export/{dataset}.csv', params)
+
+    def test_non_numeric_relation_filter_is_400(self):
+        self.assertEqual(self.export('employer_interests', employer='abc').status_code, 400)
+        self.assertEqual(self.export('employee_interests', job='x').status_code, 400)
+
+    def test_bad_date_is_400(self):
+        self.assertEqual(self.export('employers', created_at__gte='yesterday').status_code, 400)
+
+    def test_admin_datetime_filter_applies(self):
+        later = (timezone.now() + timedelta(hours=1)).isoformat()
+        body = b''.join(self.export('employers', created_at__gte=later).streaming_content)
+        self.assertNotIn(b'Acme', body)
+        body = b''.join(self.export('employers', created_at__gte=timezone.localdate().isoformat()).streaming_content)
+        self.assertIn(b'Acme', body)
+
+
+class RollupSpanTests(TestCase):
+    def test_interest_activity_clamps_span(self):
+        for span in (-5, 1):
+            data = rollups.interest_activity(span=span)
+            self.assertEqual(len(data['buckets']), 1)
+        self.assertEqual(len(rollups.interest_activity(span=10 ** 6)['buckets']), rollups.MAX_SPAN[InterestRollup.DAY])
+
+    def test_registration_series_clamps_days(self):
+        for days in (-3, 1):
+            data = rollups.registration_series('plan', days=days)
+            self.assertEqual(len(data['days']), 1)
+            self.assertEqual(data['total'], [0])
+
+
+class UnmappedValueTests(TestCase):
+    def occurrences(self, kind):
+        return UnmappedValue.objects.get(kind=kind).occurrences
+
+    def test_resaving_does_not_count_again(self):
+        make_registration()
+        registration = Registration.objects.get()
+        registration.is_placed = True
+        registration.save()
+        self.assertEqual(self.occurrences('nationality'), 1)
+
+    def test_unchanged_save_skips_alias_lookup(self):
+        registration = Registration.objects.get(pk=make_registration().pk)
+        with self.assertNumQueries(0):
+            self.assertFalse(dimensions.normalize_changed(registration))
+
+    def test_edited_field_counted(self):
+        registration = Registration.objects.get(pk=make_registration().pk)
+        registration.location = 'Sharjah'
+        registration.save()
+        self.assertEqual(UnmappedValue.objects.get(kind='location', key='sharjah').occurrences, 1)
+        self.assertEqual(self.occurrences('nationality'), 1)
+
+
+class FakeConnection:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def pool(self):
+        return ConnectionPool(connect=FakeConnection, ping=lambda connection: True, size=1, max_overflow=0)
+
+    def test_release_of_unknown_connection_keeps_count(self):
+        # A connection borrowed before close_pools() comes back to the pool created after it.
+        connection = self.pool().acquire()
+        pool = self.pool()
+        pool.release(connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool._open, 0)
+        self.assertIsNot(pool.acquire(), connection)
+        self.assertEqual(pool._open, 1)
+
+    def test_release_beyond_size_closes(self):
+        pool = self.pool()
+        connection = pool.acquire()
+        pool.release(connection, reusable=False)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool._open, 0)
+
+
+class ResumeTextTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name, data):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def pdf(self, content, deflate=True):
+        stream = zlib.compress(content) if deflate else content
+        return self.write('resume.pdf', b'%PDF-1.4\n1 0 obj\n<< >>\nstream\n' + stream + b'\nendstream\nendobj\n%%EOF')
+
+    def docx(self, xml):
+        path = os.path.join(self.directory, 'resume.docx')
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('word/document.xml', xml)
+        return path
+
+    def test_pdf(self):
+        path = self.pdf(b'BT /F1 12 Tf (Senior \\(IFRS\\) accountant) Tj T* [(Dub) -20 (ai)] TJ ET')
+        self.assertEqual(resume_text.extract_text(path), 'Senior (IFRS) accountant Dubai')
+
+    def test_pdf_uncompressed_stream(self):
+        path = self.pdf(b'BT (Tally ERP) Tj ET', deflate=False)
+        self.assertEqual(resume_text._extract_pdf_stdlib(path), 'Tally ERP ')
+
+    def test_pdf_stream_inflated_only_up_to_the_cap(self):
+        path = self.pdf(b'BT ' + b'(word) Tj ' * 100000 + b'ET')
+        with mock.patch.object(resume_text, 'MAX_PDF_STREAM_BYTES', 1000), \
+                mock.patch.object(resume_text, 'MAX_TEXT_CHARS', 10 ** 6):
+            text = resume_text._extract_pdf_stdlib(path)
+        self.assertLessEqual(len(text), 1000)
+        self.assertTrue(text.startswith('word'))
+
+    def test_pdf_text_stops_at_max_text_chars(self):
+        path = self.pdf(b'BT ' + b'(word) Tj ' * 100000 + b'ET')
+        with mock.patch.object(resume_text, 'MAX_TEXT_CHARS', 50):
+            self.assertLess(len(resume_text._extract_pdf_stdlib(path)), 60)
+
+    def test_pdf_read_only_up_to_the_cap(self):
+        path = self.pdf(b'BT (hidden) Tj ET')
+        with mock.patch.object(resume_text, 'MAX_PDF_BYTES', 20):
+            self.assertEqual(resume_text._extract_pdf_stdlib(path), '')
+
+    def test_docx(self):
+        w = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+        path = self.docx(f'<w:document {w}><w:body><w:p><w:r><w:t>Ali</w:t></w:r></w:p>'
+                         f'<w:p><w:r><w:t>Accountant</w:t></w:r></w:p></w:body></w:document>')
+        self.assertEqual(resume_text.extract_text(path), 'Ali Accountant')
+
+    def test_docx_too_large(self):
+        path = self.docx('<document>' + ' ' * 5000 + '</document>')
+        with mock.patch.object(resume_text, 'MAX_DOCX_XML_BYTES', 1000):
+            with self.assertRaises(resume_text.UnsupportedResume):
+                resume_text.extract_text(path)
+
+    def test_txt_capped(self):
+        path = self.write('resume.txt', 'Ali  \n Accountant '.encode() + b'x' * (resume_text.MAX_TEXT_CHARS * 10))
+        text = resume_text.extract_text(path)
+        self.assertTrue(text.startswith('Ali Accountant x'))
+        self.assertEqual(len(text), resume_text.MAX_TEXT_CHARS)
+
+    def test_unsupported_and_corrupt(self):
+        with self.assertRaises(resume_text.UnsupportedResume):
+            resume_text.extract_text(self.write('resume.exe', b'MZ'))
+        _id, content_hash, text, error = resume_text.process_file(1, self.write('resume.docx', b'not a zip'))
+        self.assertTrue(content_hash)
+        self.assertEqual(text, '')
+        self.assertIn('BadZipFile', error)
+
+
+class CounterTests(TestCase):
+    def setUp(self):
+        self.employer = make_employer()
+        self.candidate = make_registration()
+        self.job = make_job(self.employer)
+
+    def counts(self):
+        self.candidate.refresh_from_db()
+        self.job.refresh_from_db()
+        return self.candidate.shortlist_count, self.job.interest_count
+
+    def test_interest_rows_move_the_counters(self):
+        shortlist = EmployerInterest.objects.create(employer=self.employer, employee=self.candidate)
+        EmployeeInterest.objects.create(employee=self.candidate, job=self.job)
+        self.assertEqual(self.counts(), (1, 1))
+        shortlist.delete()
+        # Queryset deletes send post_delete per row too.
+        EmployeeInterest.objects.filter(job=self.job).delete()
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_never_below_zero(self):
+        counters.adjust(counters.COUNTERS['shortlists'], self.candidate.pk, -1)
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_full_save_keeps_concurrent_increments(self):
+        stale = Registration.objects.get(pk=self.candidate.pk)
+        EmployerInterest.objects.create(employer=self.employer, employee=self.candidate)
+        stale.name = 'Ali Hassan'
+        stale.save()
+        self.assertEqual(self.counts()[0], 1)
+
+    def test_reconcile_repairs_drift(self):
+        EmployerInterest.objects.create(employer=self.employer, employee=self.candidate)
+        Registration.objects.filter(pk=self.candidate.pk).update(shortlist_count=7)
+        self.assertEqual(counters.reconcile(counters.COUNTERS['shortlists']), (1, 1))
+        self.assertEqual(self.counts()[0], 1)
+
+
+@override_settings(ROLLUP_SETTLE_SECONDS=0)
+class InterestRollupTests(TestCase):
+    def test_interest_events_fold_once(self):
+        employer = make_employer()
+        candidate = make_registration()
+        shortlist = EmployerInterest.objects.create(employer=employer, employee=candidate)
+        shortlist.delete()
+        EmployerInterest.objects.create(employer=employer, employee=candidate)
+
+        self.assertEqual(rollups.refresh_interest_rollups(), 3)
+        self.assertEqual(rollups.refresh_interest_rollups(), 0)
+        activity = rollups.interest_activity(span=1)
+        self.assertEqual(activity['shortlists'], {'added': [2], 'removed': [1]})
+        self.assertEqual(activity['job_interests'], {'added': [0], 'removed': [0]})
+        other_employer = rollups.interest_activity(span=1, streams=[InterestEvent.SHORTLIST], actor_id=employer.pk + 1)
+        self.assertEqual(other_employer['shortlists'], {'added': [0], 'removed': [0]})
+        self.assertNotIn('job_interests', other_employer)
+
+
+@override_settings(ROLLUP_SETTLE_SECONDS=0)
+class RegistrationRollupTests(TestCase):
+    def test_registrations_fold_once(self):
+        make_registration(plan='premium')
+        make_registration('sara@example.com', plan='basic')
+        make_registration('omar@example.com', plan='premium')
+
+        self.assertEqual(rollups.refresh_registration_rollups(batch_size=2), 3)
+        self.assertEqual(rollups.refresh_registration_rollups(), 0)
+        series = rollups.registration_series('plan', days=1)
+        self.assertEqual(series['series'], [{'value': 'premium', 'counts': [2]}, {'value': 'basic', 'counts': [1]}])
+        self.assertEqual(series['total'], [3])
+        top_one = rollups.registration_series('plan', days=1, top=1)
+        self.assertEqual(top_one['series'][1], {'value': 'Other', 'counts': [1]})
+
+
+class ApiAccessTests(TestCase):
+    def setUp(self):
+        self.employer = make_employer()
+        self.other_employer = make_employer('other@example.com')
+        self.candidate = make_registration()
+        self.job = make_job(self.employer)
+        self.shortlist = EmployerInterest.objects.create(employer=self.employer, employee=self.candidate)
+        self.other_shortlist = EmployerInterest.objects.create(employer=self.other_employer, employee=self.candidate)
+
+    def get(self, path, **params):
+        return self.client.get(f'/api/v1/{path}', params)
+
+    def test_requires_sign_in(self):
+        self.assertEqual(self.get('jobs/').status_code, 401)
+        self.assertEqual(self.get(f'jobs/{self.job.pk}/').status_code, 401)
+
+    def test_unknown_resource(self):
+        sign_in(self.client, 'employer', self.employer.pk)
+        self.assertEqual(self.get('passwords/').status_code, 404)
+
+    def test_candidates_are_for_employers_only(self):
+        sign_in(self.client, 'employee', self.candidate.pk)
+        self.assertEqual(self.get('candidates/').status_code, 403)
+        self.assertEqual(self.get(f'candidates/{self.candidate.pk}/').status_code, 403)
+        sign_in(self.client, 'employer', self.employer.pk)
+        self.assertEqual([row['id'] for row in self.get('candidates/').json()['results']], [self.candidate.pk])
+
+    def test_interests_are_the_users_own(self):
+        sign_in(self.client, 'employer', self.employer.pk)
+        self.assertEqual([row['id'] for row in self.get('interests/').json()['results']], [self.shortlist.pk])
+        self.assertEqual(self.get(f'interests/{self.other_shortlist.pk}/').status_code, 404)
+
+    def test_fields_limited_to_the_resource(self):
+        sign_in(self.client, 'employer', self.employer.pk)
+        self.assertEqual(self.get('candidates/', fields='email').status_code, 400)
+        self.assertEqual(self.get('candidates/', fields='password').status_code, 400)
+        self.assertEqual(list(self.get('candidates/', fields='name').json()['results'][0]), ['name'])
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        self.calls = []
+        handlers = {'record': lambda **payload: self.calls.append(payload), 'fail': self.fail_task}
+        patcher = mock.patch.dict(taskqueue.REGISTRY, handlers)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fail_task(self, **payload):
+        raise RuntimeError('SMTP down')
+
+    def make_due(self, task):
+        Task.objects.filter(pk=task.pk).update(run_at=timezone.now())
+
+    def test_enqueue(self):
+        with self.assertRaises(KeyError):
+            taskqueue.enqueue('no_such_task')
+        task = taskqueue.enqueue('record', {'n': 1}, delay=60)
+        self.assertEqual((task.status, task.payload, task.attempts), (Task.QUEUED, {'n': 1}, 0))
+        self.assertGreater(task.run_at, timezone.now() + timedelta(seconds=50))
+        self.assertFalse(taskqueue.run_next('w1'))
+
+    def test_claims_highest_priority_due_task_once(self):
+        low = taskqueue.enqueue('record', {'n': 'low'})
+        high = taskqueue.enqueue('record', {'n': 'high'}, priority=5)
+        claimed = taskqueue.claim('w1')
+        self.assertEqual(claimed.pk, high.pk)
+        self.assertEqual((claimed.status, claimed.locked_by, claimed.attempts), (Task.RUNNING, 'w1', 1))
+        self.assertEqual(taskqueue.claim('w2').pk, low.pk)
+        self.assertIsNone(taskqueue.claim('w3'))
+
+    def test_claim_skips_locked_rows_where_supported(self):
+        taskqueue.enqueue('record')
+        lock_options = []
+        original = Task.objects.select_for_update
+
+        def select_for_update(**options):
+            lock_options.append(options)
+            return original(**options)
+
+        with mock.patch.object(connection.features, 'has_select_for_update_skip_locked', True), \
+                mock.patch.object(Task.objects, 'select_for_update', select_for_update):
+            self.assertIsNotNone(taskqueue.claim('w1'))
+        self.assertEqual(lock_options, [{'skip_locked': True}])
+
+    def test_success(self):
+        taskqueue.enqueue('record', {'n': 1})
+        self.assertTrue(taskqueue.run_next('w1'))
+        self.assertEqual(self.calls, [{'n': 1}])
+        task = Task.objects.get()
+        self.assertEqual(task.status, Task.DONE)
+        self.assertIsNotNone(task.finished_at)
+
+    @override_settings(TASK_RETRY_BASE_DELAY=100, TASK_RETRY_MAX_DELAY=1000)
+    def test_retry_with_backoff_then_dead_letter(self):
+        task = taskqueue.enqueue('fail', max_attempts=3)
+        for attempt, delay in ((1, 100), (2, 200)):
+            taskqueue.run_next('w1')
+            task.refresh_from_db()
+            self.assertEqual((task.status, task.attempts), (Task.QUEUED, attempt))
+            self.assertIn('SMTP down', task.last_error)
+            wait = (task.run_at - timezone.now()).total_seconds()
+            self.assertTrue(delay * 0.75 < wait <= delay * 1.2, wait)
+            self.make_due(task)
+        taskqueue.run_next('w1')
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.DEAD)
+        self.assertIsNotNone(task.finished_at)
+
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        response = self.client.get('/admin/base/deadlettertask/')
+        self.assertContains(response, 'SMTP down')
+
+        self.assertEqual(taskqueue.retry(Task.objects.filter(status=Task.DEAD)), 1)
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts, task.finished_at), (Task.QUEUED, 0, None))
+
+    def test_unknown_handler_goes_straight_to_dead_letter(self):
+        task = Task.objects.create(name='removed_handler')
+        taskqueue.run_next('w1')
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), (Task.DEAD, 1))
+
+    @override_settings(TASK_LOCK_TIMEOUT=60)
+    def test_requeue_stale(self):
+        taskqueue.enqueue('record')
+        taskqueue.enqueue('record')
+        stale, fresh = taskqueue.claim('dead-worker'), taskqueue.claim('w1')
+        Task.objects.filter(pk=stale.pk).update(locked_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(taskqueue.requeue_stale(), 1)
+        stale.refresh_from_db()
+        self.assertEqual((stale.status, stale.locked_by), (Task.QUEUED, ''))
+        self.assertEqual(Task.objects.get(pk=fresh.pk).status, Task.RUNNING)
+
+
+class DigestTests(TestCase):
+    def setUp(self):
+        self.employer = make_employer()
+        # a@ gets three notifications, b@ one
+        for i in range(3):
+            notifications.record_shortlisted(self.employer, make_registration(email=f'cand{i}@example.com'))
+        InterestNotification.objects.update(recipient_email='a@example.com')
+        notifications.record_shortlisted(self.employer, make_registration(email='b@example.com'))
+
+    def pending(self):
+        return InterestNotification.objects.filter(sent_at__isnull=True).count()
+
+    def test_batch_ends_at_recipient_boundary(self):
+        self.assertEqual(notifications.send_digests(batch_size=2), (2, 4))
+        self.assertEqual([m.to for m in mail.outbox], [['a@example.com'], ['b@example.com']])
+        self.assertEqual(self.pending(), 0)
+
+    def test_dry_run_counts_each_row_once(self):
+        self.assertEqual(notifications.send_digests(batch_size=1, dry_run=True), (2, 4))
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(self.pending(), 4)
+
+    def test_failed_send_keeps_delivered_digests(self):
+        send = EmailBackend.send_messages
+        calls = []
+
+        def flaky(backend, messages):
+            calls.append(messages)
+            if len(calls) == 2:
+                raise OSError('connection reset')
+            return send(backend, messages)
+
+        with mock.patch.object(EmailBackend, 'send_messages', flaky), self.assertRaises(OSError):
+            notifications.send_digests()
+        self.assertEqual([m.to for m in mail.outbox], [['a@example.com']])
+        self.assertEqual(self.pending(), 1)
+
+        self.assertEqual(notifications.send_digests(), (1, 1))
+        self.assertEqual([m.to for m in mail.outbox], [['a@example.com'], ['b@example.com']])
+
+
+class DownloadTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root.name, SENDFILE_BACKEND=''))
+        os.makedirs(os.path.join(media_root.name, 'resumes'))
+        self.path = os.path.join(media_root.name, 'resumes', 'ali.pdf')
+        self.write(b'0123456789')
+        self.registration = make_registration()
+
+    def write(self, data):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+
+    def serve(self, **headers):
+        request = RequestFactory().get('/', **headers)
+        response = downloads.serve_file(request, self.registration.resume)
+        self.addCleanup(response.close)
+        return response
+
+    def body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_parse_range(self):
+        self.assertEqual(downloads.parse_range('bytes=2-4', 10), (2, 4))
+        self.assertEqual(downloads.parse_range('bytes=8-', 10), (8, 9))
+        self.assertEqual(downloads.parse_range('bytes=5-100', 10), (5, 9))
+        self.assertEqual(downloads.parse_range('bytes=-3', 10), (7, 9))
+        self.assertEqual(downloads.parse_range('bytes=-30', 10), (0, 9))
+        for header in ('bytes=0-1,4-5', 'bytes=-', 'items=0-1', 'bytes=5-2'):
+            self.assertIsNone(downloads.parse_range(header, 10), header)
+        for header, size in (('bytes=10-', 10), ('bytes=-0', 10), ('bytes=-5', 0), ('bytes=0-', 0)):
+            with self.assertRaises(ValueError, msg=header):
+                downloads.parse_range(header, size)
+
+    def test_whole_file(self):
+        response = self.serve()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(self.body(response), b'0123456789')
+
+    def test_partial_content(self):
+        response = self.serve(HTTP_RANGE='bytes=2-4')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual((response['Content-Range'], response['Content-Length']), ('bytes 2-4/10', '3'))
+        self.assertEqual(self.body(response), b'234')
+
+    def test_suffix_range(self):
+        response = self.serve(HTTP_RANGE='bytes=-3')
+        self.assertEqual(response['Content-Range'], 'bytes 7-9/10')
+        self.assertEqual(self.body(response), b'789')
+
+    def test_multi_range_serves_whole_file(self):
+        response = self.serve(HTTP_RANGE='bytes=0-1,4-5')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), b'0123456789')
+
+    def test_unsatisfiable_range(self):
+        response = self.serve(HTTP_RANGE='bytes=20-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */10')
+
+    def test_suffix_range_on_empty_file(self):
+        self.write(b'')
+        response = self.serve(HTTP_RANGE='bytes=-5')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */0')
+
+    def test_etag_revalidation(self):
+        etag = self.serve()['ETag']
+        response = self.serve(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response['ETag']), (304, etag))
+        self.assertEqual(self.serve(HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def test_if_range(self):
+        etag = self.serve()['ETag']
+        self.assertEqual(self.serve(HTTP_RANGE='bytes=2-4', HTTP_IF_RANGE=etag).status_code, 206)
+        # The file changed since the client's copy: send all of it.
+        response = self.serve(HTTP_RANGE='bytes=2-4', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), b'0123456789')
+
+
+class FeedPaginationTests(TestCase):
+    def setUp(self):
+        employer = make_employer()
+        now = timezone.now()
+        # Two openings share a publish time, so the pk has to break the tie.
+        published = [now - timedelta(hours=h) for h in (1, 2, 2, 3, 4)]
+        self.jobs = [
+            make_job(employer, title=f'Job {i}', publish_at=at, interest_count=i)
+            for i, at in enumerate(published)
+        ]
+        sign_in(self.client, 'employee', make_registration().pk)
+
+    def feed(self, **params):
+        return self.client.get('/employee/jobs/feed/', params)
+
+    def walk(self, **params):
+        ids, cursor = [], None
+        while True:
+            page = self.feed(limit=2, **params, **({'cursor': cursor} if cursor else {})).json()
+            ids += [job['id'] for job in page['jobs']]
+            cursor = page['next_cursor']
+            if cursor is None:
+                return ids
+
+    def test_cursor_round_trip(self):
+        when = self.jobs[0].publish_at
+        cursor = pagination.encode_cursor(when, 7)
+        self.assertEqual(pagination.decode_cursor(cursor), (when, 7))
+        field = JobOpening._meta.get_field('interest_count')
+        self.assertEqual(pagination.decode_cursor(pagination.encode_cursor(3, 7), field), (3, 7))
+
+    def test_pages_cover_every_job_once(self):
+        newest = [self.jobs[0].pk, self.jobs[2].pk, self.jobs[1].pk, self.jobs[3].pk, self.jobs[4].pk]
+        self.assertEqual(self.walk(), newest)
+        self.assertEqual(self.walk(sort='popular'), [job.pk for job in reversed(self.jobs)])
+
+    def test_tampered_cursor(self):
+        for cursor in ('not-a-cursor', 'bm9waXBl', pagination.encode_cursor('yesterday', 1)):
+            response = self.feed(cursor=cursor)
+            self.assertEqual(response.status_code, 400, cursor)
+            self.assertEqual(response.json(), {'error': 'Invalid cursor'})
+
+    def test_cursor_from_another_sort(self):
+        newest_cursor = self.feed(limit=2).json()['next_cursor']
+        self.assertEqual(self.feed(limit=2, sort='popular', cursor=newest_cursor).status_code, 400)
+        popular_cursor = self.feed(limit=2, sort='popular').json()['next_cursor']
+        self.assertEqual(self.feed(limit=2, cursor=popular_cursor).status_code, 400)
+
+    def test_not_modified(self):
+        response = self.feed(limit=2)
+        etag = response['ETag']
+        not_modified = self.client.get('/employee/jobs/feed/', {'limit': 2}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((not_modified.status_code, not_modified.content), (304, b''))
+        other_page = self.client.get('/employee/jobs/feed/', {'limit': 3}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(other_page.status_code, 200)
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def visit(self, name, **headers):
+        client = self.client_class()
+        client.get('/')  # sets the CSRF cookie
+        if name:
+            session = client.session
+            session.update({'user_type': 'employee', 'employee_id': 1, 'employee_name': name})
+            session.save()
+        return client, client.get('/', **headers)
+
+    def test_shell_is_shared_without_visitor_data(self):
+        alice, alice_page = self.visit('Alice')
+        bob, bob_page = self.visit('Bob')
+        self.assertContains(alice_page, 'Alice')
+        self.assertContains(bob_page, 'Bob')
+        self.assertNotContains(bob_page, 'Alice')
+        for client, page in ((alice, alice_page), (bob, bob_page)):
+            self.assertNotContains(page, client.cookies['csrftoken'].value)
+        # One anonymous and one employee shell, each rendered once.
+        self.assertEqual(page_cache.page_stats('landing')['miss'], 2)
+
+    def test_fragments_are_escaped(self):
+        _, page = self.visit('<script>alert(1)</script>')
+        self.assertNotContains(page, '<script>alert(1)</script>')
+        self.assertContains(page, '&lt;script&gt;alert(1)&lt;/script&gt;')
+
+    def test_pending_messages_bypass_the_cache(self):
+        request = RequestFactory().get('/terms/')
+        request.session = SessionStore()
+        request._messages = default_storage(request)
+        messages.info(request, 'Profile saved')
+        self.assertEqual(page_cache.render_cached(request, 'terms').status_code, 200)
+        self.assertEqual(page_cache.page_stats('terms'), {'hit': 0, 'miss': 0, 'bypass': 1, 'ratio': None})
+        # Still pending, for the next page to show.
+        self.assertEqual(len(request._messages), 1)
+
+    def test_not_modified(self):
+        client, page = self.visit('Alice')
+        not_modified = client.get('/', HTTP_IF_NONE_MATCH=page['ETag'])
+        self.assertEqual((not_modified.status_code, not_modified.content), (304, b''))
+        _, bob_page = self.visit('Bob')
+        self.assertNotEqual(bob_page['ETag'], page['ETag'])
+
+
+class MediaCollectorTests(TestCase):
+    GRACE = 3600
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root.name))
+        self.media_root = media_root.name
+        self.now = time.time()
+
+    def upload(self, name, age, data=b'12345'):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+        os.utime(path, (self.now - age, self.now - age))
+        return path
+
+    def exists(self, name):
+        return os.path.exists(os.path.join(self.media_root, name))
+
+    def collect(self, dry_run):
+        return media_gc.collect(self.GRACE, dry_run=dry_run, workers=2, now=self.now)
+
+    def test_only_old_unreferenced_files_go(self):
+        old = self.GRACE * 2
+        self.upload('resumes/kept.pdf', old)
+        make_registration(resume='resumes/kept.pdf')
+        self.upload('resumes/orphan.pdf', old, data=b'1234567')
+        self.upload('resumes/2024/orphan.pdf', old)
+        self.upload('resumes/fresh.pdf', self.GRACE // 2)
+        self.upload('unrelated/orphan.pdf', old)
+
+        totals = self.collect(dry_run=False)
+        resumes = totals['resumes']
+        self.assertEqual((resumes.scanned, resumes.referenced, resumes.recent), (4, 1, 1))
+        self.assertEqual((resumes.orphaned, resumes.orphaned_bytes), (2, 12))
+        self.assertTrue(self.exists('resumes/kept.pdf'))
+        self.assertTrue(self.exists('resumes/fresh.pdf'))
+        self.assertFalse(self.exists('resumes/orphan.pdf'))
+        self.assertFalse(self.exists('resumes/2024/orphan.pdf'))
+        # Only the upload directories are swept.
+        self.assertTrue(self.exists('unrelated/orphan.pdf'))
+
+    def test_files_of_queued_tasks_are_kept(self):
+        old = self.GRACE * 2
+        queued = self.upload('tmp/queued.pdf', old)
+        finished = self.upload('tmp/finished.pdf', old)
+        Task.objects.create(name='attach_registration_files', payload={'resume': queued})
+        Task.objects.create(name='attach_registration_files', payload={'resume': finished}, status=Task.DONE)
+
+        tmp = self.collect(dry_run=False)['tmp']
+        self.assertEqual((tmp.referenced, tmp.orphaned), (1, 1))
+        self.assertTrue(self.exists('tmp/queued.pdf'))
+        self.assertFalse(self.exists('tmp/finished.pdf'))
+
+    def test_dry_run_only_counts(self):
+        self.upload('employer_logos/a.png', self.GRACE * 2)
+        self.upload('employer_logos/b.png', self.GRACE * 2)
+        for _ in range(2):
+            logos = self.collect(dry_run=True)['employer_logos']
+            self.assertEqual((logos.orphaned, logos.orphaned_bytes), (2, 10))
+        self.assertTrue(self.exists('employer_logos/a.png'))
+        self.assertEqual(self.collect(dry_run=True)['employee_photos'].scanned, 0)
+
+
+class RecommendationTests(TestCase):
+    def setUp(self):
+        self.employers = [make_employer(f'employer{i}@example.com') for i in range(3)]
+        self.candidates = [make_registration(f'cand{i}@example.com') for i in range(4)]
+        picks = {0: (0, 1), 1: (0, 1, 2), 2: (2, 3)}
+        for employer, candidates in picks.items():
+            for candidate in candidates:
+                EmployerInterest.objects.create(employer=self.employers[employer], employee=self.candidates[candidate])
+        self.spec = recommendations.RECOMMENDATIONS[Recommendation.CANDIDATES]
+
+    def expected(self, employer, *items):
+        return self.employers[employer].pk, [[self.candidates[candidate].pk, score] for candidate, score in items]
+
+    def stored(self):
+        return dict(Recommendation.objects.filter(kind=self.spec.kind).values_list('owner_id', 'items'))
+
+    def test_cosine_scores(self):
+        # shared pickers / √(pickers of a × pickers of b): 0~1 = 2/√4, 0~2 = 1/√4, 2~3 = 1/√2
+        self.assertEqual(recommendations.build(self.spec), dict([
+            self.expected(0, (2, 1.0)),
+            self.expected(1, (3, 0.7071)),
+            self.expected(2, (0, 0.5), (1, 0.5)),
+        ]))
+
+    def test_placed_candidates_are_not_recommended(self):
+        Registration.objects.filter(pk=self.candidates[3].pk).update(is_placed=True)
+        lists = recommendations.build(self.spec)
+        self.assertNotIn(self.employers[1].pk, lists)
+        self.assertEqual(len(lists), 2)
+
+    def test_expired_jobs_are_not_recommended(self):
+        spec = recommendations.RECOMMENDATIONS[Recommendation.JOBS]
+        jobs = [make_job(self.employers[0]) for _ in range(2)]
+        for candidate, job in ((0, 0), (0, 1), (1, 0)):
+            EmployeeInterest.objects.create(employee=self.candidates[candidate], job=jobs[job])
+        self.assertEqual(recommendations.build(spec), {self.candidates[1].pk: [[jobs[1].pk, 0.7071]]})
+        JobOpening.objects.filter(pk=jobs[1].pk).update(expires_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(recommendations.build(spec), {})
+
+    def test_refresh_writes_only_changes(self):
+        self.assertEqual(recommendations.refresh(self.spec), (3, 0, 0))
+        written = dict(Recommendation.objects.values_list('owner_id', 'updated_at'))
+        self.assertEqual(recommendations.refresh(self.spec), (0, 0, 0))
+
+        self.assertEqual(recommendations.refresh(self.spec, limit=1), (0, 1, 0))
+        self.assertEqual(self.stored()[self.employers[2].pk], [[self.candidates[0].pk, 0.5]])
+        updated_at = dict(Recommendation.objects.values_list('owner_id', 'updated_at'))
+        for employer in self.employers[:2]:
+            self.assertEqual(updated_at[employer.pk], written[employer.pk])
+
+        Registration.objects.filter(pk=self.candidates[3].pk).update(is_placed=True)
+        self.assertEqual(recommendations.refresh(self.spec, limit=1), (0, 0, 1))
+        self.assertNotIn(self.employers[1].pk, self.stored())
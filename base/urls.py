@@ -1,6 +1,10 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import api, async_views, views
+
+# Under ASGI (acco/asgi.py) the dashboards run their queries concurrently.
+dashboards = async_views if getattr(settings, 'ASYNC_DASHBOARDS', False) else views
 
 urlpatterns = [
     # Main pages
@@ -9,21 +13,32 @@ urlpatterns = [
     path('create-checkout-session/', views.create_checkout_session, name='create_checkout_session'),
     path('register/success/', views.registration_success, name='registration_success'),
     path('register/temp-save/', views.temp_save_registration, name='temp_save_registration'),
-    path('dashboard/', views.registrations_dashboard, name='registrations_dashboard'),
+    path('dashboard/', dashboards.registrations_dashboard, name='registrations_dashboard'),
     path('dashboard/toggle-placed/', views.toggle_placed, name='toggle_placed'),
+    path('dashboard/export/<slug:dataset>.<slug:fmt>', views.export_data, name='export_data'),
+    path('dashboard/interest-activity/', views.interest_activity_view, name='interest_activity'),
+    path('dashboard/registration-series/', views.registration_series_view, name='registration_series'),
     path("terms/", views.terms, name="terms"),
     
     # Employee Authentication
     path('employee/register/', views.employee_register, name='employee_register'),
     path('employee/login/', views.employee_login, name='employee_login'),
     path('employee/logout/', views.employee_logout, name='employee_logout'),
-    path('employee/dashboard/', views.employee_dashboard, name='employee_dashboard'),
+    path('employee/dashboard/', dashboards.employee_dashboard, name='employee_dashboard'),
     
     # Employer Authentication
     path('employer/register/', views.employer_register, name='employer_register'),
     path('employer/login/', views.employer_login, name='employer_login'),
     path('employer/logout/', views.employer_logout, name='employer_logout'),
-    path('employer/dashboard/', views.employer_dashboard, name='employer_dashboard'),
+    path('employer/dashboard/', dashboards.employer_dashboard, name='employer_dashboard'),
     path('employer/interest/', views.express_interest, name='express_interest'),
+    path('candidates/<int:pk>/<str:field>/', views.registration_file, name='registration_file'),
+    path('facets/<slug:name>/', views.facet_counts_view, name='facet_counts'),
+    path('employer/resume-search/', views.employer_resume_search, name='employer_resume_search'),
+    path('employee/jobs/feed/', views.employee_job_feed, name='employee_job_feed'),
     path('employee/interest/', views.employee_express_interest, name='employee_express_interest'),
+
+    # Read API (session auth)
+    path('api/v1/<slug:resource>/', api.api_list, name='api_list'),
+    path('api/v1/<slug:resource>/<int:pk>/', api.api_detail, name='api_detail'),
 ]
@@ -1,9 +1,8 @@
-from django.shortcuts import render, HttpResponse, redirect
-from django.http import JsonResponse
-from .models import Registration, Contact
+from django.shortcuts import render, HttpResponse, redirect, get_object_or_404
+from django.http import JsonResponse, Http404, HttpResponseBadRequest
+from .models import Registration, Contact, RegistrationRollup
 import stripe
 from django.conf import settings
-from django.core.files import File
 import os
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
@@ -11,28 +10,44 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.hashers import make_password, check_password
 from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from .validators import (
     validate_company_name,
     validate_phone_number,
     validate_safe_email,
     validate_text_input
 )
-from .decorators import rate_limit
+from .db_routers import read_from_replica
+from .decorators import get_valid_client_ip, rate_limit
+from .exports import get_export, export_response
+from .taskqueue import enqueue
+from .resume_index import search_registration_ids
+from .downloads import serve_file
+from .job_feed import build_feed, live_jobs, recommended_jobs
+from .pagination import InvalidCursor, etag_json_response
+from . import page_cache, rollups
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
 
 def registration_view(request):
-    context = {
+    user_type = request.session.get('user_type')
+    name = (
+        request.session.get('employee_name') if user_type == 'employee'
+        else request.session.get('employer_name') if user_type == 'employer'
+        else None
+    )
+    # Only the name differs between signed-in users; it is filled into the cached page.
+    return page_cache.render_cached(request, 'landing', {
         'stripe_public_key': settings.STRIPE_PUBLIC_KEY,
-        'session_user_type': request.session.get('user_type'),
-        'session_user_name': (
-            request.session.get('employee_name') if request.session.get('user_type') == 'employee'
-            else request.session.get('employer_name') if request.session.get('user_type') == 'employer'
-            else None
-        ),
-    }
-    return render(request, 'base/index.html', context)
+        'session_user_type': user_type if user_type in ('employee', 'employer') else None,
+        'csrf_cookie_name': settings.CSRF_COOKIE_NAME,
+    }, fragments={
+        'session_user_name': name,
+        'session_user_initial': name[:1].upper() if name else '',
+    })
 
 
 def register_user(request):
@@ -59,7 +74,8 @@ def register_user(request):
             qualification=qualification,
             experience=experience,
             role=role,
-            resume=resume
+            resume=resume,
+            client_ip=get_valid_client_ip(request),
         )
         return JsonResponse({'status': 'success', 'message': 'Registration submitted successfully.'})
 
@@ -89,7 +105,8 @@ def contact_user(request):
             name=name,
             email=email,
             phone=phone,
-            message=message
+            message=message,
+            client_ip=get_valid_client_ip(request),
         )
         messages.success(request, "Thank you for contacting us! We will get back to you soon!")
         return redirect('/')
@@ -175,24 +192,19 @@ def registration_success(request):
         experience=data['experience'],
         role=data['role'],
         plan=data.get('plan', 'basic'),
+        client_ip=get_valid_client_ip(request),
     )
 
-    # Assign resume if it exists
-    if resume_tmp_path and os.path.exists(resume_tmp_path):
-        f = open(resume_tmp_path, 'rb')
-        registration.resume.save(os.path.basename(resume_tmp_path), File(f))
-        f.close()
-        os.remove(resume_tmp_path)
-
-    # Assign photo if it exists
-    if photo_tmp_path and os.path.exists(photo_tmp_path):
-        f = open(photo_tmp_path, 'rb')
-        registration.photo.save(os.path.basename(photo_tmp_path), File(f))
-        f.close()
-        os.remove(photo_tmp_path)
-
     registration.save()
 
+    # Copying the uploads into MEDIA_ROOT happens in a background worker
+    if resume_tmp_path or photo_tmp_path:
+        enqueue('attach_registration_files', {
+            'registration_id': registration.id,
+            'resume': resume_tmp_path,
+            'photo': photo_tmp_path,
+        }, priority=10)
+
     # Clean session
     del request.session['registration_data']
 
@@ -355,6 +367,7 @@ def employee_register(request):
             experience=experience,
             role=role,
             plan=plan,
+            client_ip=get_valid_client_ip(request),
         )
 
         if resume:
@@ -363,6 +376,7 @@ def employee_register(request):
             registration.photo.save(photo.name, photo, save=False)
 
         registration.save()
+        enqueue('index_resume', {'registration_id': registration.id})
 
         messages.success(request, "Registration successful! Please login to access your dashboard.")
         return redirect('employee_login')
@@ -371,20 +385,31 @@ def employee_register(request):
 
 
 def terms(request):
-    return render(request, 'base/terms.html')
+    return page_cache.render_cached(request, 'terms')
 
 
 
 # DASHBOARD
 
+def parse_form_datetime(value):
+    """A ``datetime-local`` input (in ``TIME_ZONE``) as an aware datetime, or ``None`` when blank."""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValidationError(f"Invalid date: {value}")
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
 @login_required(login_url='/admin/login/')
+@read_from_replica
 def registrations_dashboard(request):
     # Handle job opening creation
     if request.method == 'POST' and request.POST.get('action') == 'create_job':
         try:
             employer_id = request.POST.get('employer')
             employer = Employer.objects.get(id=employer_id)
-            JobOpening.objects.create(
+            job = JobOpening(
                 employer=employer,
                 title=request.POST.get('title'),
                 description=request.POST.get('description'),
@@ -392,8 +417,12 @@ def registrations_dashboard(request):
                 salary_range=request.POST.get('salary_range', ''),
                 location=request.POST.get('location'),
                 job_type=request.POST.get('job_type', 'Full-time'),
-                is_active=request.POST.get('is_active') == 'on'
+                is_active=request.POST.get('is_active') == 'on',
+                publish_at=parse_form_datetime(request.POST.get('publish_at')) or timezone.now(),
+                expires_at=parse_form_datetime(request.POST.get('expires_at')),
             )
+            job.clean()
+            job.save()
             messages.success(request, 'Job opening created successfully!')
         except Exception as e:
             messages.error(request, f'Error creating job: {str(e)}')
@@ -421,16 +450,76 @@ def registrations_dashboard(request):
         'employers': employers,
         'job_openings': job_openings,
         'placed_count': placed_count,
+        'now': timezone.now(),
         'interests': interests,
         'employee_interests': employee_interests,
     })
 
 
+@login_required(login_url='/admin/login/')
+@read_from_replica
+def export_data(request, dataset, fmt):
+    spec = get_export(dataset)
+    try:
+        queryset = spec.filter_queryset(spec.model.objects.all(), request.GET)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    return export_response(spec, queryset, fmt, filename=dataset)
+
+
+@login_required(login_url='/admin/login/')
+@read_from_replica
+def interest_activity_view(request):
+    """Interest chart data for the staff dashboard, read from the rollups."""
+    period = request.GET.get('period', 'day')
+    if period not in rollups.PERIODS:
+        return JsonResponse({'error': 'Unknown period'}, status=400)
+    streams = [stream for stream, name in rollups.STREAM_NAMES.items() if name in request.GET.getlist('stream')]
+    try:
+        span = int(request.GET.get('span') or 0) or None
+        actor_id = int(request.GET['actor']) if 'actor' in request.GET else None
+    except ValueError:
+        return JsonResponse({'error': 'span and actor must be numbers'}, status=400)
+    if actor_id is not None and len(streams) != 1:
+        return JsonResponse({'error': 'actor needs exactly one stream'}, status=400)
+    return JsonResponse(rollups.interest_activity(period, span, streams, actor_id))
+
+
+@login_required(login_url='/admin/login/')
+@read_from_replica
+def registration_series_view(request):
+    """Registrations per day by plan, location or role for the staff dashboard, read from the rollups."""
+    dimension = request.GET.get('by', 'plan')
+    if dimension not in dict(RegistrationRollup.DIMENSION_CHOICES):
+        return JsonResponse({'error': 'Unknown dimension'}, status=400)
+    try:
+        days = int(request.GET.get('days') or 0) or None
+        top = max(1, min(int(request.GET.get('top') or 8), 20))
+    except ValueError:
+        return JsonResponse({'error': 'days and top must be numbers'}, status=400)
+    return JsonResponse(rollups.registration_series(dimension, days, top))
+
+
 # ==========================================
 # EMPLOYEE AUTHENTICATION
 # ==========================================
 
-from .models import Employer, JobOpening, EmployerInterest, EmployeeInterest
+from .models import Employer, JobOpening, EmployerInterest, EmployeeInterest, InterestNotification, Recommendation, JOB_TYPES
+from . import facets, notifications
+from .recommendations import recommended_ids
+
+# Facets shown as filter dropdowns on the employer dashboard.
+CANDIDATE_FACETS = ['location', 'role', 'experience', 'qualification', 'plan']
+
+# ?sort= choices for the employer dashboard; both match an index.
+CANDIDATE_ORDERINGS = {
+    'newest': ('-created_at',),
+    'popular': ('-shortlist_count', '-created_at'),
+}
+
+
+def candidate_ordering(request):
+    return CANDIDATE_ORDERINGS.get(request.GET.get('sort'), CANDIDATE_ORDERINGS['newest'])
 
 def employee_login(request):
     if request.session.get('user_type') == 'employee':
@@ -469,6 +558,7 @@ def employee_logout(request):
     return redirect('/')
 
 
+@read_from_replica
 def employee_dashboard(request):
     # Check if employee is logged in
     if 'employee_id' not in request.session or request.session.get('user_type') != 'employee':
@@ -489,20 +579,27 @@ def employee_dashboard(request):
         messages.success(request, "Skills updated successfully!")
         return redirect('employee_dashboard')
     
-    # Get all active job openings
-    job_openings = JobOpening.objects.filter(is_active=True).select_related('employer').order_by('-created_at')
-
-    interested_job_ids = set(
-        EmployeeInterest.objects.filter(employee=employee).values_list('job_id', flat=True)
-    )
-
+    # First page of the job feed; the page fetches the rest from employee_job_feed
     return render(request, 'base/employee_dashboard.html', {
         'employee': employee,
-        'job_openings': job_openings,
-        'interested_job_ids': interested_job_ids,
+        'job_feed': build_feed(employee.id, {}),
+        'recommended_jobs': recommended_jobs(employee.id),
+        'job_types': JOB_TYPES,
     })
 
 
+@read_from_replica
+def employee_job_feed(request):
+    if 'employee_id' not in request.session or request.session.get('user_type') != 'employee':
+        return JsonResponse({'error': 'Not authenticated'}, status=401)
+
+    try:
+        feed = build_feed(request.session['employee_id'], request.GET)
+    except InvalidCursor:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+    return etag_json_response(request, feed)
+
+
 # ==========================================
 # EMPLOYER AUTHENTICATION
 # ==========================================
@@ -557,7 +654,8 @@ def employer_register(request):
             company_description=company_description,
             location=location,
             industry=industry,
-            logo=logo
+            logo=logo,
+            client_ip=get_valid_client_ip(request),
         )
 
         messages.success(request, "Registration successful! Please login.")
@@ -620,6 +718,7 @@ def toggle_placed(request):
     return redirect('registrations_dashboard')
 
 
+@read_from_replica
 def employer_dashboard(request):
     # Check if employer is logged in
     if 'employer_id' not in request.session or request.session.get('user_type') != 'employer':
@@ -633,19 +732,77 @@ def employer_dashboard(request):
         return redirect('employer_login')
     
     # Get all registered employees
-    employees = Registration.objects.all().order_by('-created_at')
+    employees = list(Registration.objects.all().order_by(*candidate_ordering(request)))
+    for emp in employees:
+        emp.experience_band = facets.experience_band(emp.experience)
 
     interested_ids = set(
         EmployerInterest.objects.filter(employer=employer).values_list('employee_id', flat=True)
     )
+    recommended = recommended_candidates(
+        employees, recommended_ids(Recommendation.CANDIDATES, employer.id), interested_ids
+    )
 
     return render(request, 'base/employer_dashboard.html', {
         'employer': employer,
         'employees': employees,
         'interested_ids': interested_ids,
+        'recommended': recommended,
+        'candidate_facets': facets.facet_counts('registrations', dimensions=CANDIDATE_FACETS),
+        'sort': request.GET.get('sort', 'newest'),
     })
 
 
+def recommended_candidates(employees, ids, interested_ids):
+    """The recommended, still available candidates out of the ``employees`` already loaded."""
+    available = {emp.id: emp for emp in employees if not emp.is_placed and emp.id not in interested_ids}
+    return [available[pk] for pk in ids if pk in available]
+
+
+@read_from_replica
+def facet_counts_view(request, name):
+    if name not in facets.FACETS:
+        raise Http404("Unknown facet")
+    is_staff = request.user.is_authenticated and request.user.is_staff
+    user_type = request.session.get('user_type')
+    allowed = is_staff or user_type == 'employer' or (name == 'jobs' and user_type == 'employee')
+    if not allowed:
+        return JsonResponse({'error': 'Not authenticated'}, status=401)
+
+    spec = facets.FACETS[name]
+    dimensions = [dim for dim in request.GET.getlist('facet') if dim in {d.name for d in spec.dimensions}]
+    try:
+        filters = spec.parse_filters(request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(facets.facet_counts(name, filters, dimensions or None))
+
+
+@read_from_replica
+def employer_resume_search(request):
+    if 'employer_id' not in request.session or request.session.get('user_type') != 'employer':
+        return JsonResponse({'error': 'Not authenticated'}, status=401)
+
+    query = request.GET.get('q', '').strip()
+    if len(query) < 2:
+        return JsonResponse({'ids': []})
+
+    return JsonResponse({'ids': search_registration_ids(query)})
+
+
+def registration_file(request, pk, field):
+    """Resume or photo of a candidate, for staff and logged-in employers only."""
+    is_staff = request.user.is_authenticated and request.user.is_staff
+    is_employer = 'employer_id' in request.session and request.session.get('user_type') == 'employer'
+    if not (is_staff or is_employer):
+        return HttpResponse("You must be logged in as an employer to view candidate files.", status=403)
+    if field not in ('resume', 'photo'):
+        raise Http404("Unknown file")
+
+    registration = get_object_or_404(Registration.objects.only('id', field), pk=pk)
+    return serve_file(request, getattr(registration, field))
+
+
 def express_interest(request):
     if request.method != 'POST':
         return JsonResponse({'error': 'Method not allowed'}, status=405)
@@ -670,12 +827,16 @@ def express_interest(request):
     except (Employer.DoesNotExist, Registration.DoesNotExist):
         return JsonResponse({'error': 'Not found'}, status=404)
 
-    interest, created = EmployerInterest.objects.get_or_create(employer=employer, employee=employee)
+    # The interest row and Registration.shortlist_count change together.
+    with transaction.atomic():
+        interest, created = EmployerInterest.objects.get_or_create(employer=employer, employee=employee)
 
-    if not created:
-        interest.delete()
-        return JsonResponse({'status': 'removed'})
+        if not created:
+            interest.delete()
+            notifications.cancel_pending(kind=InterestNotification.SHORTLISTED, employer=employer, employee=employee)
+            return JsonResponse({'status': 'removed'})
 
+        notifications.record_shortlisted(employer, employee)
     return JsonResponse({'status': 'added'})
 
 
@@ -699,14 +860,23 @@ def employee_express_interest(request):
 
     try:
         employee = Registration.objects.get(id=employee_id)
-        job = JobOpening.objects.get(id=job_id)
+        job = JobOpening.objects.select_related('employer').get(id=job_id)
     except (Registration.DoesNotExist, JobOpening.DoesNotExist):
         return JsonResponse({'error': 'Not found'}, status=404)
 
-    interest, created = EmployeeInterest.objects.get_or_create(employee=employee, job=job)
+    # The interest row and JobOpening.interest_count change together.
+    with transaction.atomic():
+        interest, created = EmployeeInterest.objects.get_or_create(employee=employee, job=job)
+
+        if not created:
+            interest.delete()
+            notifications.cancel_pending(kind=InterestNotification.APPLIED, employee=employee, job=job)
+            return JsonResponse({'status': 'removed'})
 
-    if not created:
-        interest.delete()
-        return JsonResponse({'status': 'removed'})
+        # Interest can be withdrawn from a closed opening, but not added to one.
+        if not live_jobs().filter(pk=job.pk).exists():
+            transaction.set_rollback(True)
+            return JsonResponse({'error': 'This opening is closed'}, status=400)
 
+        notifications.record_applied(employee, job)
     return JsonResponse({'status': 'added'})
\ No newline at end of file